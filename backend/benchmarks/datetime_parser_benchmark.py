@@ -0,0 +1,94 @@
+"""
+Microbenchmark of utils.datetime_parser against the '일시' parsing it replaced.
+
+The old functions are reproduced from crawling_service.fetch_popup_details,
+the popup details endpoint (with its strptime round trip in format_time) and
+extract_time_fields, which ran on every read. Each is timed per call on
+typical '일시' values next to parse_datetime_range, after checking that they
+extract the same times, and next to the read path that replaced per-read
+parsing: taking the times stored on the row at crawl time.
+
+Usage:
+    python benchmarks/datetime_parser_benchmark.py [--number 20000]
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from utils import parse_datetime_range  # noqa: E402
+
+SAMPLES = [
+    "20250514 ~ 20250514\n\t\t\t 10:00 ~ 12:00",
+    "20250514 ~ 20250515 09:30 ~ 18:00",
+    "20250601 ~ 20250601\n\t\t\t 13:00 ~ 14:50"
+]
+
+
+def old_popup_times(raw: str) -> tuple:
+    """crawling_service.fetch_popup_details"""
+    raw_time = raw.replace("\n", "").replace("\t", "").strip()
+    match = re.search(r"\d{8} ~ \d{8}\s*(\d{2}:\d{2}) ~ (\d{2}:\d{2})", raw_time)
+    return (match.group(1), match.group(2)) if match else (None, None)
+
+
+def format_time(time_str: str) -> str:
+    try:
+        return datetime.strptime(time_str, "%H:%M").strftime("%H:%M")
+    except ValueError:
+        return time_str
+
+
+def old_details_times(raw: str) -> tuple:
+    """reservation_controller.format_popup_details, per details read"""
+    match = re.search(r"\d{8} ~ \d{8}\s+(\d{2}:\d{2}) ~ (\d{2}:\d{2})", raw.replace("\n", "").replace("\t", "").strip())
+    return (format_time(match.group(1)), format_time(match.group(2))) if match else (None, None)
+
+
+def old_row_times(raw: str) -> tuple:
+    """reservation_controller.extract_time_fields, per row of every read"""
+    match = re.search(r"(\d{8}) ~ (\d{8})\s+(\d{2}:\d{2}) ~ (\d{2}:\d{2})", raw)
+    return (match.group(3), match.group(4)) if match else (None, None)
+
+
+def new_times(raw: str) -> tuple:
+    parsed = parse_datetime_range(raw)
+    return parsed.get("start_time"), parsed.get("end_time")
+
+
+def stored_times(row: dict) -> tuple:
+    """The read path now: times parsed at crawl time are stored on the row"""
+    return row.get("start_time"), row.get("end_time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    functions = [
+        ("old fetch_popup_details", old_popup_times),
+        ("old details endpoint", old_details_times),
+        ("old extract_time_fields", old_row_times),
+        ("parse_datetime_range", new_times)
+    ]
+    for sample in SAMPLES:
+        for name, fn in functions:
+            if fn(sample) != new_times(sample):
+                raise SystemExit(f"{name} disagrees with parse_datetime_range on {sample!r}")
+
+    rows = [{"start_time": start, "end_time": end} for start, end in map(new_times, SAMPLES)]
+    timed = [(name, fn, SAMPLES) for name, fn in functions] + [("stored fields (reads now)", stored_times, rows)]
+    print(f"{'function':<26}{'us/call':>10}")
+    for name, fn, inputs in timed:
+        seconds = min(timeit.repeat(lambda: [fn(value) for value in inputs], number=args.number, repeat=5))
+        print(f"{name:<26}{seconds / (args.number * len(inputs)) * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark of the HTML parser backends on the saved fixture pages.
+
+Compares the original full-tree html.parser parse of crawling_service with
+every installed backend of services/html_parser on a facility list page and
+a print page, after checking that each backend returns the same result.
+
+Usage:
+    python benchmarks/html_parser_benchmark.py [--repeat 50]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from services.html_parser import (  # noqa: E402
+    HTML_PARSER_BACKENDS,
+    parse_detail_pairs,
+    parse_list_rows,
+    resolve_backend
+)
+
+FIXTURES = os.path.join(ROOT, "tests", "fixtures")
+
+
+def full_tree_list_rows(html: str) -> list:
+    """The list page parse before the parser backends: a complete html.parser tree."""
+    table = BeautifulSoup(html, "html.parser").find("table")
+    rows = []
+    for row in table.find("tbody").find_all("tr"):
+        cols = row.find_all("td")
+        anchor = cols[-1].find("a")
+        rows.append(([col.get_text(strip=True) for col in cols[:-1]], anchor.get("href") if anchor else None))
+    return rows
+
+
+def full_tree_detail_pairs(html: str) -> list:
+    """The print page parse before the parser backends: a complete html.parser tree."""
+    table = BeautifulSoup(html, "html.parser").find("table", attrs={"width": "600px"})
+    return [
+        (row.find("th").text.strip(), row.find("td").text.strip())
+        for row in table.find_all("tr") if row.find("th") and row.find("td")
+    ]
+
+
+def best_ms(fn, html: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        began = time.perf_counter()
+        fn(html)
+        best = min(best, time.perf_counter() - began)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    pages = [
+        ("list page", "facility_list.html", full_tree_list_rows, parse_list_rows),
+        ("print page", "facility_print.html", full_tree_detail_pairs, parse_detail_pairs)
+    ]
+    backends = [backend for backend in HTML_PARSER_BACKENDS if resolve_backend(backend) == backend]
+
+    print(f"{'page':<12}{'parser':<22}{'best ms':>10}{'speedup':>10}")
+    for label, fixture, reference, parse in pages:
+        with open(os.path.join(FIXTURES, fixture), encoding="utf-8") as f:
+            html = f.read()
+        expected = reference(html)
+        baseline = best_ms(reference, html, args.repeat)
+        print(f"{label:<12}{'full tree html.parser':<22}{baseline:>10.2f}{1:>9.1f}x")
+        for backend in backends:
+            if parse(html, backend) != expected:
+                raise SystemExit(f"{backend} output differs from the full-tree parse on {fixture}")
+            elapsed = best_ms(lambda page: parse(page, backend), html, args.repeat)
+            print(f"{label:<12}{backend:<22}{elapsed:>10.2f}{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark of reservation response serialization and compression.
+
+Builds a multi-room week payload shaped like /api/reservations/range with
+popup details, then compares the previous path (dicts mutated in place,
+json.dumps by FastAPI plus a sort_keys json.dumps for the ETag) with the
+response models serialized once by orjson, and reports the bytes on the
+wire without compression, with gzip and with brotli.
+
+Usage:
+    python benchmarks/serialization_benchmark.py [--rows-per-day 20] [--repeat 50]
+"""
+
+import argparse
+import copy
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from schemas import ReservationResponse, ReservationRangeResponse  # noqa: E402
+from utils import parse_datetime_range, dumps, HAS_ORJSON, HAS_BROTLI, load_compression_config  # noqa: E402
+
+ROOMS = ["daegangdang", "junggangdang", "sogangdang", "5nam_sogangdang"]
+DAYS = 7
+
+
+def build_rows(rows_per_day: int) -> dict:
+    """Return {room_id: {date: [row, ...]}} as the DAO returns it with embedded details."""
+    grouped = {}
+    start = date(2025, 3, 3)
+    for room_id in ROOMS:
+        by_date = grouped.setdefault(room_id, {})
+        for day in range(DAYS):
+            day_str = (start + timedelta(days=day)).isoformat()
+            rows = by_date.setdefault(day_str, [])
+            for n in range(rows_per_day):
+                hour = 8 + (n * 13) // rows_per_day
+                start_time, end_time = f"{hour:02d}:00", f"{hour:02d}:50"
+                compact = day_str.replace("-", "")
+                rows.append({
+                    "id": hashlib.sha256(f"{room_id}{day_str}{n}".encode()).hexdigest()[:20],
+                    "room_id": room_id,
+                    "date": day_str,
+                    "place": "학생회관 대강당",
+                    "department": f"컴퓨터공학과 학생회 {n}",
+                    "event": f"정기 세미나 및 워크숍 {n}회차",
+                    "approval": "승인",
+                    "print_link": f"javascript:fn_print('{room_id}', '{day_str}', '{n}')",
+                    "start_date": day_str,
+                    "end_date": day_str,
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "details": [
+                        {"key": "신청부서", "value": f"컴퓨터공학과 학생회 {n}"},
+                        {"key": "행사명", "value": f"정기 세미나 및 워크숍 {n}회차"},
+                        {"key": "일시", "value": f"{compact} ~ {compact}\n\t{start_time} ~ {end_time}"},
+                        {"key": "인원", "value": str(40 + n)},
+                        {"key": "담당자", "value": "홍길동"},
+                        {"key": "연락처", "value": "02-0000-0000"},
+                        {"key": "비고", "value": "빔프로젝터 및 마이크 사용"},
+                    ]
+                })
+    return grouped
+
+
+def legacy_prepare(row: dict) -> None:
+    """The former in-place preparation: legacy time parsing and popup detail formatting."""
+    details = []
+    for d in row["details"]:
+        if d["key"] == "일시":
+            parsed = parse_datetime_range(d["value"])
+            details.append({"key": "start_time", "value": parsed["start_time"]})
+            details.append({"key": "end_time", "value": parsed["end_time"]})
+        else:
+            details.append(d)
+    row["details"] = details
+    for d in details:
+        if d["key"] in ("start_time", "end_time"):
+            row.setdefault(d["key"], d["value"])
+
+
+def legacy_path(grouped: dict) -> bytes:
+    count = 0
+    for by_date in grouped.values():
+        for rows in by_date.values():
+            for r in rows:
+                legacy_prepare(r)
+            count += len(rows)
+    payload = {"success": True, "count": count, "data": grouped}
+    etag_body = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    hashlib.sha256(etag_body.encode()).hexdigest()
+    # FastAPI's jsonable_encoder pass is not included, so this understates the old cost
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":")).encode()
+
+
+def model_path(grouped: dict) -> bytes:
+    data = {
+        room: {
+            day: [ReservationResponse.from_row(r, include_details=True) for r in rows]
+            for day, rows in by_date.items()
+        }
+        for room, by_date in grouped.items()
+    }
+    count = sum(len(rows) for by_date in data.values() for rows in by_date.values())
+    body = dumps(ReservationRangeResponse(success=True, count=count, data=data))
+    hashlib.sha256(body).hexdigest()
+    return body
+
+
+def timed(fn, grouped: dict, repeat: int) -> tuple:
+    # Each run gets its own copy, since the legacy path mutates rows in place
+    copies = [copy.deepcopy(grouped) for _ in range(repeat)]
+    best = float("inf")
+    body = b""
+    for rows in copies:
+        began = time.perf_counter()
+        body = fn(rows)
+        best = min(best, time.perf_counter() - began)
+    return best * 1000, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows-per-day", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    grouped = build_rows(args.rows_per_day)
+    config = load_compression_config()
+    rows = len(ROOMS) * DAYS * args.rows_per_day
+    print(f"{len(ROOMS)} rooms x {DAYS} days x {args.rows_per_day} rows = {rows} reservations "
+          f"(orjson: {HAS_ORJSON}, brotli: {HAS_BROTLI})")
+
+    legacy_ms, legacy_body = timed(legacy_path, grouped, args.repeat)
+    model_ms, model_body = timed(model_path, grouped, args.repeat)
+    print(f"{'path':<28}{'best ms':>10}{'bytes':>10}")
+    print(f"{'dict + json + sort_keys ETag':<28}{legacy_ms:>10.2f}{len(legacy_body):>10}")
+    print(f"{'models + dumps + ETag':<28}{model_ms:>10.2f}{len(model_body):>10}")
+
+    print(f"{'encoding':<28}{'ms':>10}{'bytes':>10}")
+    print(f"{'identity':<28}{0:>10.2f}{len(model_body):>10}")
+    encoders = [("gzip", lambda b: gzip.compress(b, compresslevel=config.get("gzip_level", 6), mtime=0))]
+    if HAS_BROTLI:
+        import brotli
+        encoders.append(("br", lambda b: brotli.compress(b, quality=config.get("brotli_quality", 4))))
+    for name, encode in encoders:
+        began = time.perf_counter()
+        compressed = encode(model_body)
+        elapsed = (time.perf_counter() - began) * 1000
+        print(f"{name:<28}{elapsed:>10.2f}{len(compressed):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,4 +3,5 @@ from sys import path
 
 path.insert(0, dirname(__file__))
 
-from .reservation_controller import router
\ No newline at end of file
+from .reservation_controller import router
+from .metrics_controller import router as metrics_router, record_request_metrics
@@ -0,0 +1,84 @@
+import time
+
+from fastapi import APIRouter, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from cruds import reservation_cache
+from services import change_broadcaster
+from utils import room_label, API_REQUEST_SECONDS
+
+router = APIRouter()
+
+
+class ReservationCacheCollector:
+    """Exports the read cache counters at scrape time instead of on every lookup."""
+
+    def collect(self):
+        stats = reservation_cache.stats()
+        for name in ("hits", "misses", "evictions", "invalidations", "stale_puts"):
+            counter = CounterMetricFamily(f"reservation_cache_{name}", f"Read cache {name}")
+            counter.add_metric([], stats[name])
+            yield counter
+        size = GaugeMetricFamily("reservation_cache_entries", "Entries in the read cache")
+        size.add_metric([], stats["size"])
+        yield size
+        hit_rate = GaugeMetricFamily("reservation_cache_hit_ratio", "Read cache hits per lookup")
+        hit_rate.add_metric([], stats["hit_rate"])
+        yield hit_rate
+
+
+class EventStreamCollector:
+    """Exports the change event broadcaster's counters at scrape time."""
+
+    def collect(self):
+        stats = change_broadcaster.stats()
+        subscribers = GaugeMetricFamily("event_stream_subscribers", "Connected change event stream clients")
+        subscribers.add_metric([], stats["subscribers"])
+        yield subscribers
+        published = CounterMetricFamily("event_stream_published", "Change events published by crawls")
+        published.add_metric([], stats["published_count"])
+        yield published
+        dropped = CounterMetricFamily(
+            "event_stream_dropped", "Change events dropped for slow clients of connected streams"
+        )
+        dropped.add_metric([], stats["dropped_count"])
+        yield dropped
+
+
+REGISTRY.register(ReservationCacheCollector())
+REGISTRY.register(EventStreamCollector())
+
+
+async def record_request_metrics(request: Request, call_next):
+    """
+    Middleware recording the latency of every API request per route template.
+
+    Streaming responses are measured until their headers are sent.
+    """
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        room_id = request.path_params.get("room_id") or request.query_params.get("room_id")
+        API_REQUEST_SECONDS.labels(
+            method=request.method,
+            route=route.path if route is not None else "unmatched",
+            status=str(status),
+            room_id=room_label(room_id)
+        ).observe(time.perf_counter() - started)
+
+
+@router.get("/metrics")
+def get_metrics():
+    """
+    Expose crawl, HTTP, storage, cache and API metrics in the Prometheus text format.
+
+    Returns:
+        Response: Prometheus exposition of all registered metrics.
+    """
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -1,15 +1,53 @@
-from fastapi import APIRouter, HTTPException, Query
-from services import crawl_facility_reservations
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from services import (
+    crawl_jobs,
+    get_http_client,
+    run_retention,
+    get_retention_stats,
+    get_free_slots,
+    get_free_rooms,
+    get_day_view,
+    parse_minutes,
+    change_broadcaster,
+    get_changes,
+    HEARTBEAT_SECONDS
+)
+from utils import load_facility_config, load_http_cache_config, dumps, FastJSONResponse
 from cruds import (
     get_all_reservations,
     get_reservations_by_filter,
-    get_popup_details_by_reservation_id
+    get_reservations_by_range,
+    iter_reservations,
+    iter_reservations_by_range,
+    get_popup_details_by_reservation_id,
+    migrate_popup_details_to_embedded,
+    reservation_cache
+)
+from schemas import (
+    ReservationResponse,
+    ReservationListResponse,
+    ReservationRangeResponse,
+    DayViewResponse,
+    PopupDetailsResponse,
+    format_popup_details
 )
-import re
+import asyncio
+import hashlib
 from datetime import datetime
+from typing import List
 
 router = APIRouter()
 
+# Longest date range accepted by the range query endpoint
+MAX_RANGE_DAYS = 31
+
+# Response formats of the read endpoints
+RESPONSE_FORMATS = ("json", "ndjson")
+
+# Browsers and proxies may reuse read responses for max_age seconds, then revalidate with the ETag
+CACHE_CONTROL = f"public, max-age={load_http_cache_config().get('max_age', 60)}, must-revalidate"
+
 # Predefined room name to Firestore-safe ID mapping
 ROOM_ID_MAPPING = {
     "대강당": "daegangdang",
@@ -20,81 +58,291 @@ ROOM_ID_MAPPING = {
 
 
 @router.post("/crawl/{room_id}")
-def crawl_facility(room_id: str):
+def crawl_facility(
+    room_id: str,
+    force: bool = Query(False, description="Process the page even if it is unchanged since the last crawl")
+):
     """
-    Trigger crawling for a specific facility and return status.
+    Enqueue crawling for a specific facility and return the job ID.
 
     Args:
         room_id (str): The room ID to crawl.
+        force (bool): Process the page even if it is unchanged.
 
     Returns:
-        dict: Result of crawling including save count and status.
+        dict: Job ID and status; poll GET /crawl/jobs/{job_id} for progress.
     """
-    result = crawl_facility_reservations(None, room_id)
-
-    if result.get("status") == "error":
+    if room_id not in load_facility_config():
         return {
             "success": False,
-            "error": result.get("reason")
+            "error": f"No URL configured for {room_id}"
         }
 
+    job, deduplicated = crawl_jobs.submit("room", [room_id], force)
     return {
         "success": True,
-        "message": f"Crawling completed for {room_id}",
-        "saved_count": result.get("saved_count", 0)
+        "message": f"Crawling queued for {room_id}",
+        "job_id": job.id,
+        "status": job.status,
+        "deduplicated": deduplicated
     }
 
 
 @router.post("/crawl-all")
-def crawl_all():
+def crawl_all(
+    force: bool = Query(False, description="Process pages even if they are unchanged since the last crawl")
+):
     """
-    Crawl all predefined facilities using mapped room IDs.
+    Enqueue crawling of all predefined facilities using mapped room IDs.
+
+    Args:
+        force (bool): Process pages even if they are unchanged.
 
     Returns:
-        dict: Crawl status summary for each facility.
+        dict: Job ID and status; poll GET /crawl/jobs/{job_id} for per-facility results.
     """
-    summary = []
+    job, deduplicated = crawl_jobs.submit("all", list(ROOM_ID_MAPPING.values()), force)
+    return {
+        "status": "ok",
+        "facilities_crawled": len(ROOM_ID_MAPPING),
+        "job_id": job.id,
+        "job_status": job.status,
+        "deduplicated": deduplicated
+    }
 
-    for name, room_id in ROOM_ID_MAPPING.items():
-        print(f"Crawling: {name} as room_id={room_id}")
-        result = crawl_facility_reservations(None, room_id)
-        summary.append({
-            "name": name,
-            "room_id": room_id,
-            "result": result
-        })
 
+@router.get("/crawl/jobs")
+def list_crawl_jobs():
+    """
+    List recent crawl jobs, newest first.
+
+    Returns:
+        dict: Job status list.
+    """
     return {
         "status": "ok",
-        "facilities_crawled": len(ROOM_ID_MAPPING),
-        "results": summary
+        "jobs": [job.to_dict() for job in crawl_jobs.list()]
+    }
+
+
+@router.get("/crawl/http-stats")
+def get_crawl_http_stats():
+    """
+    Report crawler HTTP counters per host.
+
+    Returns:
+        dict: Requests, retries, failures, latencies and circuit state per host.
+    """
+    return {
+        "status": "ok",
+        "hosts": get_http_client().stats()
+    }
+
+
+@router.post("/retention/prune", status_code=202)
+def prune_outdated_reservations(background_tasks: BackgroundTasks):
+    """
+    Start a retention run in the background, outside the scheduled interval.
+
+    Returns:
+        dict: Acknowledgement; results are reported by /retention/stats.
+    """
+    background_tasks.add_task(run_retention)
+    return {"status": "accepted"}
+
+
+@router.get("/retention/stats")
+def get_retention_report():
+    """
+    Report what outdated reservation pruning has reclaimed.
+
+    Returns:
+        dict: Deleted reservations and subcollection documents, bytes reclaimed
+            and the last run's result.
+    """
+    return {
+        "status": "ok",
+        **get_retention_stats()
+    }
+
+
+@router.get("/crawl/jobs/{job_id}")
+def get_crawl_job(job_id: str):
+    """
+    Report status and progress of a crawl job.
+
+    Args:
+        job_id (str): Job ID returned by a crawl request.
+
+    Returns:
+        dict: Job status with rows parsed, popups fetched and writes committed.
+    """
+    job = crawl_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@router.post("/migrate/popup-details")
+def migrate_popup_details(room_id: str = Query(None, description="Room ID to migrate, all rooms if omitted")):
+    """
+    Move popup details from the subcollection layout into reservation documents.
+
+    Args:
+        room_id (str, optional): Room ID to migrate.
+
+    Returns:
+        dict: Migration summary.
+    """
+    result = migrate_popup_details_to_embedded(room_id)
+    return {
+        "success": True,
+        **result
     }
 
 
+@router.get("/api/cache/stats")
+def get_cache_stats():
+    """
+    Report read cache counters.
+
+    Returns:
+        dict: Cache size, hit/miss/eviction counters and hit rate.
+    """
+    return reservation_cache.stats()
+
+
 @router.get("/api/reservations")
 def get_reservations(
-    room_id: str = Query(..., description="Room ID to filter by"),
-    date: str = Query(..., description="Date (YYYY-MM-DD) to filter by")
+    request: Request,
+    room_id: str = Query(None, description="Room ID to filter by; may be omitted for all rooms with format=ndjson"),
+    date: str = Query(None, description="Date (YYYY-MM-DD) to filter by; may be omitted for all dates with format=ndjson"),
+    include: str = Query(None, description="Set to 'details' to embed popup details in each row"),
+    format: str = Query("json", description="'json', or 'ndjson' to stream one reservation per line")
 ):
     """
     Retrieve reservations from Firestore filtered by room and date.
 
+    Both filters are required for JSON responses, which are built in memory
+    and cached; only NDJSON streams may omit them to export every room or date.
+
+    Args:
+        room_id (str, optional): Room ID to filter by.
+        date (str, optional): Date (YYYY-MM-DD) to filter by.
+        include (str, optional): 'details' to return popup details with each row.
+        format (str): 'ndjson' streams rows as they arrive from Firestore.
+
+    Returns:
+        dict: Reservation list with start and end time fields parsed, or
+            304 Not Modified if the client's ETag is still current.
+    """
+    validate_format(format)
+    include_details = include == "details"
+    if format == "ndjson":
+        return ndjson_response(iter_reservations(room_id, date, include_details), include_details)
+    if not room_id or not date:
+        raise HTTPException(status_code=400, detail="room_id and date are required unless format=ndjson")
+
+    try:
+        reservations = [
+            ReservationResponse.from_row(r, include_details)
+            for r in get_reservations_by_filter(room_id, date, include_details)
+        ]
+        return conditional_response(request, ReservationListResponse(
+            success=True,
+            count=len(reservations),
+            data=reservations
+        ))
+    except Exception as e:
+        return FastJSONResponse({
+            "success": False,
+            "error": str(e)
+        })
+
+
+@router.get("/api/reservations/range")
+def get_reservations_range(
+    request: Request,
+    start_date: str = Query(..., description="First date (YYYY-MM-DD), inclusive"),
+    end_date: str = Query(..., description="Last date (YYYY-MM-DD), inclusive"),
+    room_ids: List[str] = Query(None, description="Room IDs to include, all rooms if omitted"),
+    include: str = Query(None, description="Set to 'details' to embed popup details in each row"),
+    format: str = Query("json", description="'json', or 'ndjson' to stream one reservation per line")
+):
+    """
+    Retrieve reservations of several rooms over a date range, grouped by room and date.
+
     Args:
-        room_id (str): Room ID to filter by.
-        date (str): Date (YYYY-MM-DD) to filter by.
+        start_date (str): First date (YYYY-MM-DD), inclusive.
+        end_date (str): Last date (YYYY-MM-DD), inclusive.
+        room_ids (List[str], optional): Room IDs to include.
+        include (str, optional): 'details' to return popup details with each row.
+        format (str): 'ndjson' streams rows room by room instead of grouping them.
 
     Returns:
-        dict: Reservation list with start and end time fields parsed.
+        dict: Reservations grouped as {room_id: {date: [reservation, ...]}}.
     """
+    validate_date_range(start_date, end_date)
+    validate_format(format)
+
+    include_details = include == "details"
+    room_ids = validate_room_ids(room_ids)
+    if format == "ndjson":
+        return ndjson_response(
+            iter_reservations_by_range(room_ids, start_date, end_date, include_details), include_details
+        )
+
     try:
-        reservations = get_reservations_by_filter(room_id, date)
-        for r in reservations:
-            extract_time_fields(r)
+        grouped = get_reservations_by_range(room_ids, start_date, end_date, include_details)
+        data = {
+            room: {
+                date: [ReservationResponse.from_row(r, include_details) for r in reservations]
+                for date, reservations in by_date.items()
+            }
+            for room, by_date in grouped.items()
+        }
+        count = sum(len(reservations) for by_date in data.values() for reservations in by_date.values())
+
+        return conditional_response(request, ReservationRangeResponse(
+            success=True,
+            count=count,
+            data=data
+        ))
+    except Exception as e:
+        return FastJSONResponse({
+            "success": False,
+            "error": str(e)
+        })
+
+
+@router.get("/api/reservations/changes")
+def get_reservation_changes(
+    since: int = Query(0, ge=0, description="Last change log version the client has applied"),
+    room_ids: List[str] = Query(None, description="Room IDs to return changes of, all rooms if omitted"),
+    limit: int = Query(None, ge=1, description="Maximum number of change log entries per page")
+):
+    """
+    Return reservation inserts, updates and deletes made since a change log version.
+
+    Clients apply the changes in order and pass the returned version as the
+    next since, repeating while has_more is true. With "reset", the log was
+    compacted past since: the client refetches the data and continues from
+    the returned version. Stream event IDs are change log versions too.
+
+    Args:
+        since (int): Last version the client has applied.
+        room_ids (List[str], optional): Rooms to return changes of.
+        limit (int, optional): Maximum entries per page.
 
+    Returns:
+        dict: Changes oldest first with the next version to sync from.
+    """
+    if room_ids:
+        validate_room_ids(room_ids)
+    try:
         return {
             "success": True,
-            "count": len(reservations),
-            "data": reservations
+            **get_changes(since, room_ids, limit)
         }
     except Exception as e:
         return {
@@ -103,8 +351,184 @@ def get_reservations(
         }
 
 
+@router.get("/api/reservations/stream")
+async def stream_reservation_changes(
+    request: Request,
+    room_ids: List[str] = Query(None, description="Room IDs to receive changes of, all rooms if omitted"),
+    start_date: str = Query(None, description="First date (YYYY-MM-DD) of changes to receive"),
+    end_date: str = Query(None, description="Last date (YYYY-MM-DD) of changes to receive")
+):
+    """
+    Stream reservation inserts, updates and deletes as Server-Sent Events.
+
+    Events are pushed by crawls as soon as their writes are committed. Each
+    event carries the change as JSON with its "seq", the change log version
+    when the log is enabled, as the SSE id. A client
+    that falls too far behind receives a "resync" event and should refetch.
+    Idle streams receive a keep-alive comment every HEARTBEAT_SECONDS.
+
+    Args:
+        room_ids (List[str], optional): Rooms to receive changes of.
+        start_date (str, optional): First date of changes to receive.
+        end_date (str, optional): Last date of changes to receive.
+
+    Returns:
+        StreamingResponse: text/event-stream response, or 503 if too many clients are subscribed.
+    """
+    if room_ids:
+        validate_room_ids(room_ids)
+    for date in (start_date, end_date):
+        if date:
+            try:
+                datetime.strptime(date, "%Y-%m-%d")
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+
+    subscription = change_broadcaster.subscribe(room_ids, start_date, end_date)
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Too many event stream subscribers")
+
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                data = dumps(event).decode()
+                yield f"id: {event.get('seq', '')}\nevent: {event['type']}\ndata: {data}\n\n"
+        finally:
+            change_broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/api/reservations/day")
+def get_reservations_day(
+    request: Request,
+    date: str = Query(..., description="Date (YYYY-MM-DD)"),
+    room_ids: List[str] = Query(None, description="Room IDs to include, all rooms if omitted")
+):
+    """
+    Retrieve the day view of several rooms: their reservations on a date with popup details.
+
+    Each room is served from its day snapshot, maintained by the crawler, so a
+    page load costs one storage read instead of one query per room. Rooms
+    without a snapshot fall back to a reservation query.
+
+    Args:
+        date (str): Date (YYYY-MM-DD).
+        room_ids (List[str], optional): Room IDs to include.
+
+    Returns:
+        dict: Reservations grouped as {room_id: [reservation, ...]}.
+    """
+    validate_date_range(date, date)
+    room_ids = validate_room_ids(room_ids)
+
+    try:
+        rows, snapshot_rooms = get_day_view(room_ids, date)
+        data = {
+            room: [ReservationResponse.from_row(r, include_details=True) for r in reservations]
+            for room, reservations in rows.items()
+        }
+
+        return conditional_response(request, DayViewResponse(
+            success=True,
+            date=date,
+            count=sum(len(reservations) for reservations in data.values()),
+            snapshot_rooms=snapshot_rooms,
+            data=data
+        ))
+    except Exception as e:
+        return FastJSONResponse({
+            "success": False,
+            "error": str(e)
+        })
+
+
+@router.get("/api/availability")
+def get_availability(
+    request: Request,
+    start_date: str = Query(..., description="First date (YYYY-MM-DD), inclusive"),
+    end_date: str = Query(None, description="Last date (YYYY-MM-DD), inclusive; start_date if omitted"),
+    room_ids: List[str] = Query(None, description="Room IDs to include, all rooms if omitted"),
+    min_minutes: int = Query(None, ge=1, description="Shortest free slot reported, in minutes")
+):
+    """
+    List the free slots of rooms within opening hours over a date range.
+
+    Served from the in-memory availability index, so no storage read is made
+    once a room has been loaded.
+
+    Args:
+        start_date (str): First date (YYYY-MM-DD), inclusive.
+        end_date (str, optional): Last date (YYYY-MM-DD), inclusive.
+        room_ids (List[str], optional): Room IDs to include.
+        min_minutes (int, optional): Shortest free slot reported.
+
+    Returns:
+        dict: Free slots grouped as {room_id: {date: [{start_time, end_time}, ...]}}.
+    """
+    end_date = end_date or start_date
+    validate_date_range(start_date, end_date)
+    room_ids = validate_room_ids(room_ids)
+
+    return conditional_response(request, {
+        "success": True,
+        "data": get_free_slots(room_ids, start_date, end_date, min_minutes)
+    })
+
+
+@router.get("/api/availability/free-rooms")
+def get_available_rooms(
+    request: Request,
+    date: str = Query(..., description="Date (YYYY-MM-DD)"),
+    start_time: str = Query(..., description="Start of the wanted time span (HH:MM)"),
+    end_time: str = Query(..., description="End of the wanted time span (HH:MM)"),
+    room_ids: List[str] = Query(None, description="Room IDs to check, all rooms if omitted")
+):
+    """
+    List the rooms that are free for a whole time span on a date.
+
+    Args:
+        date (str): Date (YYYY-MM-DD).
+        start_time (str): Start of the time span (HH:MM).
+        end_time (str): End of the time span (HH:MM).
+        room_ids (List[str], optional): Room IDs to check.
+
+    Returns:
+        dict: IDs of the free rooms.
+    """
+    validate_date_range(date, date)
+    start, end = parse_minutes(start_time), parse_minutes(end_time)
+    if start is None or end is None:
+        raise HTTPException(status_code=400, detail="Times must be in HH:MM format")
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end_time must be after start_time")
+    room_ids = validate_room_ids(room_ids)
+
+    free_rooms = get_free_rooms(room_ids, date, start, end)
+    return conditional_response(request, {
+        "success": True,
+        "date": date,
+        "start_time": start_time,
+        "end_time": end_time,
+        "count": len(free_rooms),
+        "data": free_rooms
+    })
+
+
 @router.get("/api/reservations/{room_id}/{reservation_id}/details")
-def get_popup_details(room_id: str, reservation_id: str):
+def get_popup_details(room_id: str, reservation_id: str, request: Request):
     """
     Get parsed popup details for a specific reservation document.
 
@@ -123,27 +547,15 @@ def get_popup_details(room_id: str, reservation_id: str):
             "data": []
         }
 
-    formatted_data = []
-    for d in details:
-        if d["key"] in ["start_time", "end_time"]:
-            formatted_data.append(d)
-        elif d["key"] == "일시":
-            match = re.search(r"\d{8} ~ \d{8}\s+(\d{2}:\d{2}) ~ (\d{2}:\d{2})", d["value"].replace("\n", "").replace("\t", "").strip())
-            if match:
-                formatted_data.append({"key": "start_time", "value": format_time(match.group(1))})
-                formatted_data.append({"key": "end_time", "value": format_time(match.group(2))})
-        else:
-            formatted_data.append(d)
-
-    return {
-        "status": "ok",
-        "reservation_id": reservation_id,
-        "data": formatted_data
-    }
+    return conditional_response(request, PopupDetailsResponse(
+        status="ok",
+        reservation_id=reservation_id,
+        data=format_popup_details(details)
+    ))
 
 
 @router.get("/api/popup-details/{room_id}/{reservation_id}")
-def get_popup_details_raw(room_id: str, reservation_id: str):
+def get_popup_details_raw(room_id: str, reservation_id: str, request: Request):
     """
     Get raw popup detail key-value data for a reservation.
 
@@ -157,37 +569,100 @@ def get_popup_details_raw(room_id: str, reservation_id: str):
     details = get_popup_details_by_reservation_id(room_id, reservation_id)
     if not details:
         raise HTTPException(status_code=404, detail="Reservation not found")
-    return {d["key"]: d["value"] for d in details}
+    return conditional_response(request, {d["key"]: d["value"] for d in details})
 
 
-def format_time(time_str: str) -> str:
+def validate_date_range(start_date: str, end_date: str) -> None:
     """
-    Format time string to HH:MM, fallback to original on failure.
+    Check a date range query, raising 400 if it is malformed or longer than MAX_RANGE_DAYS.
 
     Args:
-        time_str (str): Raw time string.
-
-    Returns:
-        str: Validated HH:MM string or original.
+        start_date (str): First date (YYYY-MM-DD), inclusive.
+        end_date (str): Last date (YYYY-MM-DD), inclusive.
     """
     try:
-        return datetime.strptime(time_str, "%H:%M").strftime("%H:%M")
+        start = datetime.strptime(start_date, "%Y-%m-%d")
+        end = datetime.strptime(end_date, "%Y-%m-%d")
     except ValueError:
-        return time_str
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    if end < start:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range must not exceed {MAX_RANGE_DAYS} days")
 
 
-def extract_time_fields(reservation: dict) -> None:
+def validate_room_ids(room_ids: list) -> list:
     """
-    Extracts time range from '일시' field in reservation data.
+    Default to every room and reject unknown room IDs with 400.
 
     Args:
-        reservation (dict): Reservation dictionary.
+        room_ids (list): Requested room IDs, or None.
 
     Returns:
-        None: Modifies dictionary in-place.
+        list: Room IDs to query.
     """
-    ilsi = reservation.get("일시", "")
-    match = re.search(r"(\d{8}) ~ (\d{8})\s+(\d{2}:\d{2}) ~ (\d{2}:\d{2})", ilsi)
-    if match:
-        reservation["start_time"] = match.group(3)
-        reservation["end_time"] = match.group(4)
+    if not room_ids:
+        return list(ROOM_ID_MAPPING.values())
+    unknown = [room_id for room_id in room_ids if room_id not in ROOM_ID_MAPPING.values()]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown room IDs: {', '.join(unknown)}")
+    return room_ids
+
+
+def validate_format(format: str) -> None:
+    """Reject a response format other than RESPONSE_FORMATS with 400."""
+    if format not in RESPONSE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(RESPONSE_FORMATS)}")
+
+
+def ndjson_response(reservations, include_details: bool = False) -> StreamingResponse:
+    """
+    Stream reservations as newline-delimited JSON, one row per line.
+
+    Rows are serialized as they are produced by the generator, so nothing is
+    accumulated in memory. A failure mid-stream is reported as a final
+    {"success": false, "error": ...} line.
+
+    Args:
+        reservations: Iterator of reservation dictionaries.
+        include_details (bool): Whether rows carry popup details under "details".
+
+    Returns:
+        StreamingResponse: application/x-ndjson response.
+    """
+    def lines():
+        try:
+            for r in reservations:
+                yield dumps(ReservationResponse.from_row(r, include_details)) + b"\n"
+        except Exception as e:
+            yield dumps({"success": False, "error": str(e)}) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def conditional_response(request: Request, payload) -> Response:
+    """
+    Serialize a response body once, answering 304 if the client's ETag is current.
+
+    The ETag is the hash of the serialized bytes, so the body is encoded a
+    single time for both. Reads are served from the in-process cache when
+    warm, so a revalidation whose content did not change costs no Firestore
+    read and no body transfer.
+
+    Args:
+        request (Request): Incoming request carrying If-None-Match.
+        payload: Response model or JSON-serializable response body.
+
+    Returns:
+        Response: The JSON body with ETag and Cache-Control, or a bodiless 304.
+    """
+    body = dumps(payload)
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    client_etags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    if etag in client_etags or "*" in client_etags:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -3,13 +3,69 @@ from sys import path
 
 path.insert(0, dirname(__file__))
 
-from .firestore_dao import (
-    get_all_reservations, 
-    get_reservations_by_filter,
-    get_popup_details_by_reservation_id,
-    upsert_reservation, 
-    find_reservation, 
-    add_popup_details, 
-    sync_reservations,
-    hash_reservation
-)
\ No newline at end of file
+from .base_dao import (
+    STORAGE_BACKEND,
+    STORAGE_ONLY_FIELDS,
+    ReservationIndex,
+    hash_reservation,
+    invalidate_cached_reservations,
+    invalidate_cached_popup_details,
+    render_day_snapshot,
+    reservation_cache
+)
+
+# Only the selected backend is imported, so the SQLite backend runs without Firebase credentials
+if STORAGE_BACKEND == "sqlite":
+    from .sqlite_dao import (
+        get_all_reservations,
+        get_reservations_by_filter,
+        get_reservations_by_range,
+        iter_reservations,
+        iter_reservations_by_range,
+        get_popup_details_by_reservation_id,
+        upsert_reservation,
+        find_reservation,
+        load_existing_reservations,
+        add_popup_details,
+        sync_reservations,
+        prune_reservations_before,
+        prune_orphaned_popup_details,
+        migrate_popup_details_to_embedded,
+        load_day_snapshot_hashes,
+        write_day_snapshot,
+        delete_day_snapshot,
+        get_day_snapshots,
+        prune_day_snapshots_before,
+        append_changes,
+        get_changes_since,
+        compact_change_log,
+        BatchWriter
+    )
+elif STORAGE_BACKEND == "firestore":
+    from .firestore_dao import (
+        get_all_reservations,
+        get_reservations_by_filter,
+        get_reservations_by_range,
+        iter_reservations,
+        iter_reservations_by_range,
+        get_popup_details_by_reservation_id,
+        upsert_reservation,
+        find_reservation,
+        load_existing_reservations,
+        add_popup_details,
+        sync_reservations,
+        prune_reservations_before,
+        prune_orphaned_popup_details,
+        migrate_popup_details_to_embedded,
+        load_day_snapshot_hashes,
+        write_day_snapshot,
+        delete_day_snapshot,
+        get_day_snapshots,
+        prune_day_snapshots_before,
+        append_changes,
+        get_changes_since,
+        compact_change_log,
+        BatchWriter
+    )
+else:
+    raise RuntimeError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
@@ -0,0 +1,302 @@
+"""
+Backend-independent parts of the reservation DAO.
+
+Every storage backend module (firestore_dao, sqlite_dao) implements the same
+set of DAO functions and a BatchWriter subclass; `cruds` re-exports the module
+selected by STORAGE_BACKEND together with the shared helpers below.
+"""
+
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from utils import load_storage_config, load_cache_config, load_retention_config, observe, room_label, STORAGE_SECONDS, STORAGE_DOCUMENTS
+from .reservation_cache import ReservationCache
+
+_storage_config = load_storage_config()
+
+# Storage backend: "firestore" or "sqlite"; the STORAGE_BACKEND env var overrides config.yaml
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", _storage_config.get("backend", "firestore")).lower()
+
+# Maximum number of operations committed together (Firestore's WriteBatch limit)
+MAX_BATCH_SIZE = 500
+
+# Popup details layout: "embedded" map field or legacy "subcollection"
+POPUP_DETAILS_FORMAT = _storage_config.get("popup_details", "embedded")
+POPUP_DETAILS_FIELD = "popup_details"
+
+# Storage-only fields left out of day snapshot rows and change log entries (embedded details become "details")
+STORAGE_ONLY_FIELDS = {POPUP_DETAILS_FIELD, load_retention_config().get("ttl_field")}
+
+_cache_config = load_cache_config()
+reservation_cache = ReservationCache(
+    max_entries=_cache_config.get("max_entries", 1024),
+    ttl=_cache_config.get("ttl", 300)
+)
+
+
+class BaseBatchWriter:
+    """
+    Collects storage mutations and commits them in chunks.
+
+    Use it as a context manager; pending operations are committed on exit.
+    Backends implement `_commit`, which must apply a chunk atomically so a
+    failed chunk can be retried as a whole. Commits are recorded in the storage
+    metrics under room_id when given.
+    """
+
+    def __init__(self, max_batch_size: int = MAX_BATCH_SIZE, max_retries: int = 3, delay: float = 1,
+                 on_chunk_committed=None, room_id: str = None):
+        self.max_batch_size = max_batch_size
+        self.max_retries = max_retries
+        self.delay = delay
+        self.on_chunk_committed = on_chunk_committed
+        self.room_id = room_id
+        self.committed_count = 0
+        self.commit_count = 0
+        self._ops = []
+        self._callbacks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        return False
+
+    def set(self, ref, data: dict, merge: bool = False):
+        """Queue a document write."""
+        self._ops.append(("merge" if merge else "set", ref, data))
+        if len(self._ops) >= self.max_batch_size:
+            self.flush()
+
+    def delete(self, ref):
+        """Queue a document deletion."""
+        self._ops.append(("delete", ref, None))
+        if len(self._ops) >= self.max_batch_size:
+            self.flush()
+
+    def after_commit(self, callback):
+        """
+        Run callback once the currently queued operations are committed.
+
+        Callbacks also run if the flush fails, since the chunks committed
+        before the failure are already visible to readers.
+        """
+        self._callbacks.append(callback)
+
+    def flush(self):
+        """
+        Commit all pending operations in chunks of at most max_batch_size.
+
+        Raises:
+            Exception: The last commit error if a chunk keeps failing after retries.
+        """
+        try:
+            while self._ops:
+                chunk = self._ops[:self.max_batch_size]
+                with observe(STORAGE_SECONDS, backend=STORAGE_BACKEND, operation="batch_commit", room_id=self.room_id):
+                    self._commit(chunk)
+                STORAGE_DOCUMENTS.labels(STORAGE_BACKEND, "batch_commit", room_label(self.room_id)).inc(len(chunk))
+                del self._ops[:len(chunk)]
+                self.committed_count += len(chunk)
+                self.commit_count += 1
+                if self.on_chunk_committed is not None:
+                    self.on_chunk_committed(len(chunk))
+        finally:
+            # Runs on failure too: earlier chunks are committed and must not be served stale
+            callbacks, self._callbacks = self._callbacks, []
+            for callback in callbacks:
+                callback()
+
+    def _commit(self, chunk: list):
+        raise NotImplementedError
+
+
+def invalidate_cached_reservations(room_id: str, date: str = None, batch: BaseBatchWriter = None):
+    """
+    Drops cached reservation reads affected by a write to a room and date.
+
+    With a batch, invalidation happens once the batch is committed so readers
+    cannot re-cache the old data in between.
+
+    Args:
+        room_id (str): Room identifier.
+        date (str, optional): Written date. Every date of the room when omitted.
+        batch (BaseBatchWriter, optional): Defer invalidation until the batch commits.
+
+    Returns:
+        None
+    """
+    def invalidate():
+        if date is None:
+            reservation_cache.invalidate(("room", room_id))
+            reservation_cache.invalidate(("room", None))
+            return
+        for scope_room in (room_id, None):
+            for scope_date in (date, None):
+                reservation_cache.invalidate(("reservations", scope_room, scope_date))
+
+    if batch is not None:
+        batch.after_commit(invalidate)
+    else:
+        invalidate()
+
+
+def invalidate_cached_popup_details(room_id: str, reservation_id: str, batch: BaseBatchWriter = None):
+    """
+    Drops cached popup details of a reservation.
+
+    Args:
+        room_id (str): Room identifier.
+        reservation_id (str): Reservation identifier.
+        batch (BaseBatchWriter, optional): Defer invalidation until the batch commits.
+
+    Returns:
+        None
+    """
+    def invalidate():
+        reservation_cache.invalidate(("details", room_id, reservation_id))
+
+    if batch is not None:
+        batch.after_commit(invalidate)
+    else:
+        invalidate()
+
+
+class ReservationIndex:
+    """
+    In-memory index of stored reservations of one room.
+
+    Reservations are indexed by (date, event) and by document ID so the crawler
+    can diff scraped rows without issuing one query per row.
+
+    If several documents share a (date, event) key, the key resolves to the
+    one stored under the key's hash_reservation ID, or else to the first one
+    added; the crawl leaves the others out of its crawled IDs, so
+    sync_reservations deletes them.
+    """
+
+    def __init__(self):
+        self.by_key = {}
+        self.by_id = {}
+
+    def add(self, reservation_id: str, data: dict):
+        """Add a stored reservation to the index."""
+        self.by_id[reservation_id] = data
+        key = (data.get("date"), data.get("event"))
+        if key not in self.by_key or reservation_id == hash_reservation(data):
+            self.by_key[key] = reservation_id
+
+    def find(self, date: str, event: str):
+        """
+        Looks up a reservation by date and event, like find_reservation.
+
+        A document whose stored date or event no longer matches the values its
+        ID was hashed from is still found under its hash_reservation ID.
+
+        Returns:
+            Tuple[str, dict]: (Document ID, Reservation data) if found, otherwise (None, None).
+        """
+        reservation_id = self.by_key.get((date, event))
+        if reservation_id is None:
+            reservation_id = hash_reservation({"date": date, "event": event})
+            if reservation_id not in self.by_id:
+                return None, None
+        return reservation_id, self.by_id[reservation_id]
+
+    def __len__(self):
+        return len(self.by_id)
+
+
+@contextmanager
+def storage_call(operation: str, room_id: str = None):
+    """
+    Time a storage backend call in the storage metrics.
+
+    Args:
+        operation (str): Operation name such as "load_existing" or "read_range".
+        room_id (str, optional): Room the call touches; all rooms when omitted.
+    """
+    with observe(STORAGE_SECONDS, backend=STORAGE_BACKEND, operation=operation, room_id=room_id):
+        yield
+
+
+def count_documents(operation: str, room_id: str, count: int):
+    """Add documents read, written or deleted by a storage call to the storage metrics."""
+    if count:
+        STORAGE_DOCUMENTS.labels(STORAGE_BACKEND, operation, room_label(room_id)).inc(count)
+
+
+def range_cache_scopes(room_id: str, start_date: str, end_date: str) -> list:
+    """
+    Cache scopes of a room's date-range read, one per covered date, so a write
+    to any of the dates drops the cached result.
+
+    Args:
+        room_id (str): Room identifier.
+        start_date (str): First date (YYYY-MM-DD, inclusive).
+        end_date (str): Last date (YYYY-MM-DD, inclusive).
+
+    Returns:
+        list: Cache scopes including the room scope.
+    """
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    days = (datetime.strptime(end_date, "%Y-%m-%d") - start).days
+    scopes = [("reservations", room_id, (start + timedelta(days=i)).strftime("%Y-%m-%d")) for i in range(days + 1)]
+    return scopes + [("room", room_id)]
+
+
+def hash_reservation(resv: dict) -> str:
+    """
+    Generates a SHA-256 hash based on reservation content.
+
+    Args:
+        resv (dict): Reservation dictionary.
+
+    Returns:
+        str: SHA-256 hash string.
+    """
+    key_fields = [resv.get("date", ""), resv.get("event", "")]
+    return hashlib.sha256("|".join(key_fields).encode()).hexdigest()
+
+
+def render_day_snapshot(room_id: str, reservations: list) -> dict:
+    """
+    Render the day snapshot document of a room from its reservations on one date.
+
+    Rows have the shape of a day query with include_details: reservation fields
+    plus "id", "room_id" and the popup details as a key/value list. Details are
+    only included with the embedded layout, where every stored reservation
+    carries them; otherwise "has_details" is False.
+
+    Args:
+        room_id (str): Room identifier.
+        reservations (list): (reservation_id, data, details) tuples; details is
+            the popup data fetched by the crawl, or None to use the stored details.
+
+    Returns:
+        dict: "reservations" rows ordered by start time and event, "has_details"
+            and the "content_hash" of both.
+    """
+    has_details = POPUP_DETAILS_FORMAT == "embedded"
+    rows = []
+    for reservation_id, data, details in reservations:
+        row = {k: v for k, v in data.items() if k not in STORAGE_ONLY_FIELDS}
+        row["id"] = reservation_id
+        row["room_id"] = room_id
+        if has_details:
+            details = details if details is not None else data.get(POPUP_DETAILS_FIELD)
+            row["details"] = [{"key": k, "value": v} for k, v in (details or {}).items()]
+        rows.append(row)
+    rows.sort(key=lambda r: (r.get("start_time") or "", r.get("event") or "", r["id"]))
+
+    body = json.dumps([rows, has_details], sort_keys=True, ensure_ascii=False, default=str)
+    return {
+        "reservations": rows,
+        "has_details": has_details,
+        "content_hash": hashlib.sha256(body.encode()).hexdigest()
+    }
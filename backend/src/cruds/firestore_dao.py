@@ -1,41 +1,133 @@
-from firebase import db
-import hashlib
+from firebase import get_db
+from utils import load_retention_config
+from .base_dao import (
+    MAX_BATCH_SIZE,
+    POPUP_DETAILS_FORMAT,
+    POPUP_DETAILS_FIELD,
+    reservation_cache,
+    BaseBatchWriter,
+    ReservationIndex,
+    invalidate_cached_reservations,
+    invalidate_cached_popup_details,
+    range_cache_scopes,
+    storage_call,
+    count_documents
+)
+import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
 # Suppress Firestore warning about positional arguments
 warnings.filterwarnings("ignore", message="Detected filter using positional arguments")
 
+_retention_config = load_retention_config()
 
-def upsert_reservation(room_id: str, reservation_id: str, data: dict):
+# Optional timestamp field for a Firestore TTL policy; None disables it
+TTL_FIELD = _retention_config.get("ttl_field")
+RETENTION_KEEP_DAYS = _retention_config.get("keep_days", 1)
+
+
+class BatchWriter(BaseBatchWriter):
+    """
+    Collects Firestore mutations and commits them in WriteBatch chunks.
+
+    Use it as a context manager; pending operations are committed on exit.
+    Each chunk is committed atomically, so a failed chunk is retried as a whole.
+    """
+
+    def replace_fields(self, ref, data: dict):
+        """Queue a write of top-level fields that replaces map values whole instead of merging them."""
+        self._ops.append(("replace_fields", ref, data))
+        if len(self._ops) >= self.max_batch_size:
+            self.flush()
+
+    def _commit(self, chunk: list):
+        for attempt in range(self.max_retries):
+            batch = get_db().batch()
+            for op, ref, data in chunk:
+                if op == "set":
+                    batch.set(ref, data)
+                elif op == "merge":
+                    batch.set(ref, data, merge=True)
+                elif op == "replace_fields":
+                    batch.set(ref, data, merge=list(data))
+                else:
+                    batch.delete(ref)
+            try:
+                batch.commit()
+                return
+            except Exception as e:
+                print(f"⚠️ batch commit failed ({len(chunk)} ops, attempt {attempt + 1}): {e}")
+                if attempt == self.max_retries - 1:
+                    raise
+                time.sleep(self.delay * 2 ** attempt)
+
+
+def upsert_reservation(room_id: str, reservation_id: str, data: dict, batch: BatchWriter = None):
     """
     Inserts or updates a reservation document under a specific room.
 
+    Fields not present in data (such as embedded popup details) are kept. With a
+    TTL field configured, the expiry timestamp is written along with the data.
+
     Args:
         room_id (str): The Firestore document ID of the room.
         reservation_id (str): The Firestore document ID of the reservation.
         data (dict): Reservation data to be written.
+        batch (BatchWriter, optional): Queue the write instead of sending it immediately.
 
     Returns:
         None
     """
-    db.collection("rooms").document(room_id).collection("reservations").document(reservation_id).set(data)
+    ref = get_db().collection("rooms").document(room_id).collection("reservations").document(reservation_id)
+    if TTL_FIELD and data.get("date"):
+        data = {**data, TTL_FIELD: _expire_at(data["date"])}
+    if batch is not None:
+        batch.set(ref, data, merge=True)
+    else:
+        ref.set(data, merge=True)
+    invalidate_cached_reservations(room_id, data.get("date"), batch)
+
 
+def _expire_at(date: str) -> datetime:
+    # Same cutoff as the retention run: kept while date >= today - keep_days
+    return datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=timezone.utc) + timedelta(days=RETENTION_KEEP_DAYS + 1)
 
-def add_popup_details(room_id: str, reservation_id: str, details: dict):
+
+def add_popup_details(room_id: str, reservation_id: str, details: dict, batch: BatchWriter = None):
     """
-    Adds detailed popup information as a subcollection under a reservation.
+    Adds detailed popup information to a reservation.
+
+    Depending on the configured storage format, details are stored as a map field
+    on the reservation document or as a subcollection under it. The map field is
+    replaced whole, so keys missing from re-fetched details do not linger.
 
     Args:
         room_id (str): Parent room document ID.
         reservation_id (str): Parent reservation document ID.
         details (dict): Dictionary of key-value pairs to be stored.
+        batch (BatchWriter, optional): Queue the writes instead of sending them immediately.
 
     Returns:
         None
     """
-    ref = db.collection("rooms").document(room_id).collection("reservations").document(reservation_id).collection("popup_details")
+    if POPUP_DETAILS_FORMAT == "embedded":
+        doc_ref = get_db().collection("rooms").document(room_id).collection("reservations").document(reservation_id)
+        if batch is not None:
+            batch.replace_fields(doc_ref, {POPUP_DETAILS_FIELD: details})
+        else:
+            doc_ref.set({POPUP_DETAILS_FIELD: details}, merge=[POPUP_DETAILS_FIELD])
+        invalidate_cached_popup_details(room_id, reservation_id, batch)
+        return
+
+    ref = get_db().collection("rooms").document(room_id).collection("reservations").document(reservation_id).collection("popup_details")
     for k, v in details.items():
-        ref.document(k).set({"key": k, "value": v})
+        if batch is not None:
+            batch.set(ref.document(k), {"key": k, "value": v})
+        else:
+            ref.document(k).set({"key": k, "value": v})
+    invalidate_cached_popup_details(room_id, reservation_id, batch)
 
 
 def find_reservation(room_id: str, date: str, event: str):
@@ -50,67 +142,226 @@ def find_reservation(room_id: str, date: str, event: str):
     Returns:
         Tuple[str, dict]: (Document ID, Reservation data) if found, otherwise (None, None).
     """
-    query = db.collection("rooms").document(room_id).collection("reservations") \
-        .where("date", "==", date).where("event", "==", event).limit(1).stream()
-    for doc in query:
+    query = get_db().collection("rooms").document(room_id).collection("reservations") \
+        .where("date", "==", date).where("event", "==", event).limit(1)
+    with storage_call("find", room_id):
+        docs = list(query.stream())
+    count_documents("find", room_id, len(docs))
+    for doc in docs:
         return doc.id, doc.to_dict()
     return None, None
 
 
-def get_all_reservations():
+def load_existing_reservations(room_id: str, start_date: str = None, end_date: str = None) -> ReservationIndex:
+    """
+    Loads all reservations of a room within a date window with a single query.
+
+    Args:
+        room_id (str): Room identifier.
+        start_date (str, optional): First date (YYYY-MM-DD, inclusive).
+        end_date (str, optional): Last date (YYYY-MM-DD, inclusive).
+
+    Returns:
+        ReservationIndex: Index of the stored reservations.
+    """
+    query = get_db().collection("rooms").document(room_id).collection("reservations")
+    if start_date:
+        query = query.where("date", ">=", start_date)
+    if end_date:
+        query = query.where("date", "<=", end_date)
+
+    index = ReservationIndex()
+    with storage_call("load_existing", room_id):
+        for doc in query.stream():
+            index.add(doc.id, doc.to_dict())
+    count_documents("load_existing", room_id, len(index))
+    return index
+
+
+def _to_reservation(doc, room_id: str, include_details: bool = False) -> dict:
+    """
+    Converts a reservation snapshot into a response dictionary.
+
+    Args:
+        doc: Firestore document snapshot.
+        room_id (str): Room identifier.
+        include_details (bool): Attach popup details as a key/value list under "details".
+
+    Returns:
+        dict: Reservation dictionary including room ID and reservation ID.
+    """
+    data = doc.to_dict()
+    embedded = data.pop(POPUP_DETAILS_FIELD, None)
+    data["id"] = doc.id
+    data["room_id"] = room_id
+    if include_details:
+        if embedded is not None:
+            data["details"] = [{"key": k, "value": v} for k, v in embedded.items()]
+        else:
+            data["details"] = _get_subcollection_details(room_id, doc.id)
+    return data
+
+
+def get_all_reservations(include_details: bool = False):
     """
     Retrieves all reservations across all rooms.
 
+    Args:
+        include_details (bool): Attach popup details to each reservation.
+
     Returns:
         List[dict]: List of all reservations including room ID and reservation ID.
     """
-    reservations = []
-    rooms = db.collection("rooms").stream()
-    for room in rooms:
-        room_id = room.id
-        sub = db.collection("rooms").document(room_id).collection("reservations").stream()
-        for resv in sub:
-            data = resv.to_dict()
-            data["id"] = resv.id
-            data["room_id"] = room_id
-            reservations.append(data)
-    return reservations
+    return list(iter_reservations(include_details=include_details))
+
+
+def _list_room_ids() -> list:
+    # list_documents also returns room documents that only exist as parents of subcollections
+    return [room.id for room in get_db().collection("rooms").list_documents()]
+
+
+def iter_reservations(room_id=None, date=None, include_details: bool = False):
+    """
+    Lazily yields reservations, optionally filtered by room and date.
+
+    Documents are consumed from Firestore's stream() one at a time and are not
+    cached, so memory stays flat regardless of the result size.
+
+    Args:
+        room_id (str, optional): Room identifier. All rooms when omitted.
+        date (str, optional): Date (YYYY-MM-DD) to filter by.
+        include_details (bool): Attach popup details to each reservation.
+
+    Yields:
+        dict: Reservation dictionary including room ID and reservation ID.
+    """
+    for rid in [room_id] if room_id else _list_room_ids():
+        query = get_db().collection("rooms").document(rid).collection("reservations")
+        if date:
+            query = query.where("date", "==", date)
+        for doc in query.stream():
+            yield _to_reservation(doc, rid, include_details)
+
+
+def iter_reservations_by_range(room_ids: list, start_date: str, end_date: str, include_details: bool = False):
+    """
+    Lazily yields reservations of several rooms over a date range, room by room.
 
+    Args:
+        room_ids (list): Room identifiers to query.
+        start_date (str): First date (YYYY-MM-DD, inclusive).
+        end_date (str): Last date (YYYY-MM-DD, inclusive).
+        include_details (bool): Attach popup details to each reservation.
 
-def get_reservations_by_filter(room_id=None, date=None):
+    Yields:
+        dict: Reservation dictionary including room ID and reservation ID.
     """
-    Retrieves filtered reservations. If room_id is provided, queries Firestore.
-    Otherwise, filters all reservations in memory.
+    for room_id in room_ids:
+        query = get_db().collection("rooms").document(room_id).collection("reservations") \
+            .where("date", ">=", start_date).where("date", "<=", end_date).order_by("date")
+        for doc in query.stream():
+            yield _to_reservation(doc, room_id, include_details)
+
+
+def get_reservations_by_filter(room_id=None, date=None, include_details: bool = False):
+    """
+    Retrieves filtered reservations. Without room_id, every room is queried.
 
     Args:
         room_id (str, optional): Room identifier to filter by.
         date (str, optional): Date to filter reservations by.
+        include_details (bool): Attach popup details to each reservation. With
+            embedded details this costs no extra reads.
 
     Returns:
         List[dict]: List of filtered reservation dictionaries.
     """
+    key = ("reservations", room_id, date, include_details)
+    cached = reservation_cache.get(key)
+    if cached is not None:
+        # Rows are shared with the cache; callers build responses from them without mutating them
+        return cached
+    scopes = [("reservations", room_id, date), ("room", room_id)]
+    generation = reservation_cache.generation(scopes)
+
     results = []
     if room_id:
-        query = db.collection("rooms").document(room_id).collection("reservations")
+        query = get_db().collection("rooms").document(room_id).collection("reservations")
         if date:
             query = query.where("date", "==", date)
-        docs = query.stream()
-        for doc in docs:
-            data = doc.to_dict()
-            data["id"] = doc.id
-            data["room_id"] = room_id
-            results.append(data)
+        with storage_call("read_filter", room_id):
+            for doc in query.stream():
+                results.append(_to_reservation(doc, room_id, include_details))
     else:
-        results = get_all_reservations()
-        if date:
-            results = [r for r in results if r.get("date") == date]
+        with storage_call("read_filter"):
+            results = list(iter_reservations(None, date, include_details))
+    count_documents("read_filter", room_id, len(results))
+
+    reservation_cache.put(key, results, scopes, generation)
     return results
 
 
+def _get_room_reservations_in_range(room_id: str, start_date: str, end_date: str, include_details: bool) -> list:
+    key = ("range", room_id, start_date, end_date, include_details)
+    cached = reservation_cache.get(key)
+    if cached is not None:
+        return cached
+    scopes = range_cache_scopes(room_id, start_date, end_date)
+    generation = reservation_cache.generation(scopes)
+
+    query = get_db().collection("rooms").document(room_id).collection("reservations") \
+        .where("date", ">=", start_date).where("date", "<=", end_date)
+    with storage_call("read_range", room_id):
+        results = [_to_reservation(doc, room_id, include_details) for doc in query.stream()]
+    count_documents("read_range", room_id, len(results))
+
+    reservation_cache.put(key, results, scopes, generation)
+    return results
+
+
+def get_reservations_by_range(room_ids: list, start_date: str, end_date: str, include_details: bool = False) -> dict:
+    """
+    Retrieves reservations of several rooms over a date range.
+
+    One range query is issued per room and the rooms are queried concurrently.
+
+    Args:
+        room_ids (list): Room identifiers to query.
+        start_date (str): First date (YYYY-MM-DD, inclusive).
+        end_date (str): Last date (YYYY-MM-DD, inclusive).
+        include_details (bool): Attach popup details to each reservation.
+
+    Returns:
+        Dict[str, Dict[str, List[dict]]]: Reservations grouped by room ID and date.
+    """
+    if not room_ids:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=len(room_ids)) as pool:
+        results = pool.map(
+            lambda room_id: _get_room_reservations_in_range(room_id, start_date, end_date, include_details),
+            room_ids
+        )
+        grouped = {}
+        for room_id, reservations in zip(room_ids, results):
+            by_date = grouped.setdefault(room_id, {})
+            for r in sorted(reservations, key=lambda r: r.get("date", "")):
+                by_date.setdefault(r.get("date"), []).append(r)
+    return grouped
+
+
+def _get_subcollection_details(room_id: str, reservation_id: str):
+    ref = get_db().collection("rooms").document(room_id).collection("reservations").document(reservation_id).collection("popup_details")
+    return [{"key": doc.id, **doc.to_dict()} for doc in ref.stream()]
+
+
 def get_popup_details_by_reservation_id(room_id: str, reservation_id: str):
     """
     Fetches popup details for a specific reservation.
 
+    Embedded details are read from the reservation document; reservations that
+    have not been migrated yet fall back to the popup_details subcollection.
+
     Args:
         room_id (str): Room identifier.
         reservation_id (str): Reservation identifier.
@@ -118,54 +369,472 @@ def get_popup_details_by_reservation_id(room_id: str, reservation_id: str):
     Returns:
         List[dict]: List of detail entries as dictionaries with key/value.
     """
-    ref = db.collection("rooms").document(room_id).collection("reservations").document(reservation_id).collection("popup_details")
-    return [{"key": doc.id, **doc.to_dict()} for doc in ref.stream()]
+    key = ("details", room_id, reservation_id)
+    cached = reservation_cache.get(key)
+    if cached is not None:
+        return cached
+    scopes = [key, ("room", room_id)]
+    generation = reservation_cache.generation(scopes)
+
+    details = None
+    with storage_call("read_details", room_id):
+        if POPUP_DETAILS_FORMAT == "embedded":
+            doc = get_db().collection("rooms").document(room_id).collection("reservations").document(reservation_id).get()
+            embedded = (doc.to_dict() or {}).get(POPUP_DETAILS_FIELD) if doc.exists else None
+            if embedded is not None:
+                details = [{"key": k, "value": v} for k, v in embedded.items()]
+        if details is None:
+            details = _get_subcollection_details(room_id, reservation_id)
+
+    reservation_cache.put(key, details, scopes, generation)
+    return details
+
+
+def migrate_popup_details_to_embedded(room_id: str = None) -> dict:
+    """
+    Moves popup details from the subcollection layout into the reservation document.
 
+    Args:
+        room_id (str, optional): Room to migrate. All rooms when omitted.
 
-def delete_reservation(room_id: str, reservation_id: str):
+    Returns:
+        dict: Number of migrated reservations and deleted subcollection documents.
     """
-    Deletes a reservation document.
+    room_ids = [room_id] if room_id else _list_room_ids()
+    migrated_count = 0
+    deleted_count = 0
+
+    with BatchWriter() as batch:
+        for rid in room_ids:
+            for doc in get_db().collection("rooms").document(rid).collection("reservations").stream():
+                detail_docs = list(doc.reference.collection("popup_details").stream())
+                if not detail_docs:
+                    continue
+                details = {d.id: d.to_dict().get("value") for d in detail_docs}
+                batch.set(doc.reference, {POPUP_DETAILS_FIELD: details}, merge=True)
+                for d in detail_docs:
+                    batch.delete(d.reference)
+                migrated_count += 1
+                deleted_count += len(detail_docs)
+            invalidate_cached_reservations(rid, batch=batch)
+
+    return {"migrated_count": migrated_count, "deleted_count": deleted_count}
+
+
+def delete_reservation(room_id: str, reservation_id: str, batch: BatchWriter = None):
+    """
+    Deletes a reservation document together with its popup_details subcollection.
 
     Args:
         room_id (str): Room identifier.
         reservation_id (str): Reservation identifier.
+        batch (BatchWriter, optional): Queue the deletions instead of sending them immediately.
 
     Returns:
         None
     """
-    db.collection("rooms").document(room_id).collection("reservations").document(reservation_id).delete()
+    doc = get_db().collection("rooms").document(room_id).collection("reservations").document(reservation_id).get()
+    if doc.exists:
+        _delete_reservation_tree(doc, batch)
+    invalidate_cached_popup_details(room_id, reservation_id, batch)
+    invalidate_cached_reservations(room_id, batch=batch)
 
 
-def hash_reservation(resv: dict) -> str:
+def sync_reservations(room_id: str, start_date: str, end_date: str, crawled_ids: set[str],
+                      batch: BatchWriter = None) -> list:
     """
-    Generates a SHA-256 hash based on reservation content.
+    Removes stored reservations within a crawled date range that were not crawled.
 
     Args:
-        resv (dict): Reservation dictionary.
+        room_id (str): Room identifier.
+        start_date (str): First crawled date (YYYY-MM-DD, inclusive).
+        end_date (str): Last crawled date (YYYY-MM-DD, inclusive).
+        crawled_ids (set[str]): Set of valid IDs that should be kept.
+        batch (BatchWriter, optional): Queue the deletions instead of sending them immediately.
+
+    Returns:
+        list: (reservation_id, date) of the deleted reservations.
+    """
+    query = get_db().collection("rooms").document(room_id).collection("reservations") \
+        .where("date", ">=", start_date).where("date", "<=", end_date)
+    with storage_call("sync", room_id):
+        docs = list(query.stream())
+    deleted = []
+    for doc in docs:
+        if doc.id not in crawled_ids:
+            _delete_reservation_tree(doc, batch)
+            invalidate_cached_popup_details(room_id, doc.id, batch)
+            deleted.append((doc.id, (doc.to_dict() or {}).get("date")))
+    for date in {date for _, date in deleted}:
+        invalidate_cached_reservations(room_id, date, batch)
+    return deleted
+
+
+def _value_size(value) -> int:
+    if isinstance(value, str):
+        return len(value.encode()) + 1
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_value_size(k) + _value_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_value_size(v) for v in value)
+    if value is None or isinstance(value, bool):
+        return 1
+    # Integers, floats and timestamps
+    return 8
+
+
+def estimate_document_size(ref, data: dict) -> int:
+    """
+    Estimates the stored size of a document using Firestore's storage size rules.
+
+    Args:
+        ref: Document reference.
+        data (dict): Document fields.
 
     Returns:
-        str: SHA-256 hash string.
+        int: Document name, field names and values plus 32 bytes of overhead.
     """
-    key_fields = [resv.get("date", ""), resv.get("event", "")]
-    return hashlib.sha256("|".join(key_fields).encode()).hexdigest()
+    name_size = sum(len(part.encode()) + 1 for part in ref.path.split("/")) + 16
+    return name_size + _value_size(data or {}) + 32
 
 
-def sync_reservations(room_id: str, date: str, crawled_ids: set[str]) -> int:
+def _delete_reservation_tree(doc, batch: BatchWriter = None) -> tuple:
     """
-    Removes outdated reservations that are no longer valid.
+    Deletes a reservation document and its popup_details subcollection.
+
+    Firestore does not delete subcollections with their parent, so they are
+    removed explicitly. Documents with embedded details are not queried.
+
+    Args:
+        doc: Reservation document snapshot.
+        batch (BatchWriter, optional): Queue the deletions instead of sending them immediately.
+
+    Returns:
+        Tuple[int, int]: Deleted subcollection documents and estimated bytes reclaimed.
+    """
+    data = doc.to_dict() or {}
+    deletions = [(doc.reference, estimate_document_size(doc.reference, data))]
+    if POPUP_DETAILS_FIELD not in data:
+        for sub in doc.reference.collection("popup_details").stream():
+            deletions.append((sub.reference, estimate_document_size(sub.reference, sub.to_dict())))
+
+    for ref, _ in deletions:
+        if batch is not None:
+            batch.delete(ref)
+        else:
+            ref.delete()
+    return len(deletions) - 1, sum(size for _, size in deletions)
+
+
+def prune_reservations_before(room_id: str, before_date: str, limit: int = None, batch: BatchWriter = None) -> dict:
+    """
+    Deletes reservations of a room dated before the given date, subtrees included.
 
     Args:
         room_id (str): Room identifier.
-        date (str): Date to match against.
-        crawled_ids (set[str]): Set of valid IDs that should be kept.
+        before_date (str): First date to keep (YYYY-MM-DD).
+        limit (int, optional): Maximum number of reservations to delete.
+        batch (BatchWriter, optional): Queue the deletions instead of sending them immediately.
 
     Returns:
-        int: Count of deleted reservations.
+        dict: Deleted reservations, deleted subcollection documents and estimated bytes reclaimed.
     """
-    query = db.collection("rooms").document(room_id).collection("reservations").where("date", "==", date)
-    delete_count = 0
-    for doc in query.stream():
-        if doc.id not in crawled_ids:
-            doc.reference.delete()
-            delete_count += 1
-    return delete_count
+    query = get_db().collection("rooms").document(room_id).collection("reservations") \
+        .where("date", "<", before_date)
+    if limit:
+        query = query.limit(limit)
+
+    result = {"deleted_count": 0, "subdocument_count": 0, "bytes_reclaimed": 0}
+    with storage_call("prune", room_id):
+        docs = list(query.stream())
+    for doc in docs:
+        subdocument_count, size = _delete_reservation_tree(doc, batch)
+        invalidate_cached_reservations(room_id, (doc.to_dict() or {}).get("date"), batch)
+        invalidate_cached_popup_details(room_id, doc.id, batch)
+        result["deleted_count"] += 1
+        result["subdocument_count"] += subdocument_count
+        result["bytes_reclaimed"] += size
+    return result
+
+
+def prune_orphaned_popup_details(room_id: str, limit: int = None, batch: BatchWriter = None) -> dict:
+    """
+    Deletes popup_details subcollections whose reservation document no longer exists.
+
+    Such orphans were left behind by earlier deletions that removed only the
+    parent document.
+
+    Args:
+        room_id (str): Room identifier.
+        limit (int, optional): Maximum number of subcollection documents to delete.
+        batch (BatchWriter, optional): Queue the deletions instead of sending them immediately.
+
+    Returns:
+        dict: Deleted subcollection documents and estimated bytes reclaimed.
+    """
+    reservations = get_db().collection("rooms").document(room_id).collection("reservations")
+    existing = {doc.id for doc in reservations.select([]).stream()}
+
+    result = {"deleted_count": 0, "subdocument_count": 0, "bytes_reclaimed": 0}
+    # list_documents also returns missing parents that only hold subcollections
+    for ref in reservations.list_documents():
+        if ref.id in existing:
+            continue
+        query = ref.collection("popup_details")
+        if limit:
+            query = query.limit(limit - result["subdocument_count"])
+        for sub in query.stream():
+            if batch is not None:
+                batch.delete(sub.reference)
+            else:
+                sub.reference.delete()
+            result["subdocument_count"] += 1
+            result["bytes_reclaimed"] += estimate_document_size(sub.reference, sub.to_dict())
+        invalidate_cached_popup_details(room_id, ref.id, batch)
+        if limit and result["subdocument_count"] >= limit:
+            break
+    return result
+
+
+def _day_snapshots(room_id: str):
+    return get_db().collection("rooms").document(room_id).collection("day_snapshots")
+
+
+def load_day_snapshot_hashes(room_id: str, start_date: str, end_date: str) -> dict:
+    """
+    Loads the content hashes of a room's day snapshots within a date range.
+
+    Only the hash field is transferred, not the rendered rows.
+
+    Args:
+        room_id (str): Room identifier.
+        start_date (str): First date (YYYY-MM-DD, inclusive).
+        end_date (str): Last date (YYYY-MM-DD, inclusive).
+
+    Returns:
+        dict: Content hash per snapshot date.
+    """
+    query = _day_snapshots(room_id).where("date", ">=", start_date).where("date", "<=", end_date) \
+        .select(["content_hash"])
+    with storage_call("load_snapshot_hashes", room_id):
+        hashes = {doc.id: (doc.to_dict() or {}).get("content_hash") for doc in query.stream()}
+    count_documents("load_snapshot_hashes", room_id, len(hashes))
+    return hashes
+
+
+def write_day_snapshot(room_id: str, date: str, snapshot: dict, batch: BatchWriter = None):
+    """
+    Writes the day snapshot document of a room, replacing the previous one.
+
+    Args:
+        room_id (str): Room identifier.
+        date (str): Snapshot date (YYYY-MM-DD), also the document ID.
+        snapshot (dict): Rendered snapshot from render_day_snapshot.
+        batch (BatchWriter, optional): Queue the write instead of sending it immediately.
+    """
+    ref = _day_snapshots(room_id).document(date)
+    data = {**snapshot, "room_id": room_id, "date": date, "updated_at": datetime.now(timezone.utc)}
+    if batch is not None:
+        batch.set(ref, data)
+    else:
+        ref.set(data)
+    invalidate_cached_reservations(room_id, date, batch)
+
+
+def delete_day_snapshot(room_id: str, date: str, batch: BatchWriter = None):
+    """
+    Deletes the day snapshot document of a room.
+
+    Args:
+        room_id (str): Room identifier.
+        date (str): Snapshot date (YYYY-MM-DD).
+        batch (BatchWriter, optional): Queue the deletion instead of sending it immediately.
+    """
+    ref = _day_snapshots(room_id).document(date)
+    if batch is not None:
+        batch.delete(ref)
+    else:
+        ref.delete()
+    invalidate_cached_reservations(room_id, date, batch)
+
+
+def get_day_snapshots(room_ids: list, date: str) -> dict:
+    """
+    Reads the day snapshots of several rooms for one date in a single round trip.
+
+    Args:
+        room_ids (list): Room identifiers.
+        date (str): Date (YYYY-MM-DD).
+
+    Returns:
+        dict: Snapshot document per room ID; rooms without a snapshot map to None.
+    """
+    snapshots = {}
+    missing = {}
+    for room_id in room_ids:
+        cached = reservation_cache.get(("snapshot", room_id, date))
+        if cached is not None:
+            snapshots[room_id] = cached or None
+        else:
+            scopes = [("reservations", room_id, date), ("room", room_id)]
+            missing[room_id] = (scopes, reservation_cache.generation(scopes))
+
+    if missing:
+        with storage_call("read_snapshot"):
+            docs = list(get_db().get_all([_day_snapshots(room_id).document(date) for room_id in missing]))
+        found = {doc.reference.parent.parent.id: doc.to_dict() for doc in docs if doc.exists}
+        count_documents("read_snapshot", None, len(found))
+        for room_id, (scopes, generation) in missing.items():
+            snapshot = found.get(room_id)
+            # A missing snapshot is cached as {} so fallbacks don't re-read it
+            reservation_cache.put(("snapshot", room_id, date), snapshot or {}, scopes, generation)
+            snapshots[room_id] = snapshot
+
+    return {room_id: snapshots[room_id] for room_id in room_ids}
+
+
+def prune_day_snapshots_before(room_id: str, before_date: str, batch: BatchWriter = None) -> int:
+    """
+    Deletes a room's day snapshots dated before the given date.
+
+    Args:
+        room_id (str): Room identifier.
+        before_date (str): First date to keep (YYYY-MM-DD).
+        batch (BatchWriter, optional): Queue the deletions instead of sending them immediately.
+
+    Returns:
+        int: Count of deleted snapshots.
+    """
+    query = _day_snapshots(room_id).where("date", "<", before_date).select([])
+    with storage_call("prune_snapshots", room_id):
+        docs = list(query.stream())
+    for doc in docs:
+        delete_day_snapshot(room_id, doc.id, batch)
+    return len(docs)
+
+
+def _change_log():
+    return get_db().collection("change_log")
+
+
+def _change_log_meta():
+    return get_db().collection("meta").document("change_log")
+
+
+def append_changes(changes: list) -> list:
+    """
+    Appends reservation changes to the change log under increasing versions.
+
+    Each block of versions is reserved on the meta/change_log counter and its
+    entries are written in the same transaction. Transactions serialize on
+    the counter, so once a version is visible every lower version is
+    committed too, and concurrent crawls never share a version.
+
+    Args:
+        changes (list): Change dictionaries with type, room_id, id, date and,
+            for upserts, reservation.
+
+    Returns:
+        list: Version assigned to each change, in order.
+    """
+    if not changes:
+        return []
+    from google.cloud import firestore
+
+    meta = _change_log_meta()
+    created_at = datetime.now(timezone.utc)
+
+    @firestore.transactional
+    def append(transaction, block):
+        snapshot = meta.get(transaction=transaction)
+        first = ((snapshot.to_dict() or {}).get("version", 0) if snapshot.exists else 0) + 1
+        transaction.set(meta, {"version": first + len(block) - 1}, merge=True)
+        for version, change in enumerate(block, first):
+            transaction.set(_change_log().document(f"{version:012d}"),
+                            {**change, "version": version, "created_at": created_at})
+        return first
+
+    versions = []
+    # One write of each transaction goes to the counter
+    block_size = MAX_BATCH_SIZE - 1
+    with storage_call("append_changes"):
+        for start in range(0, len(changes), block_size):
+            block = changes[start:start + block_size]
+            first = append(get_db().transaction(), block)
+            versions.extend(range(first, first + len(block)))
+    count_documents("append_changes", None, len(changes))
+    return versions
+
+
+def get_changes_since(since: int, room_ids: list = None, limit: int = 500) -> dict:
+    """
+    Reads change log entries newer than a version, oldest first.
+
+    Args:
+        since (int): Last version the client has applied.
+        room_ids (list, optional): Rooms to return changes of. All rooms when omitted.
+        limit (int): Maximum number of entries scanned.
+
+    Returns:
+        dict: "changes", "version" (last scanned version, to pass as the next
+            since), "latest_version", "has_more" and "floor" (entries up to this
+            version were compacted away).
+    """
+    with storage_call("read_changes"):
+        meta = (_change_log_meta().get().to_dict() or {})
+        query = _change_log().where("version", ">", since).order_by("version").limit(limit)
+        entries = [doc.to_dict() for doc in query.stream()]
+    count_documents("read_changes", None, len(entries))
+
+    wanted = set(room_ids) if room_ids else None
+    latest = meta.get("version", 0)
+    last = entries[-1]["version"] if entries else max(since, latest)
+    return {
+        "changes": [e for e in entries if wanted is None or e.get("room_id") in wanted],
+        "version": last,
+        "latest_version": latest,
+        "has_more": last < latest,
+        "floor": meta.get("floor", 0)
+    }
+
+
+def compact_change_log(max_entries: int) -> dict:
+    """
+    Shrinks the change log without changing what a sync from any retained version yields.
+
+    Entries superseded by a newer entry for the same reservation are dropped;
+    upserts carry the whole row, so the newest entry alone rebuilds it. Then
+    entries older than the newest max_entries versions are dropped and
+    the floor is raised so clients syncing from before it refetch.
+
+    Args:
+        max_entries (int): Versions kept behind the latest one.
+
+    Returns:
+        dict: Numbers of superseded and truncated entries deleted.
+    """
+    meta = _change_log_meta().get().to_dict() or {}
+    floor = max(meta.get("floor", 0), meta.get("version", 0) - max_entries)
+
+    result = {"superseded_count": 0, "truncated_count": 0}
+    with storage_call("compact_changes"):
+        with BatchWriter() as batch:
+            for doc in _change_log().where("version", "<=", floor).select([]).stream():
+                batch.delete(doc.reference)
+                result["truncated_count"] += 1
+
+            seen = set()
+            query = _change_log().where("version", ">", floor).order_by("version", direction="DESCENDING") \
+                .select(["room_id", "id"])
+            for doc in query.stream():
+                data = doc.to_dict() or {}
+                key = (data.get("room_id"), data.get("id"))
+                if key in seen:
+                    batch.delete(doc.reference)
+                    result["superseded_count"] += 1
+                seen.add(key)
+        if floor > meta.get("floor", 0):
+            _change_log_meta().set({"floor": floor}, merge=True)
+    return result
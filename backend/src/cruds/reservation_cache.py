@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Invalidation counters are kept per hashed scope in a fixed number of slots;
+# scopes sharing a slot only cost an occasional skipped put
+GENERATION_SLOTS = 4096
+
+
+class ReservationCache:
+    """
+    Thread-safe TTL/LRU cache for reservation reads.
+
+    Every entry is registered under one or more scopes, e.g. (room_id, date),
+    so writers can invalidate exactly the entries affected by a change.
+
+    Readers take the generation of their scopes before reading storage and
+    pass it to put, which skips the value if a scope was invalidated in the
+    meantime, so a read racing a write cannot re-cache the old data.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+        self._entries = OrderedDict()
+        self._scopes = {}
+        self._generations = [0] * GENERATION_SLOTS
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the cached value for key, or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at, _ = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self, scopes: list) -> tuple:
+        """
+        Return the invalidation generation of scopes, taken before a storage read.
+        """
+        with self._lock:
+            return self._generation(scopes)
+
+    def put(self, key, value, scopes: list, generation: tuple = None):
+        """
+        Store a value under key and register it in the given scopes.
+
+        With a generation from before the read, the value is dropped if any
+        of the scopes was invalidated since.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation(scopes):
+                self.stale_puts += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl, scopes)
+            for scope in scopes:
+                self._scopes.setdefault(scope, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, scope) -> int:
+        """
+        Drop every entry registered under scope.
+
+        Returns:
+            int: Number of dropped entries.
+        """
+        with self._lock:
+            self._generations[hash(scope) % GENERATION_SLOTS] += 1
+            keys = list(self._scopes.get(scope, ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._scopes.clear()
+            self._epoch += 1
+
+    def stats(self) -> dict:
+        """
+        Return cache counters.
+
+        Returns:
+            dict: Size, hit/miss/eviction/invalidation/stale put counters and hit rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "stale_puts": self.stale_puts,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def _generation(self, scopes: list) -> tuple:
+        return (self._epoch, *(self._generations[hash(scope) % GENERATION_SLOTS] for scope in scopes))
+
+    def _remove(self, key):
+        _, _, scopes = self._entries.pop(key)
+        for scope in scopes:
+            keys = self._scopes.get(scope)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._scopes[scope]
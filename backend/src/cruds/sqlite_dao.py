@@ -0,0 +1,796 @@
+from utils import load_storage_config
+from .base_dao import (
+    POPUP_DETAILS_FIELD,
+    reservation_cache,
+    BaseBatchWriter,
+    ReservationIndex,
+    invalidate_cached_reservations,
+    invalidate_cached_popup_details,
+    range_cache_scopes,
+    storage_call,
+    count_documents
+)
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+# Database file; the SQLITE_PATH env var overrides config.yaml
+SQLITE_PATH = os.getenv("SQLITE_PATH", load_storage_config().get("sqlite_path", "reservations.db"))
+
+# One row per reservation document. The (room_id, date, event) index also serves
+# the (room_id, date) equality and range queries through its prefix.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reservations (
+    room_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    date TEXT,
+    event TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (room_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_reservations_room_date_event ON reservations (room_id, date, event);
+CREATE TABLE IF NOT EXISTS day_snapshots (
+    room_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (room_id, date)
+);
+CREATE TABLE IF NOT EXISTS change_log (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    room_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+"""
+
+UPSERT_SQL = """
+INSERT INTO reservations (room_id, id, date, event, data) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (room_id, id) DO UPDATE SET date = excluded.date, event = excluded.event, data = excluded.data
+"""
+
+SNAPSHOT_UPSERT_SQL = """
+INSERT INTO day_snapshots (room_id, date, content_hash, data) VALUES (?, ?, ?, ?)
+ON CONFLICT (room_id, date) DO UPDATE SET content_hash = excluded.content_hash, data = excluded.data
+"""
+
+
+class SnapshotRef(namedtuple("SnapshotRef", ["room_id", "date"])):
+    """Write target of a day snapshot row, told apart from (room_id, reservation_id) refs."""
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def _connect() -> sqlite3.Connection:
+    """Open a connection in WAL mode, creating the schema on first use."""
+    global _schema_ready
+    directory = os.path.dirname(SQLITE_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(SQLITE_PATH, timeout=5, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA synchronous = NORMAL")
+    with _schema_lock:
+        if not _schema_ready:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(SCHEMA)
+            _schema_ready = True
+    return conn
+
+
+def _conn() -> sqlite3.Connection:
+    """Return this thread's connection."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = _connect()
+    return conn
+
+
+def _apply(ops: list):
+    """
+    Apply write operations in a single transaction.
+
+    Merge writes are resolved against the stored documents first so fields that
+    are not written (such as embedded popup details) are kept, like Firestore's
+    set(merge=True). Rows are then written with executemany.
+
+    Args:
+        ops (list): (op, (room_id, reservation_id), data) tuples; op is "set", "merge" or "delete".
+            Day snapshots are written with a SnapshotRef and "set" or "delete".
+    """
+    snapshots = {}
+    for op, ref, data in ops:
+        if isinstance(ref, SnapshotRef):
+            snapshots[ref] = None if op == "delete" else data
+    ops = [(op, ref, data) for op, ref, data in ops if not isinstance(ref, SnapshotRef)]
+
+    conn = _conn()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        merge_keys = {ref for op, ref, _ in ops if op == "merge"}
+        docs = {}
+        for room_id in {room_id for room_id, _ in merge_keys}:
+            ids = [rid for room, rid in merge_keys if room == room_id]
+            placeholders = ",".join("?" * len(ids))
+            rows = conn.execute(
+                f"SELECT id, data FROM reservations WHERE room_id = ? AND id IN ({placeholders})",
+                [room_id, *ids]
+            )
+            for reservation_id, data in rows:
+                docs[(room_id, reservation_id)] = json.loads(data)
+
+        for op, ref, data in ops:
+            if op == "delete":
+                docs[ref] = None
+            elif op == "merge" and docs.get(ref) is not None:
+                docs[ref] = {**docs[ref], **data}
+            else:
+                docs[ref] = dict(data)
+
+        conn.executemany(
+            "DELETE FROM reservations WHERE room_id = ? AND id = ?",
+            [ref for ref, doc in docs.items() if doc is None]
+        )
+        conn.executemany(UPSERT_SQL, [
+            (room_id, reservation_id, doc.get("date"), doc.get("event"), json.dumps(doc, ensure_ascii=False))
+            for (room_id, reservation_id), doc in docs.items() if doc is not None
+        ])
+        conn.executemany(
+            "DELETE FROM day_snapshots WHERE room_id = ? AND date = ?",
+            [tuple(ref) for ref, doc in snapshots.items() if doc is None]
+        )
+        conn.executemany(SNAPSHOT_UPSERT_SQL, [
+            (ref.room_id, ref.date, doc["content_hash"], json.dumps(doc, ensure_ascii=False, default=str))
+            for ref, doc in snapshots.items() if doc is not None
+        ])
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+class BatchWriter(BaseBatchWriter):
+    """
+    Collects SQLite mutations and commits each chunk as one transaction.
+
+    Use it as a context manager; pending operations are committed on exit.
+    A chunk that fails (e.g. the database is locked) is rolled back and retried.
+    """
+
+    def _commit(self, chunk: list):
+        for attempt in range(self.max_retries):
+            try:
+                _apply(chunk)
+                return
+            except sqlite3.OperationalError as e:
+                print(f"⚠️ batch commit failed ({len(chunk)} ops, attempt {attempt + 1}): {e}")
+                if attempt == self.max_retries - 1:
+                    raise
+                time.sleep(self.delay * 2 ** attempt)
+
+
+def _write(op: str, ref: tuple, data: dict = None, batch: BatchWriter = None):
+    if batch is None:
+        _apply([(op, ref, data)])
+    elif op == "delete":
+        batch.delete(ref)
+    else:
+        batch.set(ref, data, merge=op == "merge")
+
+
+def upsert_reservation(room_id: str, reservation_id: str, data: dict, batch: BatchWriter = None):
+    """
+    Inserts or updates a reservation row under a specific room.
+
+    Fields not present in data (such as embedded popup details) are kept.
+
+    Args:
+        room_id (str): Room identifier.
+        reservation_id (str): Reservation identifier.
+        data (dict): Reservation data to be written.
+        batch (BatchWriter, optional): Queue the write instead of sending it immediately.
+
+    Returns:
+        None
+    """
+    _write("merge", (room_id, reservation_id), data, batch)
+    invalidate_cached_reservations(room_id, data.get("date"), batch)
+
+
+def add_popup_details(room_id: str, reservation_id: str, details: dict, batch: BatchWriter = None):
+    """
+    Adds detailed popup information to a reservation.
+
+    Details are always embedded in the reservation row; the subcollection layout
+    only exists for Firestore.
+
+    Args:
+        room_id (str): Room identifier.
+        reservation_id (str): Reservation identifier.
+        details (dict): Dictionary of key-value pairs to be stored.
+        batch (BatchWriter, optional): Queue the write instead of sending it immediately.
+
+    Returns:
+        None
+    """
+    _write("merge", (room_id, reservation_id), {POPUP_DETAILS_FIELD: details}, batch)
+    invalidate_cached_popup_details(room_id, reservation_id, batch)
+
+
+def find_reservation(room_id: str, date: str, event: str):
+    """
+    Searches for a reservation based on room, date, and event.
+
+    Args:
+        room_id (str): Room identifier.
+        date (str): Reservation date in YYYY-MM-DD format.
+        event (str): Name of the event.
+
+    Returns:
+        Tuple[str, dict]: (Reservation ID, Reservation data) if found, otherwise (None, None).
+    """
+    with storage_call("find", room_id):
+        row = _conn().execute(
+            "SELECT id, data FROM reservations WHERE room_id = ? AND date = ? AND event = ? LIMIT 1",
+            (room_id, date, event)
+        ).fetchone()
+    if row is None:
+        return None, None
+    return row[0], json.loads(row[1])
+
+
+def _range_query(room_id: str, start_date: str = None, end_date: str = None, order: bool = False):
+    sql = "SELECT id, data FROM reservations WHERE room_id = ?"
+    params = [room_id]
+    if start_date:
+        sql += " AND date >= ?"
+        params.append(start_date)
+    if end_date:
+        sql += " AND date <= ?"
+        params.append(end_date)
+    if order:
+        sql += " ORDER BY date"
+    return sql, params
+
+
+def load_existing_reservations(room_id: str, start_date: str = None, end_date: str = None) -> ReservationIndex:
+    """
+    Loads all reservations of a room within a date window with a single query.
+
+    Args:
+        room_id (str): Room identifier.
+        start_date (str, optional): First date (YYYY-MM-DD, inclusive).
+        end_date (str, optional): Last date (YYYY-MM-DD, inclusive).
+
+    Returns:
+        ReservationIndex: Index of the stored reservations.
+    """
+    index = ReservationIndex()
+    with storage_call("load_existing", room_id):
+        for reservation_id, data in _conn().execute(*_range_query(room_id, start_date, end_date)):
+            index.add(reservation_id, json.loads(data))
+    count_documents("load_existing", room_id, len(index))
+    return index
+
+
+def _to_reservation(reservation_id: str, data: str, room_id: str, include_details: bool = False) -> dict:
+    """
+    Converts a stored row into a response dictionary.
+
+    Args:
+        reservation_id (str): Reservation identifier.
+        data (str): JSON document of the row.
+        room_id (str): Room identifier.
+        include_details (bool): Attach popup details as a key/value list under "details".
+
+    Returns:
+        dict: Reservation dictionary including room ID and reservation ID.
+    """
+    data = json.loads(data)
+    embedded = data.pop(POPUP_DETAILS_FIELD, None)
+    data["id"] = reservation_id
+    data["room_id"] = room_id
+    if include_details:
+        data["details"] = [{"key": k, "value": v} for k, v in (embedded or {}).items()]
+    return data
+
+
+def get_all_reservations(include_details: bool = False):
+    """
+    Retrieves all reservations across all rooms.
+
+    Args:
+        include_details (bool): Attach popup details to each reservation.
+
+    Returns:
+        List[dict]: List of all reservations including room ID and reservation ID.
+    """
+    return list(iter_reservations(include_details=include_details))
+
+
+def _list_room_ids() -> list:
+    return [row[0] for row in _conn().execute("SELECT DISTINCT room_id FROM reservations")]
+
+
+def _iter_rows(queries: list, include_details: bool):
+    # Streaming responses may resume the generator on another thread, so it
+    # reads through a dedicated connection instead of the thread-local one
+    conn = _connect()
+    try:
+        for room_id, (sql, params) in queries:
+            for reservation_id, data in conn.execute(sql, params):
+                yield _to_reservation(reservation_id, data, room_id, include_details)
+    finally:
+        conn.close()
+
+
+def iter_reservations(room_id=None, date=None, include_details: bool = False):
+    """
+    Lazily yields reservations, optionally filtered by room and date.
+
+    Rows are consumed from the cursor one at a time and are not cached, so
+    memory stays flat regardless of the result size.
+
+    Args:
+        room_id (str, optional): Room identifier. All rooms when omitted.
+        date (str, optional): Date (YYYY-MM-DD) to filter by.
+        include_details (bool): Attach popup details to each reservation.
+
+    Yields:
+        dict: Reservation dictionary including room ID and reservation ID.
+    """
+    room_ids = [room_id] if room_id else _list_room_ids()
+    yield from _iter_rows([(rid, _range_query(rid, date, date)) for rid in room_ids], include_details)
+
+
+def iter_reservations_by_range(room_ids: list, start_date: str, end_date: str, include_details: bool = False):
+    """
+    Lazily yields reservations of several rooms over a date range, room by room.
+
+    Args:
+        room_ids (list): Room identifiers to query.
+        start_date (str): First date (YYYY-MM-DD, inclusive).
+        end_date (str): Last date (YYYY-MM-DD, inclusive).
+        include_details (bool): Attach popup details to each reservation.
+
+    Yields:
+        dict: Reservation dictionary including room ID and reservation ID.
+    """
+    queries = [(room_id, _range_query(room_id, start_date, end_date, order=True)) for room_id in room_ids]
+    yield from _iter_rows(queries, include_details)
+
+
+def get_reservations_by_filter(room_id=None, date=None, include_details: bool = False):
+    """
+    Retrieves filtered reservations. Without room_id, every room is queried.
+
+    Args:
+        room_id (str, optional): Room identifier to filter by.
+        date (str, optional): Date to filter reservations by.
+        include_details (bool): Attach popup details to each reservation.
+
+    Returns:
+        List[dict]: List of filtered reservation dictionaries.
+    """
+    key = ("reservations", room_id, date, include_details)
+    cached = reservation_cache.get(key)
+    if cached is not None:
+        # Rows are shared with the cache; callers build responses from them without mutating them
+        return cached
+    scopes = [("reservations", room_id, date), ("room", room_id)]
+    generation = reservation_cache.generation(scopes)
+
+    results = []
+    with storage_call("read_filter", room_id):
+        for rid in [room_id] if room_id else _list_room_ids():
+            for reservation_id, data in _conn().execute(*_range_query(rid, date, date)):
+                results.append(_to_reservation(reservation_id, data, rid, include_details))
+    count_documents("read_filter", room_id, len(results))
+
+    reservation_cache.put(key, results, scopes, generation)
+    return results
+
+
+def _get_room_reservations_in_range(room_id: str, start_date: str, end_date: str, include_details: bool) -> list:
+    key = ("range", room_id, start_date, end_date, include_details)
+    cached = reservation_cache.get(key)
+    if cached is not None:
+        return cached
+    scopes = range_cache_scopes(room_id, start_date, end_date)
+    generation = reservation_cache.generation(scopes)
+
+    with storage_call("read_range", room_id):
+        rows = _conn().execute(*_range_query(room_id, start_date, end_date, order=True))
+        results = [_to_reservation(reservation_id, data, room_id, include_details) for reservation_id, data in rows]
+    count_documents("read_range", room_id, len(results))
+    reservation_cache.put(key, results, scopes, generation)
+    return results
+
+
+def get_reservations_by_range(room_ids: list, start_date: str, end_date: str, include_details: bool = False) -> dict:
+    """
+    Retrieves reservations of several rooms over a date range.
+
+    Args:
+        room_ids (list): Room identifiers to query.
+        start_date (str): First date (YYYY-MM-DD, inclusive).
+        end_date (str): Last date (YYYY-MM-DD, inclusive).
+        include_details (bool): Attach popup details to each reservation.
+
+    Returns:
+        Dict[str, Dict[str, List[dict]]]: Reservations grouped by room ID and date.
+    """
+    grouped = {}
+    for room_id in room_ids:
+        by_date = grouped.setdefault(room_id, {})
+        for r in _get_room_reservations_in_range(room_id, start_date, end_date, include_details):
+            by_date.setdefault(r.get("date"), []).append(r)
+    return grouped
+
+
+def get_popup_details_by_reservation_id(room_id: str, reservation_id: str):
+    """
+    Fetches popup details for a specific reservation.
+
+    Args:
+        room_id (str): Room identifier.
+        reservation_id (str): Reservation identifier.
+
+    Returns:
+        List[dict]: List of detail entries as dictionaries with key/value.
+    """
+    key = ("details", room_id, reservation_id)
+    cached = reservation_cache.get(key)
+    if cached is not None:
+        return cached
+    scopes = [key, ("room", room_id)]
+    generation = reservation_cache.generation(scopes)
+
+    with storage_call("read_details", room_id):
+        row = _conn().execute(
+            "SELECT data FROM reservations WHERE room_id = ? AND id = ?", (room_id, reservation_id)
+        ).fetchone()
+    embedded = json.loads(row[0]).get(POPUP_DETAILS_FIELD) if row else None
+    details = [{"key": k, "value": v} for k, v in (embedded or {}).items()]
+
+    reservation_cache.put(key, details, scopes, generation)
+    return details
+
+
+def migrate_popup_details_to_embedded(room_id: str = None) -> dict:
+    """
+    Popup details are always embedded in SQLite, so there is nothing to migrate.
+
+    Args:
+        room_id (str, optional): Room to migrate. All rooms when omitted.
+
+    Returns:
+        dict: Number of migrated reservations and deleted subcollection documents.
+    """
+    return {"migrated_count": 0, "deleted_count": 0}
+
+
+def delete_reservation(room_id: str, reservation_id: str, batch: BatchWriter = None):
+    """
+    Deletes a reservation row.
+
+    Args:
+        room_id (str): Room identifier.
+        reservation_id (str): Reservation identifier.
+        batch (BatchWriter, optional): Queue the deletion instead of sending it immediately.
+
+    Returns:
+        None
+    """
+    _write("delete", (room_id, reservation_id), batch=batch)
+    invalidate_cached_reservations(room_id, batch=batch)
+
+
+def sync_reservations(room_id: str, start_date: str, end_date: str, crawled_ids: set[str],
+                      batch: BatchWriter = None) -> list:
+    """
+    Removes stored reservations within a crawled date range that were not crawled.
+
+    Args:
+        room_id (str): Room identifier.
+        start_date (str): First crawled date (YYYY-MM-DD, inclusive).
+        end_date (str): Last crawled date (YYYY-MM-DD, inclusive).
+        crawled_ids (set[str]): Set of valid IDs that should be kept.
+        batch (BatchWriter, optional): Queue the deletions instead of sending them immediately.
+
+    Returns:
+        list: (reservation_id, date) of the deleted reservations.
+    """
+    with storage_call("sync", room_id):
+        rows = _conn().execute(
+            "SELECT id, date FROM reservations WHERE room_id = ? AND date >= ? AND date <= ?",
+            (room_id, start_date, end_date)
+        ).fetchall()
+    deleted = []
+    for reservation_id, date in rows:
+        if reservation_id not in crawled_ids:
+            _write("delete", (room_id, reservation_id), batch=batch)
+            invalidate_cached_popup_details(room_id, reservation_id, batch)
+            deleted.append((reservation_id, date))
+    for date in {date for _, date in deleted}:
+        invalidate_cached_reservations(room_id, date, batch)
+    return deleted
+
+
+def prune_reservations_before(room_id: str, before_date: str, limit: int = None, batch: BatchWriter = None) -> dict:
+    """
+    Deletes reservations of a room dated before the given date.
+
+    Args:
+        room_id (str): Room identifier.
+        before_date (str): First date to keep (YYYY-MM-DD).
+        limit (int, optional): Maximum number of reservations to delete.
+        batch (BatchWriter, optional): Queue the deletions instead of sending them immediately.
+
+    Returns:
+        dict: Deleted reservations, deleted subcollection documents (always 0)
+            and bytes of row data reclaimed.
+    """
+    with storage_call("prune", room_id):
+        rows = _conn().execute(
+            "SELECT id, date, length(CAST(room_id || id || ifnull(date, '') || ifnull(event, '') || data AS BLOB)) "
+            "FROM reservations WHERE room_id = ? AND date < ? LIMIT ?",
+            (room_id, before_date, limit or -1)
+        ).fetchall()
+    for reservation_id, date, _ in rows:
+        _write("delete", (room_id, reservation_id), batch=batch)
+        invalidate_cached_reservations(room_id, date, batch)
+        invalidate_cached_popup_details(room_id, reservation_id, batch)
+    return {"deleted_count": len(rows), "subdocument_count": 0, "bytes_reclaimed": sum(size for _, _, size in rows)}
+
+
+def prune_orphaned_popup_details(room_id: str, limit: int = None, batch: BatchWriter = None) -> dict:
+    """
+    Popup details are part of the reservation row in SQLite, so they cannot be orphaned.
+
+    Returns:
+        dict: Zero counts, in the same shape as the Firestore backend.
+    """
+    return {"deleted_count": 0, "subdocument_count": 0, "bytes_reclaimed": 0}
+
+
+def load_day_snapshot_hashes(room_id: str, start_date: str, end_date: str) -> dict:
+    """
+    Loads the content hashes of a room's day snapshots within a date range.
+
+    Args:
+        room_id (str): Room identifier.
+        start_date (str): First date (YYYY-MM-DD, inclusive).
+        end_date (str): Last date (YYYY-MM-DD, inclusive).
+
+    Returns:
+        dict: Content hash per snapshot date.
+    """
+    with storage_call("load_snapshot_hashes", room_id):
+        rows = _conn().execute(
+            "SELECT date, content_hash FROM day_snapshots WHERE room_id = ? AND date >= ? AND date <= ?",
+            (room_id, start_date, end_date)
+        ).fetchall()
+    count_documents("load_snapshot_hashes", room_id, len(rows))
+    return dict(rows)
+
+
+def write_day_snapshot(room_id: str, date: str, snapshot: dict, batch: BatchWriter = None):
+    """
+    Writes the day snapshot row of a room, replacing the previous one.
+
+    Args:
+        room_id (str): Room identifier.
+        date (str): Snapshot date (YYYY-MM-DD).
+        snapshot (dict): Rendered snapshot from render_day_snapshot.
+        batch (BatchWriter, optional): Queue the write instead of sending it immediately.
+    """
+    data = {**snapshot, "room_id": room_id, "date": date, "updated_at": datetime.now(timezone.utc).isoformat()}
+    _write("set", SnapshotRef(room_id, date), data, batch)
+    invalidate_cached_reservations(room_id, date, batch)
+
+
+def delete_day_snapshot(room_id: str, date: str, batch: BatchWriter = None):
+    """
+    Deletes the day snapshot row of a room.
+
+    Args:
+        room_id (str): Room identifier.
+        date (str): Snapshot date (YYYY-MM-DD).
+        batch (BatchWriter, optional): Queue the deletion instead of sending it immediately.
+    """
+    _write("delete", SnapshotRef(room_id, date), batch=batch)
+    invalidate_cached_reservations(room_id, date, batch)
+
+
+def get_day_snapshots(room_ids: list, date: str) -> dict:
+    """
+    Reads the day snapshots of several rooms for one date with a single query.
+
+    Args:
+        room_ids (list): Room identifiers.
+        date (str): Date (YYYY-MM-DD).
+
+    Returns:
+        dict: Snapshot document per room ID; rooms without a snapshot map to None.
+    """
+    snapshots = {}
+    missing = {}
+    for room_id in room_ids:
+        cached = reservation_cache.get(("snapshot", room_id, date))
+        if cached is not None:
+            snapshots[room_id] = cached or None
+        else:
+            scopes = [("reservations", room_id, date), ("room", room_id)]
+            missing[room_id] = (scopes, reservation_cache.generation(scopes))
+
+    if missing:
+        placeholders = ",".join("?" * len(missing))
+        with storage_call("read_snapshot"):
+            found = {
+                room_id: json.loads(data)
+                for room_id, data in _conn().execute(
+                    f"SELECT room_id, data FROM day_snapshots WHERE date = ? AND room_id IN ({placeholders})",
+                    [date, *missing]
+                )
+            }
+        count_documents("read_snapshot", None, len(found))
+        for room_id, (scopes, generation) in missing.items():
+            snapshot = found.get(room_id)
+            # A missing snapshot is cached as {} so fallbacks don't re-read it
+            reservation_cache.put(("snapshot", room_id, date), snapshot or {}, scopes, generation)
+            snapshots[room_id] = snapshot
+
+    return {room_id: snapshots[room_id] for room_id in room_ids}
+
+
+def prune_day_snapshots_before(room_id: str, before_date: str, batch: BatchWriter = None) -> int:
+    """
+    Deletes a room's day snapshots dated before the given date.
+
+    Args:
+        room_id (str): Room identifier.
+        before_date (str): First date to keep (YYYY-MM-DD).
+        batch (BatchWriter, optional): Queue the deletions instead of sending them immediately.
+
+    Returns:
+        int: Count of deleted snapshots.
+    """
+    with storage_call("prune_snapshots", room_id):
+        dates = [row[0] for row in _conn().execute(
+            "SELECT date FROM day_snapshots WHERE room_id = ? AND date < ?", (room_id, before_date)
+        )]
+    for date in dates:
+        delete_day_snapshot(room_id, date, batch)
+    return len(dates)
+
+
+def _latest_change_version(conn: sqlite3.Connection) -> int:
+    # sqlite_sequence keeps the highest version ever assigned, even after compaction
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+    return row[0] if row else 0
+
+
+def _change_log_floor(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT value FROM meta WHERE key = 'change_log_floor'").fetchone()
+    return row[0] if row else 0
+
+
+def append_changes(changes: list) -> list:
+    """
+    Appends reservation changes to the change log under increasing versions.
+
+    Versions come from the AUTOINCREMENT key, so they are never reused.
+
+    Args:
+        changes (list): Change dictionaries with type, room_id, id, date and,
+            for upserts, reservation.
+
+    Returns:
+        list: Version assigned to each change, in order.
+    """
+    if not changes:
+        return []
+    created_at = datetime.now(timezone.utc).isoformat()
+    conn = _conn()
+    with storage_call("append_changes"):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            versions = []
+            for change in changes:
+                cursor = conn.execute(
+                    "INSERT INTO change_log (room_id, id, data) VALUES (?, ?, ?)",
+                    (change["room_id"], change["id"],
+                     json.dumps({**change, "created_at": created_at}, ensure_ascii=False, default=str))
+                )
+                versions.append(cursor.lastrowid)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    count_documents("append_changes", None, len(changes))
+    return versions
+
+
+def get_changes_since(since: int, room_ids: list = None, limit: int = 500) -> dict:
+    """
+    Reads change log entries newer than a version, oldest first.
+
+    Args:
+        since (int): Last version the client has applied.
+        room_ids (list, optional): Rooms to return changes of. All rooms when omitted.
+        limit (int): Maximum number of entries scanned.
+
+    Returns:
+        dict: "changes", "version" (last scanned version, to pass as the next
+            since), "latest_version", "has_more" and "floor" (entries up to this
+            version were compacted away).
+    """
+    conn = _conn()
+    with storage_call("read_changes"):
+        rows = conn.execute(
+            "SELECT version, room_id, data FROM change_log WHERE version > ? ORDER BY version LIMIT ?",
+            (since, limit)
+        ).fetchall()
+        latest = _latest_change_version(conn)
+        floor = _change_log_floor(conn)
+    count_documents("read_changes", None, len(rows))
+
+    wanted = set(room_ids) if room_ids else None
+    last = rows[-1][0] if rows else max(since, latest)
+    return {
+        "changes": [
+            {**json.loads(data), "version": version}
+            for version, room_id, data in rows if wanted is None or room_id in wanted
+        ],
+        "version": last,
+        "latest_version": latest,
+        "has_more": last < latest,
+        "floor": floor
+    }
+
+
+def compact_change_log(max_entries: int) -> dict:
+    """
+    Shrinks the change log without changing what a sync from any retained version yields.
+
+    Entries superseded by a newer entry for the same reservation are dropped;
+    upserts carry the whole row, so the newest entry alone rebuilds it. Then
+    entries older than the newest max_entries versions are dropped and
+    the floor is raised so clients syncing from before it refetch.
+
+    Args:
+        max_entries (int): Versions kept behind the latest one.
+
+    Returns:
+        dict: Numbers of superseded and truncated entries deleted.
+    """
+    conn = _conn()
+    with storage_call("compact_changes"):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            floor = max(_change_log_floor(conn), _latest_change_version(conn) - max_entries)
+            truncated = conn.execute("DELETE FROM change_log WHERE version <= ?", (floor,)).rowcount
+            superseded = conn.execute(
+                "DELETE FROM change_log WHERE version NOT IN "
+                "(SELECT MAX(version) FROM change_log GROUP BY room_id, id)"
+            ).rowcount
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('change_log_floor', ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (floor,)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    return {"superseded_count": superseded, "truncated_count": truncated}
@@ -1,37 +1,69 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
 import os
 import json
+import threading
+import time
 
 """
-Initializes Firebase Firestore connection depending on environment.
+Lazily initializes the Firebase Firestore connection depending on environment.
 
 - In development: loads credentials from `firebase_credentials.json` file.
 - In production: loads JSON string from FIREBASE_CREDENTIALS environment variable.
+
+firebase_admin and the gRPC client are only imported and created on the first
+call to get_db(), so importing this module is free and needs no credentials.
 """
 
 ENV = os.getenv("ENV", "publish")  # default to development
-cred_dict = None
 
-if ENV == "dev":
-    # Development: Load from local file
-    try:
-        with open("firebase_credentials.json") as f:
-            cred_dict = json.load(f)
-    except FileNotFoundError:
-        raise RuntimeError("firebase_credentials.json file not found for development environment")
-else:
+_db = None
+_db_lock = threading.Lock()
+
+
+def _load_credentials() -> dict:
+    if ENV == "dev":
+        # Development: Load from local file
+        try:
+            with open("firebase_credentials.json") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise RuntimeError("firebase_credentials.json file not found for development environment")
+
     # Production: Load from environment variable
     cred_raw = os.environ.get("FIREBASE_CREDENTIALS")
     if not cred_raw:
         raise RuntimeError("FIREBASE_CREDENTIALS not found in environment")
     try:
-        cred_dict = json.loads(cred_raw)
+        return json.loads(cred_raw)
     except json.JSONDecodeError:
         # Fallback to assuming it's a file path
         with open(cred_raw) as f:
-            cred_dict = json.load(f)
+            return json.load(f)
+
+
+def get_db():
+    """
+    Return the process-wide Firestore client, initializing Firebase on first use.
+
+    The client is thread-safe and multiplexes requests over its own gRPC channel
+    pool, so one instance is shared by every thread of the process.
+
+    Returns:
+        google.cloud.firestore.Client: Firestore client.
+
+    Raises:
+        RuntimeError: If no credentials are configured.
+    """
+    global _db
+    if _db is not None:
+        return _db
+    with _db_lock:
+        if _db is None:
+            started = time.perf_counter()
+            import firebase_admin
+            from firebase_admin import credentials, firestore
 
-cred = credentials.Certificate(cred_dict)
-firebase_admin.initialize_app(cred)
-db = firestore.client()
+            if not firebase_admin._apps:
+                firebase_admin.initialize_app(credentials.Certificate(_load_credentials()))
+            _db = firestore.client()
+            print(f"Firestore client initialized in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return _db
@@ -1,18 +1,51 @@
+import time
+
+# Taken before the application imports so the startup timing covers them
+_startup_began = time.perf_counter()
+
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from controllers import router
+from controllers import router, metrics_router, record_request_metrics
+from services import start_scheduler, shutdown_scheduler
+from utils import APP_STARTUP_SECONDS, CompressionMiddleware, FastJSONResponse
 import os
 
 # Get frontend origin from env
 frontend_origin = os.getenv("FRONTEND_ORIGIN", "*")
 # is_dev = os.getenv("ENV", "dev") == "dev"
 
+_imports_done = time.perf_counter()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Runs the background crawl scheduler for the lifetime of the app and records
+    how long startup took in app.state.startup_timings.
+    """
+    start_scheduler()
+    ready = time.perf_counter()
+    app.state.startup_timings = {
+        "imports_ms": round((_imports_done - _startup_began) * 1000, 1),
+        "ready_ms": round((ready - _startup_began) * 1000, 1)
+    }
+    APP_STARTUP_SECONDS.labels("imports").set(_imports_done - _startup_began)
+    APP_STARTUP_SECONDS.labels("ready").set(ready - _startup_began)
+    print(f"Startup: imports {app.state.startup_timings['imports_ms']} ms, "
+          f"ready {app.state.startup_timings['ready_ms']} ms")
+    yield
+    shutdown_scheduler()
+
+
 def create_app():
     """Creates and configures the FastAPI application."""
     app = FastAPI(
         # docs_url=None, # deploy setting
         # redoc_url=None
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse
     )
     # Enable CORS for all origins
     app.add_middleware(
@@ -23,8 +56,15 @@ def create_app():
         allow_headers=["*"],
     )
 
+    # Compress large complete responses with brotli or gzip; streams pass through
+    app.add_middleware(CompressionMiddleware)
+
+    # Record per-route request latency for /metrics
+    app.middleware("http")(record_request_metrics)
+
     # Register application routers
     app.include_router(router)
+    app.include_router(metrics_router)
 
     return app
 
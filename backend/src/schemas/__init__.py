@@ -3,4 +3,13 @@ from sys import path
 
 path.insert(0, dirname(__file__))
 
-from .reservation_schema import ReservationResponse 
\ No newline at end of file
+from .reservation_schema import (
+    DetailEntry,
+    ReservationResponse,
+    ReservationDetailsResponse,
+    ReservationListResponse,
+    ReservationRangeResponse,
+    DayViewResponse,
+    PopupDetailsResponse,
+    format_popup_details
+) 
\ No newline at end of file
@@ -1,15 +1,136 @@
-from pydantic import BaseModel
-from typing import Optional
+"""
+Response models of the reservation read endpoints.
 
-class ReservationResponse(BaseModel):
-    id: int
-    facility_name: str
+Slotted dataclasses keep a row at a fixed set of attributes without a
+per-instance __dict__, and orjson serializes them natively without an
+intermediate dict. Rows are built from stored reservation dictionaries
+without mutating them.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from utils import parse_datetime_range
+
+
+@dataclass(slots=True)
+class DetailEntry:
+    key: str
+    value: Any
+
+
+@dataclass(slots=True)
+class ReservationResponse:
+    id: str
+    room_id: str
+    date: Optional[str] = None
+    place: Optional[str] = None
+    department: Optional[str] = None
+    event: Optional[str] = None
+    approval: Optional[str] = None
+    print_link: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+
+    @staticmethod
+    def from_row(row: dict, include_details: bool = False) -> "ReservationResponse":
+        """
+        Build the response row of a stored reservation.
+
+        Rows written by the crawler already carry parsed start/end times; only
+        legacy rows with a raw '일시' field are parsed here. With details, times
+        missing on the row are taken from the popup details.
+
+        Args:
+            row (dict): Reservation dictionary from the DAO.
+            include_details (bool): Whether the row carries popup details under "details".
+
+        Returns:
+            ReservationResponse: The row, a ReservationDetailsResponse with details.
+        """
+        start_time, end_time = row.get("start_time"), row.get("end_time")
+        if not start_time and "일시" in row:
+            parsed = parse_datetime_range(row["일시"])
+            start_time, end_time = parsed.get("start_time"), parsed.get("end_time")
+
+        fields = dict(
+            id=row.get("id"),
+            room_id=row.get("room_id"),
+            date=row.get("date"),
+            place=row.get("place"),
+            department=row.get("department"),
+            event=row.get("event"),
+            approval=row.get("approval"),
+            print_link=row.get("print_link"),
+            start_date=row.get("start_date"),
+            end_date=row.get("end_date"),
+            start_time=start_time,
+            end_time=end_time
+        )
+        if not include_details:
+            return ReservationResponse(**fields)
+
+        details = format_popup_details(row.get("details") or [])
+        for d in details:
+            if d.key in ("start_time", "end_time") and not fields[d.key]:
+                fields[d.key] = d.value
+        return ReservationDetailsResponse(**fields, details=details)
+
+
+@dataclass(slots=True)
+class ReservationDetailsResponse(ReservationResponse):
+    details: List[DetailEntry] = None
+
+
+@dataclass(slots=True)
+class ReservationListResponse:
+    success: bool
+    count: int
+    data: List[ReservationResponse]
+
+
+@dataclass(slots=True)
+class ReservationRangeResponse:
+    success: bool
+    count: int
+    data: Dict[str, Dict[str, List[ReservationResponse]]]
+
+
+@dataclass(slots=True)
+class DayViewResponse:
+    success: bool
     date: str
-    place: str
-    department: str
-    event: str
-    approval: str
-    print_link: Optional[str]
-
-    class Config:
-        from_attributes = True
+    count: int
+    snapshot_rooms: List[str]
+    data: Dict[str, List[ReservationDetailsResponse]]
+
+
+@dataclass(slots=True)
+class PopupDetailsResponse:
+    status: str
+    reservation_id: str
+    data: List[DetailEntry]
+
+
+def format_popup_details(details: list) -> list:
+    """
+    Format popup detail entries, expanding the raw '일시' field into start/end times.
+
+    Args:
+        details (list): Detail entries as dictionaries with key/value.
+
+    Returns:
+        List[DetailEntry]: Formatted detail entries.
+    """
+    formatted_data = []
+    for d in details:
+        if d["key"] == "일시":
+            parsed = parse_datetime_range(d["value"])
+            if parsed.get("start_time"):
+                formatted_data.append(DetailEntry("start_time", parsed["start_time"]))
+                formatted_data.append(DetailEntry("end_time", parsed["end_time"]))
+        else:
+            formatted_data.append(DetailEntry(d["key"], d["value"]))
+    return formatted_data
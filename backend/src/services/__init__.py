@@ -3,4 +3,12 @@ from sys import path
 
 path.insert(0, dirname(__file__))
 
-from .crawling_service import crawl_facility_reservations
\ No newline at end of file
+from .crawling_service import crawl_facility_reservations, crawl_facilities
+from .scheduler_service import start_scheduler, shutdown_scheduler
+from .job_service import crawl_jobs
+from .retention_service import run_retention, get_retention_stats
+from .http_client import get_http_client
+from .availability_service import availability_index, get_free_slots, get_free_rooms, parse_minutes
+from .snapshot_service import get_day_view
+from .event_service import change_broadcaster, HEARTBEAT_SECONDS
+from .change_log_service import get_changes
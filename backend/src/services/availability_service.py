@@ -0,0 +1,270 @@
+"""
+In-memory availability index answering free-slot questions without storage reads.
+
+For every (room, date) the index keeps the busy time of that day as merged,
+non-overlapping intervals in two sorted lists of minutes since midnight. An
+"is the room free from X to Y" lookup is a single bisect, and the free slots
+of a day are the gaps between consecutive intervals.
+
+A room is loaded from storage on its first lookup; afterwards crawls replace
+the days they crawled, so lookups never touch storage again.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+from utils import load_availability_config
+from cruds import iter_reservations
+
+MINUTES_PER_DAY = 24 * 60
+
+# Longest span a single reservation is expanded over, in days
+MAX_RESERVATION_DAYS = 31
+
+_config = load_availability_config()
+
+
+def parse_minutes(value: str):
+    """
+    Convert "HH:MM" to minutes since midnight.
+
+    Returns:
+        int: Minutes, or None if the value is not a valid time ("24:00" is accepted).
+    """
+    try:
+        hours, minutes = (int(part) for part in value.split(":"))
+    except (AttributeError, ValueError):
+        return None
+    total = hours * 60 + minutes
+    return total if 0 <= minutes < 60 and 0 <= total <= MINUTES_PER_DAY else None
+
+
+def format_minutes(minutes: int) -> str:
+    """Convert minutes since midnight to "HH:MM"."""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+DAY_START = parse_minutes(_config.get("day_start", "08:00"))
+DAY_END = parse_minutes(_config.get("day_end", "22:00"))
+MIN_SLOT_MINUTES = _config.get("min_slot_minutes", 30)
+
+
+def _reservation_days(reservation: dict):
+    """Yield (date, start, end) busy intervals of a reservation, one per day it spans."""
+    first = reservation.get("start_date") or reservation.get("date")
+    last = reservation.get("end_date") or first
+    try:
+        day = datetime.strptime(first, "%Y-%m-%d")
+        last_day = min(datetime.strptime(last, "%Y-%m-%d"), day + timedelta(days=MAX_RESERVATION_DAYS - 1))
+    except (TypeError, ValueError):
+        return
+
+    start = parse_minutes(reservation.get("start_time"))
+    end = parse_minutes(reservation.get("end_time"))
+    if start is None or end is None:
+        # Without parsed times the whole day is treated as booked
+        start, end = 0, MINUTES_PER_DAY
+    elif end <= start:
+        # Runs past midnight
+        end = MINUTES_PER_DAY
+
+    while day <= last_day:
+        yield day.strftime("%Y-%m-%d"), start, end
+        day += timedelta(days=1)
+
+
+def build_day_intervals(reservations) -> dict:
+    """
+    Group reservations into merged busy intervals per date.
+
+    Args:
+        reservations: Iterable of reservation dictionaries with date and time fields.
+
+    Returns:
+        dict: date -> (starts, ends), sorted lists of merged interval bounds in minutes.
+    """
+    by_date = {}
+    for reservation in reservations:
+        for date, start, end in _reservation_days(reservation):
+            by_date.setdefault(date, []).append((start, end))
+
+    days = {}
+    for date, intervals in by_date.items():
+        intervals.sort()
+        starts, ends = [], []
+        for start, end in intervals:
+            if ends and start <= ends[-1]:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        days[date] = (starts, ends)
+    return days
+
+
+class AvailabilityIndex:
+    """Thread-safe per-room, per-date interval index of booked time."""
+
+    def __init__(self):
+        self._days = {}
+        self._loaded = set()
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self, room_id: str):
+        if room_id in self._loaded:
+            return
+        with self._lock:
+            if room_id in self._loaded:
+                return
+            for date, intervals in build_day_intervals(iter_reservations(room_id)).items():
+                self._days[(room_id, date)] = intervals
+            self._loaded.add(room_id)
+
+    def update_room(self, room_id: str, reservations: list, start_date: str, end_date: str):
+        """
+        Replace the indexed days of a room within a crawled date range.
+
+        Rooms not looked up yet are left alone; they are loaded from storage,
+        which already holds the crawl's writes, on their first lookup.
+
+        Args:
+            room_id (str): Room identifier.
+            reservations (list): Every reservation of the room within the range.
+            start_date (str): First crawled date (YYYY-MM-DD, inclusive).
+            end_date (str): Last crawled date (YYYY-MM-DD, inclusive).
+        """
+        days = build_day_intervals(reservations)
+        with self._lock:
+            if room_id not in self._loaded:
+                return
+            for key in [key for key in self._days if key[0] == room_id and start_date <= key[1] <= end_date]:
+                del self._days[key]
+            for date, intervals in days.items():
+                if start_date <= date <= end_date:
+                    self._days[(room_id, date)] = intervals
+
+    def prune_before(self, before_date: str):
+        """Drop indexed days before a date (YYYY-MM-DD)."""
+        with self._lock:
+            for key in [key for key in self._days if key[1] < before_date]:
+                del self._days[key]
+
+    def is_free(self, room_id: str, date: str, start: int, end: int) -> bool:
+        """
+        Check whether a room has no booking overlapping [start, end) on a date.
+
+        The only candidate for an overlap is the last busy interval starting
+        before `end`, found by bisection.
+
+        Args:
+            room_id (str): Room identifier.
+            date (str): Date (YYYY-MM-DD).
+            start (int): Start in minutes since midnight.
+            end (int): End in minutes since midnight.
+
+        Returns:
+            bool: True if the room is free for the whole time span.
+        """
+        self._ensure_loaded(room_id)
+        starts, ends = self._days.get((room_id, date), ((), ()))
+        index = bisect_left(starts, end) - 1
+        return index < 0 or ends[index] <= start
+
+    def free_slots(self, room_id: str, date: str, day_start: int = None, day_end: int = None,
+                   min_minutes: int = None) -> list:
+        """
+        List the free gaps of a room on a date within opening hours.
+
+        Args:
+            room_id (str): Room identifier.
+            date (str): Date (YYYY-MM-DD).
+            day_start (int, optional): Opening time in minutes. DAY_START when omitted.
+            day_end (int, optional): Closing time in minutes. DAY_END when omitted.
+            min_minutes (int, optional): Shortest reported gap. MIN_SLOT_MINUTES when omitted.
+
+        Returns:
+            list: (start, end) free intervals in minutes, in order.
+        """
+        day_start = DAY_START if day_start is None else day_start
+        day_end = DAY_END if day_end is None else day_end
+        min_minutes = MIN_SLOT_MINUTES if min_minutes is None else min_minutes
+
+        self._ensure_loaded(room_id)
+        starts, ends = self._days.get((room_id, date), ((), ()))
+        slots = []
+        cursor = day_start
+        # Skip the intervals that end before opening
+        for index in range(bisect_right(ends, day_start), len(starts)):
+            if starts[index] >= day_end:
+                break
+            if starts[index] - cursor >= min_minutes:
+                slots.append((cursor, starts[index]))
+            cursor = max(cursor, ends[index])
+        if day_end - cursor >= min_minutes:
+            slots.append((cursor, day_end))
+        return slots
+
+    def stats(self) -> dict:
+        """Return the number of loaded rooms, indexed days and busy intervals."""
+        with self._lock:
+            return {
+                "rooms": len(self._loaded),
+                "days": len(self._days),
+                "intervals": sum(len(starts) for starts, _ in self._days.values())
+            }
+
+
+availability_index = AvailabilityIndex()
+
+
+def _dates(start_date: str, end_date: str) -> list:
+    day = datetime.strptime(start_date, "%Y-%m-%d")
+    last_day = datetime.strptime(end_date, "%Y-%m-%d")
+    dates = []
+    while day <= last_day:
+        dates.append(day.strftime("%Y-%m-%d"))
+        day += timedelta(days=1)
+    return dates
+
+
+def get_free_slots(room_ids: list, start_date: str, end_date: str, min_minutes: int = None) -> dict:
+    """
+    List the free slots of rooms over a date range.
+
+    Args:
+        room_ids (list): Room identifiers.
+        start_date (str): First date (YYYY-MM-DD, inclusive).
+        end_date (str): Last date (YYYY-MM-DD, inclusive).
+        min_minutes (int, optional): Shortest reported slot.
+
+    Returns:
+        dict: {room_id: {date: [{"start_time": "HH:MM", "end_time": "HH:MM"}, ...]}}.
+    """
+    dates = _dates(start_date, end_date)
+    return {
+        room_id: {
+            date: [
+                {"start_time": format_minutes(start), "end_time": format_minutes(end)}
+                for start, end in availability_index.free_slots(room_id, date, min_minutes=min_minutes)
+            ]
+            for date in dates
+        }
+        for room_id in room_ids
+    }
+
+
+def get_free_rooms(room_ids: list, date: str, start: int, end: int) -> list:
+    """
+    List the rooms without any booking overlapping a time span.
+
+    Args:
+        room_ids (list): Room identifiers to check.
+        date (str): Date (YYYY-MM-DD).
+        start (int): Start in minutes since midnight.
+        end (int): End in minutes since midnight.
+
+    Returns:
+        list: Free room identifiers, in the given order.
+    """
+    return [room_id for room_id in room_ids if availability_index.is_free(room_id, date, start, end)]
@@ -0,0 +1,74 @@
+from utils import load_change_log_config
+from cruds import append_changes, get_changes_since, compact_change_log
+
+_config = load_change_log_config()
+
+CHANGE_LOG_ENABLED = _config.get("enabled", True)
+MAX_ENTRIES = _config.get("max_entries", 10000)
+PAGE_SIZE = _config.get("page_size", 500)
+
+
+def record_changes(changes: list) -> None:
+    """
+    Persist a crawl's committed changes to the change log.
+
+    Each change gets its log version as "version" and as "seq", so stream
+    events and delta pages share one numbering.
+
+    Args:
+        changes (list): Change dictionaries built by the crawl.
+    """
+    if not CHANGE_LOG_ENABLED or not changes:
+        return
+    try:
+        versions = append_changes(changes)
+    except Exception as e:
+        print(f"⚠️ change log append failed ({len(changes)} changes): {e}")
+        return
+    for change, version in zip(changes, versions):
+        change["version"] = version
+        change["seq"] = version
+
+
+def get_changes(since: int, room_ids: list = None, limit: int = None) -> dict:
+    """
+    Return the changes a client needs to catch up from a version.
+
+    Args:
+        since (int): Last version the client has applied; 0 for a new client.
+        room_ids (list, optional): Rooms to return changes of.
+        limit (int, optional): Maximum entries scanned. PAGE_SIZE when omitted.
+
+    Returns:
+        dict: Changes oldest first, the version to pass as the next since and
+            has_more. "reset" is True if the log no longer reaches back to since;
+            the client must then refetch and continue from "version".
+    """
+    page = get_changes_since(since, room_ids, min(limit or PAGE_SIZE, PAGE_SIZE))
+    if since < page["floor"]:
+        return {
+            "reset": True,
+            "since": since,
+            "version": page["latest_version"],
+            "has_more": False,
+            "changes": []
+        }
+    return {
+        "reset": False,
+        "since": since,
+        "version": page["version"],
+        "has_more": page["has_more"],
+        "changes": page["changes"]
+    }
+
+
+def compact() -> dict:
+    """
+    Compact the change log down to MAX_ENTRIES versions.
+
+    Returns:
+        dict: Numbers of superseded and truncated entries deleted.
+    """
+    if not CHANGE_LOG_ENABLED:
+        return {"superseded_count": 0, "truncated_count": 0}
+    return compact_change_log(MAX_ENTRIES)
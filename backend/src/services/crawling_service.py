@@ -1,23 +1,88 @@
-import requests
+import base64
 import re
+import threading
 import time
-from bs4 import BeautifulSoup
-from datetime import datetime
-
-from firebase import db
-from utils import load_facility_config
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from urllib.parse import quote, unquote
+
+from utils import (
+    load_facility_config,
+    load_crawler_config,
+    parse_datetime_range,
+    observe,
+    room_label,
+    CRAWL_PHASE_SECONDS,
+    CRAWL_SECONDS,
+    CRAWL_ITEMS
+)
+from .http_client import get_http_client
+from .html_parser import resolve_backend, parse_list_rows, parse_detail_pairs
+from .fetch_cache import fetch_cache, hash_content
+from .retention_service import retention_cutoff
+from .availability_service import availability_index
+from .snapshot_service import refresh_day_snapshots, DAY_SNAPSHOTS_ENABLED
+from .event_service import change_broadcaster
+from .change_log_service import record_changes
 
 from cruds import (
     upsert_reservation,
-    find_reservation,
+    load_existing_reservations,
     add_popup_details,
     sync_reservations,
-    hash_reservation
+    hash_reservation,
+    BatchWriter,
+    STORAGE_ONLY_FIELDS
 )
 
 BASE_URL = "https://www.inha.ac.kr"
 PRINT_URL_TEMPLATE = BASE_URL + "/facility/kr/facilityPrint.do?seq={seq}&req={req}"
+PRINT_KEY_PATTERN = re.compile(r"seq=(\d+)&req=(\d+)")
+# Page numbers in the listing's pagination links: page_link('3') or ...&page=3
+PAGE_NUMBER_PATTERN = re.compile(r"page_link\(\s*'?(\d+)'?\s*\)|[?&;]page=(\d+)")
+# Dates as returned by format_date for well-formed listing rows
+ISO_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+# K2Web wraps the real list.do path in a base64 "enc" query parameter
+ENC_PARAM_PATTERN = re.compile(r"([?&]enc=)([^&#]+)")
+
+# HTML parser backend used for list and print pages
+HTML_PARSER = resolve_backend(load_crawler_config().get("html_parser", "auto"))
+# Upper bound of listing pages crawled per room, and listing pages fetched at once
+MAX_PAGES = load_crawler_config().get("max_pages", 20)
+PAGE_CONCURRENCY = load_crawler_config().get("page_concurrency", 4)
+
+# Reservation fields scraped from the list table
+LIST_FIELDS = ["date", "place", "department", "event", "approval"]
+
+# Summary counts exported as crawl_items_total{item=...}
+CRAWL_ITEM_COUNTS = [
+    "saved_count", "updated_count", "skipped_count", "deleted_count",
+    "popup_fetched_count", "popup_failed_count", "popup_skipped_count", "snapshot_written_count", "write_count"
+]
+
+class CrawlProgress:
+    """Thread-safe progress counters of a running crawl."""
+
+    FIELDS = ["rows_parsed", "popups_fetched", "popups_failed", "writes_committed"]
+
+    def __init__(self):
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+        self._lock = threading.Lock()
+
+    def add(self, field: str, amount: int = 1):
+        """Increase a counter."""
+        with self._lock:
+            self._counts[field] += amount
+
+    def to_dict(self) -> dict:
+        """Return a snapshot of the counters."""
+        with self._lock:
+            return dict(self._counts)
+
+
+# Single-flight guard: one lock per room so a room is never crawled twice at once
+_room_locks = {}
+_room_locks_lock = threading.Lock()
 
 KEY_TRANSLATION = {
     "장소": "place",
@@ -40,32 +105,238 @@ def format_date(raw_date: str) -> str:
         return raw_date
 
 
-def fetch_with_retry(url: str, max_retries: int = 3, delay: int = 2) -> str:
-    """Fetch page contents with retries and proper headers."""
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/119.0.0.0 Safari/537.36"
-        ),
-        "Referer": "https://www.inha.ac.kr/"
+def fetch_response_with_retry(url: str, headers: dict = None, max_retries: int = None):
+    """Fetch a page with retries; returns the 200 or 304 response, or None."""
+    result = get_http_client().fetch(url, headers, max_retries)
+    if result.retries or result.response is None:
+        print(f"⚠️ {url}: {result.attempts} attempt(s), {result.latency:.2f}s, "
+              f"{'ok' if result.response is not None else result.error}")
+    return result.response
+
+
+def fetch_with_retry(url: str, max_retries: int = None) -> str:
+    """Fetch page contents with retries through the shared HTTP client."""
+    res = fetch_response_with_retry(url, max_retries=max_retries)
+    if res is None or res.status_code != 200:
+        return None
+    return res.text
+
+
+def fetch_list_page(url: str, force: bool = False) -> dict:
+    """
+    Fetch a facility list page conditionally.
+
+    Stored validators are sent as If-None-Match / If-Modified-Since, and the
+    body hash is compared with the one of the last successful crawl.
+
+    Args:
+        url (str): List page URL.
+        force (bool): Ignore stored validators and hashes.
+
+    Returns:
+        dict: "html", "content_hash", "etag", "last_modified" and "unchanged",
+            or None if the page could not be fetched.
+    """
+    headers = {} if force else fetch_cache.conditional_headers(url)
+    res = fetch_response_with_retry(url, headers)
+    if res is None:
+        return None
+
+    previous_hash = None if force else fetch_cache.content_hash(url)
+    if res.status_code == 304 and previous_hash:
+        return {"html": None, "content_hash": previous_hash, "unchanged": True}
+    if res.status_code == 304:
+        # Validators without a stored hash: fetch the full page
+        res = fetch_response_with_retry(url)
+        if res is None or res.status_code != 200:
+            return None
+
+    content_hash = hash_content(res.text)
+    return {
+        "html": res.text,
+        "content_hash": content_hash,
+        "etag": res.headers.get("ETag"),
+        "last_modified": res.headers.get("Last-Modified"),
+        "unchanged": content_hash == previous_hash
     }
-    for _ in range(max_retries):
+
+
+def build_page_url(url: str, page: int) -> str:
+    """
+    Build the URL of a listing page.
+
+    Facility URLs carry the list.do path base64-encoded in their "enc" parameter
+    ("fnct1|@@|" + percent-encoded path), so the page number is added inside it.
+    Other URLs get a plain page query parameter.
+
+    Args:
+        url (str): URL of the first listing page.
+        page (int): 1-based page number.
+
+    Returns:
+        str: URL of the requested page.
+    """
+    if page <= 1:
+        return url
+
+    match = ENC_PARAM_PATTERN.search(url)
+    if match:
+        decoded = base64.b64decode(unquote(match.group(2))).decode()
+        prefix, separator, list_path = decoded.partition("|@@|")
+        if separator:
+            list_path = unquote(list_path)
+            if not list_path.endswith(("?", "&")):
+                list_path += "&" if "?" in list_path else "?"
+            list_path += f"page={page}&"
+            encoded = base64.b64encode(f"{prefix}{separator}{quote(list_path, safe='')}".encode()).decode()
+            return url[:match.start(2)] + encoded + url[match.end(2):]
+
+    return f"{url}{'&' if '?' in url else '?'}page={page}"
+
+
+def parse_page_count(html: str) -> int:
+    """Return the highest page number linked from a listing page (1 without pagination)."""
+    numbers = [int(a or b) for a, b in PAGE_NUMBER_PATTERN.findall(html or "")]
+    return max(numbers, default=1)
+
+
+def _fetch_pages(urls: list, force: bool) -> list:
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(len(urls), PAGE_CONCURRENCY)) as pool:
+        return list(pool.map(lambda page_url: fetch_list_page(page_url, force), urls))
+
+
+def _page_dates(rows: list) -> list:
+    return [format_date(row[0]) for row in rows]
+
+
+def _is_before(rows: list, cutoff: str) -> bool:
+    # An empty page lies past the end of the listing
+    return all(date < cutoff for date in _page_dates(rows))
+
+
+def fetch_listing(url: str, room_id: str, force: bool = False, cutoff: str = None) -> dict:
+    """
+    Fetch and parse every page of a facility listing.
+
+    The first page is fetched conditionally. If it is unchanged, the pages
+    crawled with it last time are revalidated and the listing only counts as
+    unchanged if all of them are. Otherwise the page count is read from the
+    pagination links and the other pages are fetched PAGE_CONCURRENCY at a
+    time. On a listing sorted newest first, fetching stops after the wave in
+    which a page lies entirely before the retention cutoff. Fetching also
+    stops at a page whose content equals an earlier page's, as served when
+    the site ignores the page parameter; that page and later ones are dropped.
+
+    Args:
+        url (str): URL of the first listing page.
+        room_id (str): Room identifier, used for metric labels.
+        force (bool): Ignore stored validators and hashes.
+        cutoff (str, optional): First date kept by retention (YYYY-MM-DD).
+
+    Returns:
+        dict: "unchanged" and, if changed, "pages" as (url, page, rows) tuples in
+            listing order, "descending" and "complete" (False if pages were left
+            out by MAX_PAGES), or None if a page could not be fetched.
+    """
+    with observe(CRAWL_PHASE_SECONDS, room_id=room_id, phase="fetch_list"):
+        first = fetch_list_page(url, force)
+        if first and first["unchanged"]:
+            known_pages = fetch_cache.page_count(url) or 1
+            others = _fetch_pages([build_page_url(url, n) for n in range(2, known_pages + 1)], force=False)
+            if any(page is None for page in others):
+                return None
+            if all(page["unchanged"] for page in others):
+                return {"unchanged": True}
+            # A later page changed: process the whole listing again
+            first = fetch_list_page(url, force=True)
+    if not first:
+        return None
+
+    with observe(CRAWL_PHASE_SECONDS, room_id=room_id, phase="parse"):
+        rows = parse_reservation_table(first["html"])
+    pages = [(url, first, rows)]
+    page_count = parse_page_count(first["html"])
+    last_page = min(page_count, MAX_PAGES)
+    dates = _page_dates(rows)
+    descending = not dates or dates[0] >= dates[-1]
+    seen_hashes = {first["content_hash"]}
+
+    next_page = 2
+    while next_page <= last_page:
+        numbers = range(next_page, min(last_page, next_page + PAGE_CONCURRENCY - 1) + 1)
+        urls = [build_page_url(url, n) for n in numbers]
+        with observe(CRAWL_PHASE_SECONDS, room_id=room_id, phase="fetch_list"):
+            fetched = _fetch_pages(urls, force=True)
+        if any(page is None for page in fetched):
+            return None
+        distinct = []
+        for page_url, page in zip(urls, fetched):
+            if page["content_hash"] in seen_hashes:
+                break
+            seen_hashes.add(page["content_hash"])
+            distinct.append((page_url, page))
+        with observe(CRAWL_PHASE_SECONDS, room_id=room_id, phase="parse"):
+            wave = [(page_url, page, parse_reservation_table(page["html"])) for page_url, page in distinct]
+        pages.extend(wave)
+        if len(distinct) < len(fetched):
+            # A page repeated an earlier one: the listing has no further distinct pages
+            return {"unchanged": False, "pages": pages, "descending": descending, "complete": True}
+        next_page = numbers[-1] + 1
+        if descending and cutoff and any(_is_before(page_rows, cutoff) for _, _, page_rows in wave):
+            # Older pages only hold reservations retention would prune anyway
+            return {"unchanged": False, "pages": pages, "descending": True, "complete": True}
+
+    return {"unchanged": False, "pages": pages, "descending": descending, "complete": page_count <= MAX_PAGES}
+
+
+def reconcile_range(rows: list, listing: dict, cutoff: str):
+    """
+    Return the date range whose stored reservations must all appear in the crawl.
+
+    The range spans the crawled dates from the retention cutoff on. It starts
+    at the cutoff only if the listing reached back past it, that is, it holds
+    a row dated before the cutoff; a listing showing only upcoming bookings
+    says nothing about the days before its first row. A complete listing
+    sorted newest first starts with the room's newest booking, so the range
+    is left open at the end: stored days after that booking were cancelled
+    too. If MAX_PAGES cut the listing short, the date at the cut may continue
+    on the next page, so the range ends just before it.
+
+    Args:
+        rows (list): Crawled rows in listing order.
+        listing (dict): Result of fetch_listing.
+        cutoff (str): First date kept by retention (YYYY-MM-DD).
+
+    Returns:
+        tuple: (start_date, end_date) with end_date None if the range is open,
+            or None if nothing can be reconciled.
+    """
+    crawled = [date for date in _page_dates(rows) if ISO_DATE_PATTERN.fullmatch(date)]
+    dates = [date for date in crawled if date >= cutoff]
+    if not dates:
+        return None
+    start = cutoff if min(crawled) < cutoff else min(dates)
+    end = max(dates)
+    if not listing["complete"]:
         try:
-            res = requests.get(url, headers=headers, timeout=5)
-            if res.status_code == 200:
-                return res.text
-        except Exception as e:
-            print(f"⚠️ request failed: {e}")
-            time.sleep(delay)
-    return None
+            edge = datetime.strptime(format_date(rows[-1][0]), "%Y-%m-%d")
+        except ValueError:
+            return None
+        if listing["descending"]:
+            start = max(start, (edge + timedelta(days=1)).strftime("%Y-%m-%d"))
+        else:
+            end = min(end, (edge - timedelta(days=1)).strftime("%Y-%m-%d"))
+    elif listing["descending"]:
+        end = None
+    return (start, end) if end is None or start <= end else None
 
 
-def generate_print_link(a_tag) -> str:
-    """Extract print link URL from anchor tag."""
-    if not a_tag:
+def generate_print_link(href: str) -> str:
+    """Extract print link URL from the href of the print anchor."""
+    if not href:
         return None
-    href = a_tag.get("href")
     match = re.search(r"jf_facilityPrint\('(\d+)',\s*'(\d+)'\)", href)
     if match:
         seq, req = match.groups()
@@ -75,17 +346,7 @@ def generate_print_link(a_tag) -> str:
 
 def parse_reservation_table(html: str) -> list:
     """Extract reservation rows from facility table."""
-    soup = BeautifulSoup(html, "html.parser")
-    table = soup.find("table")
-    if not table:
-        return []
-    rows = []
-    for row in table.find("tbody").find_all("tr"):
-        cols = row.find_all("td")
-        values = [col.get_text(strip=True) for col in cols[:-1]]
-        print_link = generate_print_link(cols[-1].find("a"))
-        rows.append(values + [print_link])
-    return rows
+    return [values + [generate_print_link(href)] for values, href in parse_list_rows(html, HTML_PARSER)]
 
 
 def fetch_popup_details(print_url: str) -> dict:
@@ -97,84 +358,238 @@ def fetch_popup_details(print_url: str) -> dict:
     if not html:
         return {}
 
-    soup = BeautifulSoup(html, "html.parser")
-    table = soup.find("table", attrs={"width": "600px"})
     data = {}
+    for key, value in parse_detail_pairs(html, HTML_PARSER):
+        data[KEY_TRANSLATION.get(key, key)] = value
 
-    for row in table.find_all("tr"):
-        if row.find("th") and row.find("td"):
-            key = row.find("th").text.strip()
-            value = row.find("td").text.strip()
-            eng_key = KEY_TRANSLATION.get(key, key)
-            data[eng_key] = value
-
-    raw_time = data.get("datetime_range", "").replace("\n", "").replace("\t", "").strip()
-    match = re.search(r"\d{8} ~ \d{8}\s*(\d{2}:\d{2}) ~ (\d{2}:\d{2})", raw_time)
-    if match:
-        data["start_time"] = match.group(1)
-        data["end_time"] = match.group(2)
+    parsed = parse_datetime_range(data.get("datetime_range"))
+    if parsed.get("start_time"):
+        data["start_time"] = parsed["start_time"]
+        data["end_time"] = parsed["end_time"]
 
     return data
 
 
-def delete_outdated_reservations(room_id: str, before_date: str) -> int:
+def fetch_popup_details_concurrently(print_links: list, progress: CrawlProgress = None) -> dict:
     """
-    Delete all reservations in a room before the given date (exclusive).
+    Fetch several popup pages in parallel.
+
+    Args:
+        print_links (list): Print page URLs to fetch.
+        progress (CrawlProgress, optional): Counters updated as popups arrive.
+
+    Returns:
+        dict: Mapping of print link to its parsed popup data; {} if the fetch failed.
     """
-    delete_count = 0
-    query = db.collection("rooms").document(room_id).collection("reservations") \
-        .where("date", "<", before_date)
+    links = list(dict.fromkeys(link for link in print_links if link))
+    if not links:
+        return {}
 
-    docs = list(query.stream())
+    client = get_http_client()
+    popups = {}
+    with ThreadPoolExecutor(max_workers=min(len(links), client.max_concurrency)) as pool:
+        for link, data in zip(links, pool.map(fetch_popup_details, links)):
+            popups[link] = data
+            if progress is not None:
+                progress.add("popups_fetched" if data else "popups_failed")
+    return popups
 
-    for doc in docs:
-        doc.reference.delete()
-        delete_count += 1
 
-    return delete_count
+def extract_print_key(print_link: str):
+    """Extract the (seq, req) pair identifying a popup page from its print link."""
+    if not print_link:
+        return None
+    match = PRINT_KEY_PATTERN.search(print_link)
+    return match.groups() if match else None
 
 
-def crawl_facility_reservations(db_unused, room_id: str) -> dict:
+def needs_popup_fetch(existing: dict, doc_data: dict) -> bool:
+    """
+    Decide whether the popup page of a scraped row has to be fetched.
+
+    A popup is fetched for new reservations, for reservations whose list-table
+    fields changed, for reservations whose print key (seq/req) changed, and for
+    reservations stored before parsed start/end times were kept on the document.
+
+    Args:
+        existing (dict): Stored reservation data, or None if it is new.
+        doc_data (dict): Reservation data scraped from the list table.
+
+    Returns:
+        bool: True if the popup details should be (re)fetched.
+    """
+    if not doc_data.get("print_link"):
+        return False
+    if not existing or "start_time" not in existing:
+        return True
+    if extract_print_key(existing.get("print_link")) != extract_print_key(doc_data["print_link"]):
+        return True
+    return any(existing.get(k) != doc_data.get(k) for k in LIST_FIELDS)
+
+
+def is_crawl_running(room_id: str) -> bool:
+    """Return True if a crawl of the room is currently in progress."""
+    with _room_locks_lock:
+        lock = _room_locks.get(room_id)
+    return lock is not None and lock.locked()
+
+
+def crawl_facility_reservations(db_unused, room_id: str, progress: CrawlProgress = None, force: bool = False) -> dict:
     """
     Main logic to crawl reservations and sync with Firestore (room-based structure).
 
+    A room is never crawled twice at once; a call made while the room is being
+    crawled returns an error result immediately. Every page of the room's listing
+    is crawled, and stored reservations missing from the crawled date range are
+    deleted. If no listing page changed since the last crawl that fetched all
+    of its popups, parsing, diffing and Firestore I/O are skipped.
+
     Args:
         db_unused: Placeholder for DB context.
         room_id (str): Room ID (facility name) to crawl.
+        progress (CrawlProgress, optional): Counters updated while crawling.
+        force (bool): Process the listing even if it is unchanged.
 
     Returns:
-        dict: Crawling summary including counts of saves, updates, skips, and deletions.
+        dict: Crawling summary including the number of listing pages, counts of
+            saves, updates, skips, deletions, and fetched/failed/skipped popup pages.
     """
+    with _room_locks_lock:
+        lock = _room_locks.setdefault(room_id, threading.Lock())
+
+    if not lock.acquire(blocking=False):
+        return {"status": "error", "reason": f"Crawl already in progress for {room_id}"}
+    try:
+        started = time.perf_counter()
+        result = _crawl_room(room_id, progress or CrawlProgress(), force)
+        _record_crawl(room_id, result, time.perf_counter() - started)
+        return result
+    finally:
+        lock.release()
+
+
+def _record_crawl(room_id: str, result: dict, seconds: float):
+    if result.get("status") == "error":
+        outcome = "error"
+    elif result.get("page_unchanged"):
+        outcome = "unchanged"
+    else:
+        outcome = "ok"
+    CRAWL_SECONDS.labels(room_id=room_label(room_id), outcome=outcome).observe(seconds)
+    for field in CRAWL_ITEM_COUNTS:
+        if result.get(field):
+            CRAWL_ITEMS.labels(room_id=room_label(room_id), item=field[:-len("_count")]).inc(result[field])
+
+
+def _change_event(change_type: str, room_id: str, reservation_id: str, doc_data: dict,
+                  existing: dict = None) -> dict:
+    # Upserts carry the whole stored row, crawled fields merged over the stored ones, so
+    # the newest entry of a reservation alone rebuilds it once older entries are compacted
+    reservation = {k: v for k, v in (existing or {}).items() if k not in STORAGE_ONLY_FIELDS}
+    reservation.update(doc_data, id=reservation_id)
+    return {
+        "type": change_type,
+        "room_id": room_id,
+        "id": reservation_id,
+        "date": doc_data["date"],
+        "reservation": reservation
+    }
+
+
+def _store_listing(pages: list):
+    # Validators of every page; the first page also remembers how many pages were crawled
+    for index, (page_url, page, _) in enumerate(pages):
+        fetch_cache.store(
+            page_url,
+            page["content_hash"],
+            page["etag"],
+            page["last_modified"],
+            page_count=len(pages) if index == 0 else None
+        )
+
+
+def _forget_listing(pages: list):
+    for page_url, _, _ in pages:
+        fetch_cache.forget(page_url)
+
+
+def _crawl_room(room_id: str, progress: CrawlProgress, force: bool) -> dict:
     config = load_facility_config()
     url = config.get(room_id)
     if not url:
         return {"status": "error", "reason": f"No URL configured for {room_id}"}
 
-    html = fetch_with_retry(url)
-    if not html:
+    cutoff = retention_cutoff()
+    listing = fetch_listing(url, room_id, force, cutoff)
+    if not listing:
         return {"status": "error", "reason": "Failed to fetch page"}
 
-    rows = parse_reservation_table(html)
+    if listing["unchanged"]:
+        return {
+            "status": "ok",
+            "facility": room_id,
+            "page_unchanged": True,
+            "page_count": fetch_cache.page_count(url) or 1,
+            "saved_count": 0,
+            "updated_count": 0,
+            "skipped_count": 0,
+            "deleted_count": 0,
+            "popup_fetched_count": 0,
+            "popup_failed_count": 0,
+            "popup_skipped_count": 0,
+            "write_count": 0
+        }
+
+    pages = listing["pages"]
+    rows = [row for _, _, page_rows in pages for row in page_rows]
+    progress.add("rows_parsed", len(rows))
+    CRAWL_ITEMS.labels(room_id=room_label(room_id), item="rows_parsed").inc(len(rows))
+    reconciled = reconcile_range(rows, listing, cutoff)
+    # Reservations before the cutoff would only be written to be pruned again. A row
+    # that shifted to the next page during the crawl is listed twice; it is processed once
+    unique = {}
+    for row in rows:
+        if format_date(row[0]) >= cutoff:
+            unique.setdefault((format_date(row[0]), row[3]), row)
+    rows = list(unique.values())
     saved_count = 0
     updated_count = 0
     skipped_count = 0
     crawled_ids = set()
 
-    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-    
-    outdated_deleted_count = delete_outdated_reservations(room_id, yesterday)
+    # All mutations of this crawl are committed together in WriteBatch chunks;
+    # outdated reservations are pruned separately by the retention service
+    batch = BatchWriter(on_chunk_committed=lambda count: progress.add("writes_committed", count), room_id=room_id)
 
     if not rows:
+        batch.flush()
+        _store_listing(pages)
         return {
             "status": "ok",
             "facility": room_id,
+            "page_unchanged": False,
+            "page_count": len(pages),
             "saved_count": 0,
             "updated_count": 0,
             "skipped_count": 0,
             "deleted_count": 0,
-            "outdated_deleted_count": outdated_deleted_count
+            "popup_fetched_count": 0,
+            "popup_failed_count": 0,
+            "popup_skipped_count": 0,
+            "write_count": batch.committed_count
         }
 
+    dates = [format_date(row[0]) for row in rows]
+    open_ended = reconciled is not None and reconciled[1] is None
+    with observe(CRAWL_PHASE_SECONDS, room_id=room_id, phase="load_existing"):
+        existing_index = load_existing_reservations(room_id, min(dates), None if open_ended else max(dates))
+    if open_ended:
+        # Close the range at the room's last stored date so deletions, snapshots
+        # and the availability index also cover the days after the newest booking
+        stored_dates = [data.get("date") or "" for data in existing_index.by_id.values()]
+        reconciled = (reconciled[0], max([max(dates), *stored_dates]))
+
+    plan = []
     for row in rows:
         raw_date, place, department, event, approval, print_link = row
         date = format_date(raw_date)
@@ -188,38 +603,129 @@ def crawl_facility_reservations(db_unused, room_id: str) -> dict:
             "approval": approval,
             "print_link": print_link or ""
         }
+        parsed = parse_datetime_range(raw_date)
+        doc_data["start_date"] = parsed.get("start_date", date)
+        doc_data["end_date"] = parsed.get("end_date", date)
 
-        popup_data = {}
-        if print_link:
-            popup_data = fetch_popup_details(print_link)
-
-        reservation_id, existing = find_reservation(room_id, date, event)
+        reservation_id, existing = existing_index.find(date, event)
         if not reservation_id:
             reservation_id = hash_reservation(doc_data)
 
         crawled_ids.add(reservation_id)
-
-        if existing:
-            if any(existing.get(k) != doc_data.get(k) for k in doc_data):
-                upsert_reservation(room_id, reservation_id, doc_data)
-                updated_count += 1
-            else:
-                skipped_count += 1
-        else:
-            upsert_reservation(room_id, reservation_id, doc_data)
+        plan.append((reservation_id, existing, doc_data, needs_popup_fetch(existing, doc_data)))
+
+    with observe(CRAWL_PHASE_SECONDS, room_id=room_id, phase="popup_fetch"):
+        popups = fetch_popup_details_concurrently(
+            [doc_data["print_link"] for _, _, doc_data, fetch in plan if fetch],
+            progress
+        )
+    # fetch_popup_details returns {} for a popup it could not fetch or parse
+    popup_fetched_count = sum(1 for data in popups.values() if data)
+    popup_failed_count = len(popups) - popup_fetched_count
+    popup_skipped_count = sum(1 for _, _, doc_data, fetch in plan if doc_data["print_link"] and not fetch)
+
+    changes = []
+    with observe(CRAWL_PHASE_SECONDS, room_id=room_id, phase="write"):
+        for reservation_id, existing, doc_data, fetch in plan:
+            popup_data = popups.get(doc_data["print_link"], {}) if fetch else {}
             if popup_data:
-                add_popup_details(room_id, reservation_id, popup_data)
-            saved_count += 1
-
-    latest_date = format_date(rows[0][0])
-    deleted_count = sync_reservations(room_id, latest_date, crawled_ids)
+                # Times parsed from the popup are stored so reads need no regex work per row
+                doc_data["start_time"] = popup_data.get("start_time")
+                doc_data["end_time"] = popup_data.get("end_time")
+
+            if existing:
+                if any(existing.get(k) != doc_data.get(k) for k in doc_data):
+                    upsert_reservation(room_id, reservation_id, doc_data, batch)
+                    if popup_data:
+                        add_popup_details(room_id, reservation_id, popup_data, batch)
+                    changes.append(_change_event("update", room_id, reservation_id, doc_data, existing))
+                    updated_count += 1
+                else:
+                    skipped_count += 1
+            else:
+                upsert_reservation(room_id, reservation_id, doc_data, batch)
+                if popup_data:
+                    add_popup_details(room_id, reservation_id, popup_data, batch)
+                changes.append(_change_event("insert", room_id, reservation_id, doc_data))
+                saved_count += 1
+
+    deleted = []
+    if reconciled:
+        with observe(CRAWL_PHASE_SECONDS, room_id=room_id, phase="delete"):
+            deleted = sync_reservations(room_id, *reconciled, crawled_ids, batch)
+    changes.extend(
+        {"type": "delete", "room_id": room_id, "id": reservation_id, "date": date}
+        for reservation_id, date in deleted
+    )
+    snapshots = {"written": 0}
+    if reconciled and DAY_SNAPSHOTS_ENABLED:
+        with observe(CRAWL_PHASE_SECONDS, room_id=room_id, phase="snapshot"):
+            snapshots = refresh_day_snapshots(
+                room_id,
+                [
+                    (reservation_id, {**(existing or {}), **doc_data},
+                     (popups.get(doc_data["print_link"]) or None) if fetch else None)
+                    for reservation_id, existing, doc_data, fetch in plan
+                ],
+                *reconciled,
+                batch,
+                {change["date"] for change in changes}
+            )
+    with observe(CRAWL_PHASE_SECONDS, room_id=room_id, phase="commit"):
+        batch.flush()
+    if popup_failed_count:
+        # Rows of failed popups were stored without times; forgetting the listing makes
+        # the next crawl process it again instead of taking the unchanged shortcut
+        _forget_listing(pages)
+    else:
+        _store_listing(pages)
+    record_changes(changes)
+    change_broadcaster.publish(room_id, changes)
+    if reconciled:
+        # Stored fields the crawl did not overwrite (e.g. times of skipped popups) still apply
+        availability_index.update_room(
+            room_id, [{**(existing or {}), **doc_data} for _, existing, doc_data, _ in plan], *reconciled
+        )
 
     return {
         "status": "ok",
         "facility": room_id,
+        "page_unchanged": False,
+        "page_count": len(pages),
         "saved_count": saved_count,
         "updated_count": updated_count,
         "skipped_count": skipped_count,
-        "deleted_count": deleted_count,
-        "outdated_deleted_count": outdated_deleted_count
-    }
\ No newline at end of file
+        "deleted_count": len(deleted),
+        "popup_fetched_count": popup_fetched_count,
+        "popup_failed_count": popup_failed_count,
+        "popup_skipped_count": popup_skipped_count,
+        "snapshot_written_count": snapshots["written"],
+        "write_count": batch.committed_count
+    }
+
+
+def crawl_facilities(room_ids: list, progress: dict = None, force: bool = False) -> dict:
+    """
+    Crawl several rooms concurrently.
+
+    List pages and popup pages of all rooms are fetched in parallel, bounded by
+    the shared HTTP client's global and per-host concurrency limits.
+
+    Args:
+        room_ids (list): Room IDs to crawl.
+        progress (dict, optional): Mapping of room ID to its CrawlProgress.
+        force (bool): Process pages even if they are unchanged.
+
+    Returns:
+        dict: Mapping of room ID to its crawling summary.
+    """
+    if not room_ids:
+        return {}
+
+    progress = progress or {}
+    with ThreadPoolExecutor(max_workers=len(room_ids)) as pool:
+        results = pool.map(
+            lambda room_id: crawl_facility_reservations(None, room_id, progress.get(room_id), force),
+            room_ids
+        )
+        return dict(zip(room_ids, results))
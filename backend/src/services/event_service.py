@@ -0,0 +1,149 @@
+"""
+In-process fan-out of reservation change events to stream subscribers.
+
+Crawls publish from worker threads; every subscriber is an asyncio queue
+owned by the event loop serving its stream. Subscribers are indexed by room,
+so publishing touches only the subscribers of the changed room, and an idle
+subscriber costs one pending queue read.
+"""
+
+import asyncio
+import itertools
+import threading
+
+from utils import load_events_config
+
+_config = load_events_config()
+
+QUEUE_SIZE = _config.get("queue_size", 100)
+HEARTBEAT_SECONDS = _config.get("heartbeat_seconds", 15)
+MAX_SUBSCRIBERS = _config.get("max_subscribers", 1000)
+
+# Sent instead of changes a subscriber was too slow to receive
+RESYNC_EVENT = {"type": "resync"}
+
+
+class Subscription:
+    """A stream subscriber with its filter and bounded event queue."""
+
+    __slots__ = ("room_ids", "start_date", "end_date", "queue", "loop", "dropped_count")
+
+    def __init__(self, room_ids: list, start_date: str, end_date: str, loop, queue_size: int):
+        self.room_ids = set(room_ids) if room_ids else None
+        self.start_date = start_date
+        self.end_date = end_date
+        # Room for the resync marker plus one event
+        self.queue = asyncio.Queue(maxsize=max(queue_size, 2))
+        self.loop = loop
+        self.dropped_count = 0
+
+    def matches(self, event: dict) -> bool:
+        """Return True if the event's date is within the subscribed range."""
+        date = event.get("date") or ""
+        if self.start_date and date < self.start_date:
+            return False
+        return not (self.end_date and date > self.end_date)
+
+    def _deliver(self, events: list):
+        # Runs on the subscriber's event loop
+        for event in events:
+            if self.queue.full():
+                # Replace the backlog with a resync marker; the client refetches
+                while not self.queue.empty():
+                    if self.queue.get_nowait() is not RESYNC_EVENT:
+                        self.dropped_count += 1
+                self.queue.put_nowait(RESYNC_EVENT)
+            self.queue.put_nowait(event)
+
+
+class ChangeBroadcaster:
+    """Thread-safe publisher of change events to per-room subscriber sets."""
+
+    def __init__(self, queue_size: int = QUEUE_SIZE, max_subscribers: int = MAX_SUBSCRIBERS):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._by_room = {}
+        self._count = 0
+        self._sequence = itertools.count(1)
+        self._published_count = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, room_ids: list = None, start_date: str = None, end_date: str = None) -> Subscription:
+        """
+        Register a subscriber on the running event loop.
+
+        Args:
+            room_ids (list, optional): Rooms to receive changes of. All rooms when omitted.
+            start_date (str, optional): First date (YYYY-MM-DD) of changes to receive.
+            end_date (str, optional): Last date (YYYY-MM-DD) of changes to receive.
+
+        Returns:
+            Subscription: The subscriber, or None if max_subscribers is reached.
+        """
+        subscription = Subscription(room_ids, start_date, end_date, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                return None
+            for room_id in subscription.room_ids or [None]:
+                self._by_room.setdefault(room_id, set()).add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscriber; unknown subscribers are ignored."""
+        with self._lock:
+            removed = False
+            for room_id in subscription.room_ids or [None]:
+                subscribers = self._by_room.get(room_id)
+                if subscribers and subscription in subscribers:
+                    subscribers.discard(subscription)
+                    removed = True
+                    if not subscribers:
+                        del self._by_room[room_id]
+            if removed:
+                self._count -= 1
+
+    def publish(self, room_id: str, events: list):
+        """
+        Send change events of a room to its matching subscribers.
+
+        Each event gets an increasing "seq". Delivery is scheduled on the
+        subscribers' event loops, so this never blocks on slow clients.
+
+        Args:
+            room_id (str): Room the events belong to.
+            events (list): Change event dictionaries with at least "type" and "date".
+        """
+        if not events:
+            return
+        with self._lock:
+            for event in events:
+                event.setdefault("seq", next(self._sequence))
+            self._published_count += len(events)
+            subscribers = list(self._by_room.get(room_id, ())) + list(self._by_room.get(None, ()))
+
+        closed = []
+        for subscription in subscribers:
+            matching = [event for event in events if subscription.matches(event)]
+            if not matching:
+                continue
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, matching)
+            except RuntimeError:
+                # The subscriber's event loop is closed
+                closed.append(subscription)
+        for subscription in closed:
+            self.unsubscribe(subscription)
+
+    def stats(self) -> dict:
+        """Return subscriber and published event counts."""
+        with self._lock:
+            subscribers = {s for subs in self._by_room.values() for s in subs}
+            return {
+                "subscribers": self._count,
+                "published_count": self._published_count,
+                "dropped_count": sum(s.dropped_count for s in subscribers)
+            }
+
+
+change_broadcaster = ChangeBroadcaster()
@@ -0,0 +1,92 @@
+import hashlib
+import threading
+
+
+class FetchCache:
+    """
+    Per-URL store of HTTP validators and body hashes from the last successful crawl.
+
+    It is used to send conditional requests (If-None-Match / If-Modified-Since)
+    and to recognise pages whose content did not change since the last crawl.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def conditional_headers(self, url: str) -> dict:
+        """
+        Build conditional request headers from the stored validators of a URL.
+
+        Args:
+            url (str): Page URL.
+
+        Returns:
+            dict: If-None-Match / If-Modified-Since headers, empty if nothing is stored.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def content_hash(self, url: str):
+        """Return the body hash stored for a URL, or None."""
+        with self._lock:
+            entry = self._entries.get(url)
+        return entry.get("content_hash") if entry else None
+
+    def page_count(self, url: str):
+        """Return the number of listing pages crawled with this first page, or None."""
+        with self._lock:
+            entry = self._entries.get(url)
+        return entry.get("page_count") if entry else None
+
+    def store(self, url: str, content_hash: str, etag: str = None, last_modified: str = None,
+              page_count: int = None):
+        """
+        Remember the validators and body hash of a successfully processed page.
+
+        Args:
+            url (str): Page URL.
+            content_hash (str): SHA-256 of the page body.
+            etag (str, optional): ETag response header.
+            last_modified (str, optional): Last-Modified response header.
+            page_count (int, optional): For the first page of a listing, the number
+                of pages crawled with it.
+        """
+        with self._lock:
+            self._entries[url] = {
+                "content_hash": content_hash,
+                "etag": etag,
+                "last_modified": last_modified,
+                "page_count": page_count
+            }
+
+    def forget(self, url: str):
+        """Drop the validators and body hash of a URL so its next fetch is processed in full."""
+        with self._lock:
+            self._entries.pop(url, None)
+
+
+def hash_content(body: str) -> str:
+    """
+    Return the SHA-256 hex digest of a page body.
+
+    Only the markup from the first <table to the last </table> is hashed when
+    present, so per-request noise in headers, scripts and footers does not
+    defeat the comparison.
+    """
+    start = body.find("<table")
+    end = body.rfind("</table>")
+    if start != -1 and end > start:
+        body = body[start:end]
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+fetch_cache = FetchCache()
@@ -0,0 +1,114 @@
+from importlib.util import find_spec
+
+# Parser libraries are only probed here; bs4, lxml and selectolax are imported
+# on the first parse so they stay off the startup path
+HAS_SELECTOLAX = find_spec("selectolax") is not None and find_spec("selectolax.lexbor") is not None
+HAS_LXML = find_spec("lxml") is not None
+
+# Supported backends in order of preference for "auto"
+HTML_PARSER_BACKENDS = ["selectolax", "lxml", "html.parser"]
+
+
+def resolve_backend(name: str = "auto") -> str:
+    """
+    Resolve the configured HTML parser backend to one that is installed.
+
+    Args:
+        name (str): "auto", "selectolax", "lxml" or "html.parser".
+
+    Returns:
+        str: The backend to use. Falls back to "html.parser" if the requested
+            one is unavailable.
+    """
+    available = {
+        "selectolax": HAS_SELECTOLAX,
+        "lxml": HAS_LXML,
+        "html.parser": True
+    }
+    if name == "auto":
+        return next(backend for backend in HTML_PARSER_BACKENDS if available[backend])
+    if available.get(name):
+        return name
+    return "html.parser"
+
+
+def _soup(html: str, backend: str, *strainer_args, **strainer_kwargs):
+    # Only the matching tables are built into a tree; the rest of the page is skipped
+    from bs4 import BeautifulSoup, SoupStrainer
+    return BeautifulSoup(html, backend, parse_only=SoupStrainer(*strainer_args, **strainer_kwargs))
+
+
+def _selectolax(html: str):
+    from selectolax.lexbor import LexborHTMLParser
+    return LexborHTMLParser(html)
+
+
+def parse_list_rows(html: str, backend: str) -> list:
+    """
+    Extract the rows of the first table's body on a facility list page.
+
+    Args:
+        html (str): List page HTML.
+        backend (str): Resolved parser backend.
+
+    Returns:
+        List[Tuple[List[str], str]]: For each row, the stripped texts of all
+            cells but the last, and the href of the anchor in the last cell.
+    """
+    if backend == "selectolax":
+        table = _selectolax(html).css_first("table")
+        if table is None:
+            return []
+        rows = []
+        for row in table.css_first("tbody").css("tr"):
+            cols = row.css("td")
+            values = [col.text(deep=True, separator="", strip=True) for col in cols[:-1]]
+            anchor = cols[-1].css_first("a")
+            rows.append((values, anchor.attributes.get("href") if anchor is not None else None))
+        return rows
+
+    soup = _soup(html, backend, "table")
+    table = soup.find("table")
+    if not table:
+        return []
+    rows = []
+    for row in table.find("tbody").find_all("tr"):
+        cols = row.find_all("td")
+        values = [col.get_text(strip=True) for col in cols[:-1]]
+        anchor = cols[-1].find("a")
+        rows.append((values, anchor.get("href") if anchor else None))
+    return rows
+
+
+def parse_detail_pairs(html: str, backend: str) -> list:
+    """
+    Extract header/value pairs from the detail table of a print page.
+
+    Args:
+        html (str): Print page HTML.
+        backend (str): Resolved parser backend.
+
+    Returns:
+        List[Tuple[str, str]]: Stripped (th, td) texts of each row having both.
+    """
+    if backend == "selectolax":
+        table = _selectolax(html).css_first('table[width="600px"]')
+        if table is None:
+            return []
+        pairs = []
+        for row in table.css("tr"):
+            th, td = row.css_first("th"), row.css_first("td")
+            if th is not None and td is not None:
+                pairs.append((th.text(deep=True).strip(), td.text(deep=True).strip()))
+        return pairs
+
+    soup = _soup(html, backend, "table", attrs={"width": "600px"})
+    table = soup.find("table", attrs={"width": "600px"})
+    if not table:
+        return []
+    pairs = []
+    for row in table.find_all("tr"):
+        th, td = row.find("th"), row.find("td")
+        if th and td:
+            pairs.append((th.text.strip(), td.text.strip()))
+    return pairs
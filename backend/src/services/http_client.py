@@ -0,0 +1,327 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils import load_crawler_config, HTTP_FETCH_SECONDS, HTTP_ATTEMPTS
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/119.0.0.0 Safari/537.36"
+    ),
+    "Referer": "https://www.inha.ac.kr/"
+}
+
+# Responses worth retrying; anything else that is not 200/304 fails immediately
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Blocking token-bucket rate limiter."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Fails fast after consecutive failures towards a host.
+
+    After failure_threshold consecutive failures the circuit opens and requests
+    are rejected for reset_timeout seconds; then a single trial request is let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return True if a request may be sent now."""
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return True
+            return self.state == "closed"
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+class FetchResult:
+    """Outcome of a fetch including retries and latency."""
+
+    def __init__(self, url: str, response: requests.Response = None, attempts: int = 0,
+                 latency: float = 0.0, error: str = None):
+        self.url = url
+        self.response = response
+        self.attempts = attempts
+        self.latency = latency
+        self.error = error
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.attempts - 1)
+
+
+class HttpClient:
+    """
+    Shared keep-alive HTTP client with global and per-host concurrency limits.
+
+    A single `requests.Session` is reused by every crawler thread so TCP/TLS
+    connections to the facility site are pooled instead of re-opened per page.
+    Every host additionally gets a token-bucket rate limiter and a circuit
+    breaker, and `fetch` retries with exponential backoff and jitter.
+    """
+
+    def __init__(self, max_concurrency: int = 16, per_host_concurrency: int = 8, timeout: float = 5,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 10,
+                 rate_per_second: float = 5, burst: int = 10,
+                 breaker_failure_threshold: int = 5, breaker_reset_seconds: float = 30):
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.breaker_failure_threshold = breaker_failure_threshold
+        self.breaker_reset_seconds = breaker_reset_seconds
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._global_limit = threading.BoundedSemaphore(max_concurrency)
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url: str) -> dict:
+        """Return the limiter, breaker and counters of the URL's host."""
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = {
+                    "name": host,
+                    "limit": threading.BoundedSemaphore(self.per_host_concurrency),
+                    "bucket": TokenBucket(self.rate_per_second, self.burst),
+                    "breaker": CircuitBreaker(self.breaker_failure_threshold, self.breaker_reset_seconds),
+                    "stats": {
+                        "requests": 0,
+                        "attempts": 0,
+                        "retries": 0,
+                        "failures": 0,
+                        "short_circuited": 0,
+                        "latency_total": 0.0,
+                        "latency_max": 0.0
+                    }
+                }
+            return self._hosts[host]
+
+    @contextmanager
+    def slot(self, url: str):
+        """Acquire a global and a per-host request slot for the given URL."""
+        with self._global_limit, self._host(url)["limit"]:
+            yield
+
+    def get(self, url: str, headers: dict = None) -> requests.Response:
+        """
+        Perform a single rate-limited GET request within the concurrency limits.
+
+        Args:
+            url (str): URL to fetch.
+            headers (dict, optional): Extra request headers.
+
+        Returns:
+            requests.Response: The HTTP response.
+        """
+        self._host(url)["bucket"].acquire()
+        with self.slot(url):
+            return self.session.get(url, headers=headers, timeout=self.timeout)
+
+    def fetch(self, url: str, headers: dict = None, max_retries: int = None) -> FetchResult:
+        """
+        GET a URL with retries, backoff, Retry-After handling and circuit breaking.
+
+        Connection errors, timeouts and 429/5xx responses are retried with
+        exponential backoff and full jitter; a Retry-After header overrides the
+        computed delay. Other non-200/304 responses fail immediately but,
+        being complete responses, count as a success for the circuit breaker.
+
+        Args:
+            url (str): URL to fetch.
+            headers (dict, optional): Extra request headers.
+            max_retries (int, optional): Attempts before giving up.
+
+        Returns:
+            FetchResult: The 200/304 response (or None on failure), attempts and latency.
+        """
+        host = self._host(url)
+        breaker = host["breaker"]
+        result = FetchResult(url)
+        started = time.monotonic()
+
+        for attempt in range(max_retries or self.max_retries):
+            if not breaker.allow():
+                result.error = "circuit open"
+                result.latency = time.monotonic() - started
+                self._record(host, result, short_circuited=True)
+                return result
+
+            result.attempts += 1
+            retry_after = None
+            host_up = False
+            try:
+                res = self.get(url, headers)
+                # Any complete response shows the host is up; only 429/5xx count against it
+                host_up = res.status_code not in RETRY_STATUSES
+                if res.status_code in (200, 304):
+                    result.response = res
+                    result.error = None
+                    break
+                result.error = f"HTTP {res.status_code}"
+                if host_up:
+                    break
+                retry_after = parse_retry_after(res.headers.get("Retry-After"))
+            except requests.RequestException as e:
+                result.error = str(e)
+            finally:
+                # Always settles the breaker, so a half-open trial request never leaves it half-open
+                if host_up:
+                    breaker.record_success()
+                else:
+                    breaker.record_failure()
+
+            if attempt + 1 < (max_retries or self.max_retries):
+                time.sleep(self._backoff(attempt, retry_after))
+
+        result.latency = time.monotonic() - started
+        self._record(host, result)
+        return result
+
+    def _backoff(self, attempt: int, retry_after: float = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _record(self, host: dict, result: FetchResult, short_circuited: bool = False):
+        outcome = "short_circuited" if short_circuited else "ok" if result.response is not None else "failed"
+        HTTP_FETCH_SECONDS.labels(host=host["name"], outcome=outcome).observe(result.latency)
+        HTTP_ATTEMPTS.labels(host=host["name"]).inc(result.attempts)
+        with self._lock:
+            stats = host["stats"]
+            stats["requests"] += 1
+            stats["attempts"] += result.attempts
+            stats["retries"] += result.retries
+            stats["latency_total"] += result.latency
+            stats["latency_max"] = max(stats["latency_max"], result.latency)
+            if result.response is None:
+                stats["failures"] += 1
+            if short_circuited:
+                stats["short_circuited"] += 1
+
+    def stats(self) -> dict:
+        """
+        Report per-host request counters, latencies and circuit breaker state.
+
+        Returns:
+            dict: Mapping of host to its counters.
+        """
+        with self._lock:
+            report = {}
+            for name, host in self._hosts.items():
+                stats = dict(host["stats"])
+                stats["latency_avg"] = stats["latency_total"] / stats["requests"] if stats["requests"] else 0.0
+                stats["circuit"] = host["breaker"].state
+                report[name] = stats
+            return report
+
+
+def parse_retry_after(value: str):
+    """
+    Parse a Retry-After header given in seconds or as an HTTP date.
+
+    Returns:
+        float: Seconds to wait, or None if absent or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """
+    Return the process-wide HTTP client, creating it from config on first use.
+
+    Returns:
+        HttpClient: Shared HTTP client.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            config = load_crawler_config()
+            _client = HttpClient(
+                max_concurrency=config.get("max_concurrency", 16),
+                per_host_concurrency=config.get("per_host_concurrency", 8),
+                timeout=config.get("timeout", 5),
+                max_retries=config.get("max_retries", 3),
+                backoff_base=config.get("backoff_base", 0.5),
+                backoff_max=config.get("backoff_max", 10),
+                rate_per_second=config.get("rate_per_second", 5),
+                burst=config.get("burst", 10),
+                breaker_failure_threshold=config.get("breaker_failure_threshold", 5),
+                breaker_reset_seconds=config.get("breaker_reset_seconds", 30)
+            )
+        return _client
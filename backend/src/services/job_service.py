@@ -0,0 +1,128 @@
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from utils import load_jobs_config
+from .crawling_service import CrawlProgress, crawl_facilities
+
+
+class CrawlJob:
+    """A queued or running crawl of one or more rooms."""
+
+    def __init__(self, kind: str, room_ids: list, force: bool = False):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.room_ids = room_ids
+        self.force = force
+        self.status = "queued"
+        self.created_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self.progress = {room_id: CrawlProgress() for room_id in room_ids}
+        self.results = None
+        self.error = None
+
+    @property
+    def in_flight(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def to_dict(self) -> dict:
+        """
+        Serialize the job for status responses.
+
+        Returns:
+            dict: Job status, timestamps, per-room and total progress, and results when finished.
+        """
+        rooms = {room_id: p.to_dict() for room_id, p in self.progress.items()}
+        totals = dict.fromkeys(CrawlProgress.FIELDS, 0)
+        for counts in rooms.values():
+            for field, value in counts.items():
+                totals[field] += value
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "room_ids": self.room_ids,
+            "force": self.force,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": {**totals, "rooms": rooms},
+            "results": self.results,
+            "error": self.error
+        }
+
+
+class CrawlJobManager:
+    """
+    Runs crawl jobs on a background thread pool and keeps their status.
+
+    Requests for rooms that are already covered by a queued or running job are
+    deduplicated onto that job. Only the most recent finished jobs are kept.
+    """
+
+    def __init__(self, max_workers: int = 2, history_size: int = 100):
+        self.history_size = history_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crawl-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, room_ids: list, force: bool = False):
+        """
+        Enqueue a crawl job unless an identical one is already in flight.
+
+        Args:
+            kind (str): "room" for a single room or "all" for every facility.
+            room_ids (list): Room IDs to crawl.
+            force (bool): Process pages even if they are unchanged since the last crawl.
+
+        Returns:
+            Tuple[CrawlJob, bool]: The job and whether an in-flight job was reused.
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.in_flight and (job.kind == kind or kind == "room") \
+                        and set(room_ids) <= set(job.room_ids) and (job.force or not force):
+                    return job, True
+
+            job = CrawlJob(kind, room_ids, force)
+            self._jobs[job.id] = job
+            self._trim()
+
+        self._executor.submit(self._run, job)
+        return job, False
+
+    def get(self, job_id: str):
+        """Return the job with the given ID, or None."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> list:
+        """Return all known jobs, newest first."""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def _run(self, job: CrawlJob):
+        job.status = "running"
+        job.started_at = datetime.now().isoformat()
+        try:
+            job.results = crawl_facilities(job.room_ids, job.progress, job.force)
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        job.finished_at = datetime.now().isoformat()
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.in_flight]
+        for job_id in finished[:max(0, len(self._jobs) - self.history_size)]:
+            del self._jobs[job_id]
+
+
+_jobs_config = load_jobs_config()
+crawl_jobs = CrawlJobManager(
+    max_workers=_jobs_config.get("max_workers", 2),
+    history_size=_jobs_config.get("history_size", 100)
+)
@@ -0,0 +1,147 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from utils import load_facility_config, load_retention_config
+from cruds import BatchWriter, prune_reservations_before, prune_orphaned_popup_details, prune_day_snapshots_before
+from .availability_service import availability_index
+from .change_log_service import compact as compact_change_log
+
+# Counters reported by every pruning step
+RETENTION_FIELDS = ["deleted_count", "subdocument_count", "snapshot_count", "bytes_reclaimed"]
+
+_stats_lock = threading.Lock()
+_run_lock = threading.Lock()
+_last_run = None
+_totals = dict.fromkeys(RETENTION_FIELDS, 0)
+
+
+def _add(totals: dict, result: dict):
+    for field in RETENTION_FIELDS:
+        totals[field] += result.get(field, 0)
+
+
+def retention_cutoff(config: dict = None) -> str:
+    """
+    Return the first date kept by retention (YYYY-MM-DD).
+
+    Args:
+        config (dict, optional): Retention config. Loaded when omitted.
+    """
+    config = config or load_retention_config()
+    return (datetime.now() - timedelta(days=config.get("keep_days", 1))).strftime("%Y-%m-%d")
+
+
+def prune_room(room_id: str, before_date: str, chunk_size: int = 200, max_deletes: int = 2000,
+               sweep_orphans: bool = True) -> dict:
+    """
+    Prune a room's reservations dated before a date in bounded, batched chunks.
+
+    Each chunk is queried, deleted and committed before the next one is read,
+    so no run holds more than chunk_size documents in memory, and at most
+    max_deletes reservations are removed per run.
+
+    Args:
+        room_id (str): Room identifier.
+        before_date (str): First date to keep (YYYY-MM-DD).
+        chunk_size (int): Reservations deleted per query and batch commit.
+        max_deletes (int): Upper bound of reservations deleted in this run.
+        sweep_orphans (bool): Also delete popup details left without a reservation.
+
+    Returns:
+        dict: Deleted reservations, subcollection documents and day snapshots, and
+            bytes reclaimed.
+    """
+    totals = dict.fromkeys(RETENTION_FIELDS, 0)
+    while totals["deleted_count"] < max_deletes:
+        limit = min(chunk_size, max_deletes - totals["deleted_count"])
+        with BatchWriter(room_id=room_id) as batch:
+            result = prune_reservations_before(room_id, before_date, limit, batch)
+        _add(totals, result)
+        if result["deleted_count"] < limit:
+            break
+
+    if sweep_orphans:
+        with BatchWriter(room_id=room_id) as batch:
+            _add(totals, prune_orphaned_popup_details(room_id, max_deletes, batch))
+
+    with BatchWriter(room_id=room_id) as batch:
+        totals["snapshot_count"] += prune_day_snapshots_before(room_id, before_date, batch)
+    return totals
+
+
+def run_retention(room_ids: list = None) -> dict:
+    """
+    Prune outdated reservations of every configured room once and compact the change log.
+
+    Runs are serialized; a run requested while another is in progress is skipped.
+
+    Args:
+        room_ids (list, optional): Rooms to prune. All configured rooms when omitted.
+
+    Returns:
+        dict: Cutoff date, per-room and total counts and the run duration, or
+            an error result if a run is already in progress.
+    """
+    global _last_run
+    if not _run_lock.acquire(blocking=False):
+        return {"status": "error", "reason": "Retention run already in progress"}
+    try:
+        config = load_retention_config()
+        before_date = retention_cutoff(config)
+        started = time.perf_counter()
+
+        rooms = {}
+        totals = dict.fromkeys(RETENTION_FIELDS, 0)
+        for room_id in room_ids or list(load_facility_config()):
+            rooms[room_id] = prune_room(
+                room_id,
+                before_date,
+                chunk_size=config.get("chunk_size", 200),
+                max_deletes=config.get("max_deletes_per_run", 2000),
+                sweep_orphans=config.get("sweep_orphans", True)
+            )
+            _add(totals, rooms[room_id])
+        availability_index.prune_before(before_date)
+        change_log = compact_change_log()
+
+        result = {
+            "status": "ok",
+            "before_date": before_date,
+            "finished_at": datetime.now().isoformat(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            **totals,
+            "rooms": rooms,
+            "change_log": change_log
+        }
+        with _stats_lock:
+            _last_run = result
+            _add(_totals, totals)
+        return result
+    finally:
+        _run_lock.release()
+
+
+def run_scheduled_retention() -> None:
+    """Run retention from the scheduler and log the outcome."""
+    try:
+        result = run_retention()
+    except Exception as e:
+        print(f"⚠️ retention run failed: {e}")
+        return
+    if result.get("status") == "error":
+        print(f"⚠️ retention run skipped: {result.get('reason')}")
+    else:
+        print(f"Retention run done: {result['deleted_count']} reservations, "
+              f"{result['subdocument_count']} subdocuments, {result['bytes_reclaimed']} bytes reclaimed")
+
+
+def get_retention_stats() -> dict:
+    """
+    Report what retention has reclaimed since the process started.
+
+    Returns:
+        dict: Cumulative counts and the result of the last run.
+    """
+    with _stats_lock:
+        return {**_totals, "last_run": _last_run}
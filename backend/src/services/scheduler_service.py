@@ -0,0 +1,88 @@
+from utils import load_facility_config, load_scheduler_config, load_retention_config
+from .crawling_service import crawl_facility_reservations
+from .retention_service import run_scheduled_retention
+
+_scheduler = None
+
+
+def run_scheduled_crawl(room_id: str) -> None:
+    """
+    Crawl a room from the scheduler and log the outcome.
+
+    Args:
+        room_id (str): Room ID to crawl.
+
+    Returns:
+        None
+    """
+    result = crawl_facility_reservations(None, room_id)
+    if result.get("status") == "error":
+        print(f"⚠️ scheduled crawl of {room_id} failed: {result.get('reason')}")
+    else:
+        print(f"Scheduled crawl of {room_id} done: {result}")
+
+
+def start_scheduler():
+    """
+    Start the background crawl scheduler with one interval job per configured room,
+    plus the retention job that prunes outdated reservations.
+
+    Jobs use max_instances=1 and coalesce missed runs into a single run; the
+    crawler's own single-flight guard additionally keeps manual and scheduled
+    crawls of the same room from overlapping.
+
+    Returns:
+        BackgroundScheduler: The running scheduler, or None if disabled.
+    """
+    global _scheduler
+    config = load_scheduler_config()
+    if not config.get("enabled", False) or _scheduler is not None:
+        return _scheduler
+
+    # Imported here so APScheduler is only loaded when the scheduler is enabled
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.triggers.interval import IntervalTrigger
+
+    default_interval = config.get("interval_minutes", 30)
+    room_intervals = config.get("rooms") or {}
+    scheduler = BackgroundScheduler(job_defaults={
+        "coalesce": True,
+        "max_instances": 1,
+        "misfire_grace_time": config.get("misfire_grace_seconds", 300)
+    })
+
+    for room_id in load_facility_config():
+        scheduler.add_job(
+            run_scheduled_crawl,
+            IntervalTrigger(
+                minutes=room_intervals.get(room_id, default_interval),
+                jitter=config.get("jitter_seconds", 60)
+            ),
+            args=[room_id],
+            id=f"crawl:{room_id}",
+            replace_existing=True
+        )
+
+    retention = load_retention_config()
+    if retention.get("enabled", True):
+        scheduler.add_job(
+            run_scheduled_retention,
+            IntervalTrigger(
+                minutes=retention.get("interval_minutes", 60),
+                jitter=config.get("jitter_seconds", 60)
+            ),
+            id="retention",
+            replace_existing=True
+        )
+
+    scheduler.start()
+    _scheduler = scheduler
+    return scheduler
+
+
+def shutdown_scheduler() -> None:
+    """Stop the background crawl scheduler if it is running."""
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.shutdown(wait=False)
+        _scheduler = None
@@ -0,0 +1,86 @@
+from utils import load_storage_config
+from cruds import (
+    render_day_snapshot,
+    load_day_snapshot_hashes,
+    write_day_snapshot,
+    delete_day_snapshot,
+    get_day_snapshots,
+    get_reservations_by_filter
+)
+
+# Keep one denormalized snapshot document per (room, date) for one-read day views
+DAY_SNAPSHOTS_ENABLED = load_storage_config().get("day_snapshots", True)
+
+
+def refresh_day_snapshots(room_id: str, reservations: list, start_date: str, end_date: str,
+                          batch, touched_dates: set = frozenset()) -> dict:
+    """
+    Rewrite the day snapshots of a crawled date range whose content changed.
+
+    Snapshots are rendered from the reservations the crawl already holds, so
+    this costs one hash query and one write per changed day. Days of the
+    range without reservations lose their snapshot, as do touched days outside
+    the range, whose content the crawl did not see completely.
+
+    Args:
+        room_id (str): Room identifier.
+        reservations (list): (reservation_id, data, details) tuples of every
+            reservation of the room in the crawl.
+        start_date (str): First fully crawled date (YYYY-MM-DD, inclusive).
+        end_date (str): Last fully crawled date (YYYY-MM-DD, inclusive).
+        batch (BatchWriter): Batch the crawl's writes are committed with.
+        touched_dates (set): Dates the crawl wrote reservations on.
+
+    Returns:
+        dict: Numbers of written, unchanged and deleted snapshots.
+    """
+    by_date = {}
+    for reservation in reservations:
+        by_date.setdefault(reservation[1].get("date"), []).append(reservation)
+
+    outside = {date for date in touched_dates if date and not start_date <= date <= end_date}
+    hashes = load_day_snapshot_hashes(room_id, min([start_date, *outside]), max([end_date, *outside]))
+
+    result = {"written": 0, "unchanged": 0, "deleted": 0}
+    for date, day in by_date.items():
+        if date is None or not start_date <= date <= end_date:
+            continue
+        snapshot = render_day_snapshot(room_id, day)
+        if hashes.get(date) == snapshot["content_hash"]:
+            result["unchanged"] += 1
+            continue
+        write_day_snapshot(room_id, date, snapshot, batch)
+        result["written"] += 1
+
+    for date in hashes:
+        if date in outside or (start_date <= date <= end_date and date not in by_date):
+            delete_day_snapshot(room_id, date, batch)
+            result["deleted"] += 1
+    return result
+
+
+def get_day_view(room_ids: list, date: str) -> tuple:
+    """
+    Read the reservations of several rooms on one date, with popup details.
+
+    Rooms with a snapshot are served from it, all of them in one storage read;
+    the others fall back to a reservation query.
+
+    Args:
+        room_ids (list): Room identifiers.
+        date (str): Date (YYYY-MM-DD).
+
+    Returns:
+        tuple: ({room_id: [reservation, ...]}, list of room IDs served from snapshots).
+    """
+    snapshots = get_day_snapshots(room_ids, date) if DAY_SNAPSHOTS_ENABLED else {}
+    data = {}
+    served = []
+    for room_id in room_ids:
+        snapshot = snapshots.get(room_id)
+        if snapshot and snapshot.get("has_details"):
+            data[room_id] = snapshot["reservations"]
+            served.append(room_id)
+        else:
+            data[room_id] = get_reservations_by_filter(room_id, date, include_details=True)
+    return data, served
@@ -3,4 +3,34 @@ from sys import path
 
 path.insert(0, dirname(__file__))
 
-from .config_loader import load_facility_config 
\ No newline at end of file
+from .config_loader import (
+    load_config,
+    load_facility_config,
+    load_crawler_config,
+    load_storage_config,
+    load_cache_config,
+    load_http_cache_config,
+    load_scheduler_config,
+    load_jobs_config,
+    load_retention_config,
+    load_availability_config,
+    load_events_config,
+    load_change_log_config,
+    load_compression_config
+)
+from .datetime_parser import parse_datetime_range, DATETIME_FIELDS
+from .serialization import dumps, FastJSONResponse, HAS_ORJSON
+from .compression import CompressionMiddleware, HAS_BROTLI
+from .metrics import (
+    observe,
+    room_label,
+    CRAWL_PHASE_SECONDS,
+    CRAWL_SECONDS,
+    CRAWL_ITEMS,
+    HTTP_FETCH_SECONDS,
+    HTTP_ATTEMPTS,
+    STORAGE_SECONDS,
+    STORAGE_DOCUMENTS,
+    API_REQUEST_SECONDS,
+    APP_STARTUP_SECONDS
+)
@@ -0,0 +1,102 @@
+"""
+Response compression with brotli or gzip.
+
+Only complete responses are compressed. A response whose body arrives in
+several messages (SSE streams, NDJSON) is passed through untouched, so
+compression never holds back streamed events.
+"""
+
+import gzip
+from importlib.util import find_spec
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from .config_loader import load_compression_config
+
+HAS_BROTLI = find_spec("brotli") is not None
+
+_config = load_compression_config()
+
+# Media types worth compressing
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def _accepted_encodings(header: str) -> set:
+    encodings = set()
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        encodings.add(token.strip().lower())
+    return encodings
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing complete responses with brotli (preferred) or gzip.
+
+    ETags of compressed responses are made weak, since the compressed bytes
+    differ from the representation the ETag was computed for; If-None-Match
+    comparison is weak, so revalidation keeps working.
+    """
+
+    def __init__(self, app, minimum_size: int = None, brotli_quality: int = None, gzip_level: int = None):
+        self.app = app
+        self.minimum_size = _config.get("minimum_size", 1024) if minimum_size is None else minimum_size
+        self.brotli_quality = _config.get("brotli_quality", 4) if brotli_quality is None else brotli_quality
+        self.gzip_level = _config.get("gzip_level", 6) if gzip_level is None else gzip_level
+
+    def _encoding(self, scope) -> str:
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if HAS_BROTLI and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            import brotli
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def __call__(self, scope, receive, send):
+        encoding = self._encoding(scope) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Held back until the first body message shows whether the response streams
+                start = message
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            media_type = headers.get("content-type", "")
+            if (message.get("more_body", False) or len(body) < self.minimum_size
+                    or "content-encoding" in headers or not media_type.startswith(COMPRESSIBLE_TYPES)):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            compressed = self._compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
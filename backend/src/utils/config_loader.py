@@ -1,5 +1,31 @@
-import yaml
+import copy
 import os
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def _read_config() -> dict:
+    import yaml
+
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    config_path = os.path.join(current_dir, "config.yaml")
+
+    with open(config_path, 'r', encoding='utf-8') as file:
+        config = yaml.safe_load(file)
+    return config or {}
+
+
+def load_config() -> dict:
+    """
+    Load the whole config.yaml located in the same directory.
+
+    The file is parsed once per process; every call returns a fresh copy.
+
+    Returns:
+        dict: Parsed configuration.
+    """
+    return copy.deepcopy(_read_config())
+
 
 def load_facility_config() -> dict:
     """
@@ -8,9 +34,114 @@ def load_facility_config() -> dict:
     Returns:
         dict: Dictionary of facility names and their URLs.
     """
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    config_path = os.path.join(current_dir, "config.yaml")
+    return load_config().get("facilities", {})
 
-    with open(config_path, 'r', encoding='utf-8') as file:
-        config = yaml.safe_load(file)
-    return config.get("facilities", {})
+
+def load_crawler_config() -> dict:
+    """
+    Load crawler HTTP settings from config.yaml.
+
+    Returns:
+        dict: Crawler settings such as concurrency limits and timeout.
+    """
+    return load_config().get("crawler", {})
+
+
+def load_storage_config() -> dict:
+    """
+    Load storage backend and layout settings from config.yaml.
+
+    Returns:
+        dict: Storage settings such as the backend, SQLite path and popup details format.
+    """
+    return load_config().get("storage", {})
+
+
+def load_cache_config() -> dict:
+    """
+    Load read cache settings from config.yaml.
+
+    Returns:
+        dict: Cache settings such as maximum entries and TTL.
+    """
+    return load_config().get("cache", {})
+
+
+def load_http_cache_config() -> dict:
+    """
+    Load HTTP caching (Cache-Control) settings from config.yaml.
+
+    Returns:
+        dict: HTTP cache settings such as max-age.
+    """
+    return load_config().get("http_cache", {})
+
+
+def load_scheduler_config() -> dict:
+    """
+    Load background crawl scheduler settings from config.yaml.
+
+    Returns:
+        dict: Scheduler settings such as intervals and jitter.
+    """
+    return load_config().get("scheduler", {})
+
+
+def load_jobs_config() -> dict:
+    """
+    Load crawl job queue settings from config.yaml.
+
+    Returns:
+        dict: Job settings such as worker count and history size.
+    """
+    return load_config().get("jobs", {})
+
+
+def load_retention_config() -> dict:
+    """
+    Load outdated reservation pruning settings from config.yaml.
+
+    Returns:
+        dict: Retention settings such as kept days, chunk size and TTL field.
+    """
+    return load_config().get("retention", {})
+
+
+def load_availability_config() -> dict:
+    """
+    Load free-slot lookup settings from config.yaml.
+
+    Returns:
+        dict: Availability settings such as opening hours and minimum slot length.
+    """
+    return load_config().get("availability", {})
+
+
+def load_events_config() -> dict:
+    """
+    Load reservation change event stream settings from config.yaml.
+
+    Returns:
+        dict: Event settings such as per-subscriber queue size and heartbeat interval.
+    """
+    return load_config().get("events", {})
+
+
+def load_change_log_config() -> dict:
+    """
+    Load reservation change log settings from config.yaml.
+
+    Returns:
+        dict: Change log settings such as retained entries and page size.
+    """
+    return load_config().get("change_log", {})
+
+
+def load_compression_config() -> dict:
+    """
+    Load response compression settings from config.yaml.
+
+    Returns:
+        dict: Compression settings such as the minimum size and compression levels.
+    """
+    return load_config().get("compression", {})
@@ -0,0 +1,36 @@
+import re
+
+# "20250514 ~ 20250514 10:00 ~ 12:00" with arbitrary whitespace (newlines, tabs)
+# between the parts; the time range is optional
+DATETIME_RANGE_PATTERN = re.compile(
+    r"(\d{4})(\d{2})(\d{2})\s*~\s*(\d{4})(\d{2})(\d{2})"
+    r"(?:\s*(\d{2}):(\d{2})\s*~\s*(\d{2}):(\d{2}))?"
+)
+
+DATETIME_FIELDS = ["start_date", "end_date", "start_time", "end_time"]
+
+
+def parse_datetime_range(raw: str) -> dict:
+    """
+    Parse a '일시' / datetime_range string in a single precompiled regex pass.
+
+    Args:
+        raw (str): Text such as "20250514 ~ 20250514\\n\\t10:00 ~ 12:00".
+
+    Returns:
+        dict: start_date/end_date as YYYY-MM-DD and start_time/end_time as HH:MM,
+            all sortable as strings. Times are None if absent; an empty dict is
+            returned if no date range is found.
+    """
+    if not raw:
+        return {}
+    match = DATETIME_RANGE_PATTERN.search(raw)
+    if not match:
+        return {}
+    y1, m1, d1, y2, m2, d2, h1, min1, h2, min2 = match.groups()
+    return {
+        "start_date": f"{y1}-{m1}-{d1}",
+        "end_date": f"{y2}-{m2}-{d2}",
+        "start_time": f"{h1}:{min1}" if h1 else None,
+        "end_time": f"{h2}:{min2}" if h2 else None
+    }
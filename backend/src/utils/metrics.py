@@ -0,0 +1,104 @@
+"""
+Prometheus metrics shared by the crawler, the storage layer and the API.
+
+They live in utils so cruds and services can record them without importing
+each other. Labels are limited to bounded values (configured room IDs, route
+templates, hosts) to keep the number of series small.
+"""
+
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from .config_loader import load_facility_config
+
+# room_id label values; anything else is reported as "other" to bound the series
+KNOWN_ROOM_IDS = set(load_facility_config())
+
+# Sub-second operations (storage calls, single HTTP requests, API requests)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Whole crawl phases, which may span many requests
+PHASE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+CRAWL_PHASE_SECONDS = Histogram(
+    "crawl_phase_seconds",
+    "Duration of crawl phases (fetch_list, parse, load_existing, popup_fetch, write, delete, snapshot, commit)",
+    ["room_id", "phase"],
+    buckets=PHASE_BUCKETS
+)
+CRAWL_SECONDS = Histogram(
+    "crawl_seconds",
+    "Duration of a whole room crawl",
+    ["room_id", "outcome"],
+    buckets=PHASE_BUCKETS
+)
+CRAWL_ITEMS = Counter(
+    "crawl_items_total",
+    "Rows parsed, popups fetched/skipped and reservations saved/updated/skipped/deleted by crawls",
+    ["room_id", "item"]
+)
+HTTP_FETCH_SECONDS = Histogram(
+    "crawler_http_fetch_seconds",
+    "Crawler fetch latency including retries and backoff",
+    ["host", "outcome"],
+    buckets=LATENCY_BUCKETS
+)
+HTTP_ATTEMPTS = Counter(
+    "crawler_http_attempts_total",
+    "HTTP requests sent by the crawler, retries included",
+    ["host"]
+)
+STORAGE_SECONDS = Histogram(
+    "storage_operation_seconds",
+    "Latency of storage backend calls",
+    ["backend", "operation", "room_id"],
+    buckets=LATENCY_BUCKETS
+)
+STORAGE_DOCUMENTS = Counter(
+    "storage_documents_total",
+    "Documents read, written or deleted by storage backend calls",
+    ["backend", "operation", "room_id"]
+)
+API_REQUEST_SECONDS = Histogram(
+    "api_request_seconds",
+    "API request latency per route",
+    ["method", "route", "status", "room_id"],
+    buckets=LATENCY_BUCKETS
+)
+
+APP_STARTUP_SECONDS = Gauge(
+    "app_startup_seconds",
+    "Time from the start of the application imports to the end of each startup phase",
+    ["phase"]
+)
+
+
+def room_label(room_id: str) -> str:
+    """
+    Map a room ID to its metric label value.
+
+    Returns:
+        str: The room ID if configured, "all" for None, otherwise "other".
+    """
+    if room_id is None:
+        return "all"
+    return room_id if room_id in KNOWN_ROOM_IDS else "other"
+
+
+@contextmanager
+def observe(histogram: Histogram, **labels):
+    """
+    Record the duration of the enclosed block in a histogram.
+
+    Args:
+        histogram (Histogram): Histogram to observe.
+        **labels: Label values; room_id is passed through room_label.
+    """
+    if "room_id" in labels:
+        labels["room_id"] = room_label(labels["room_id"])
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - started)
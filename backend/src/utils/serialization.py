@@ -0,0 +1,46 @@
+"""
+JSON serialization of API responses.
+
+orjson is used when installed: it serializes dicts, dataclasses and datetimes
+natively, much faster than the json module. Without it, responses fall back
+to json with the same compact output.
+"""
+
+import json
+from dataclasses import fields, is_dataclass
+from importlib.util import find_spec
+
+from starlette.responses import JSONResponse
+
+HAS_ORJSON = find_spec("orjson") is not None
+
+if HAS_ORJSON:
+    import orjson
+
+
+def _default(obj):
+    if is_dataclass(obj):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    return str(obj)
+
+
+def dumps(payload) -> bytes:
+    """
+    Serialize a response payload to UTF-8 JSON.
+
+    Args:
+        payload: Dicts, lists, dataclasses and scalars; other values are serialized with str().
+
+    Returns:
+        bytes: Compact JSON.
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(payload, default=_default)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps (orjson when installed)."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,27 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Application modules import each other as top-level packages from src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+# Storage tests run against a throwaway SQLite database. The backend is picked when
+# cruds is first imported, so this has to happen before any application import
+os.environ["STORAGE_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="reservations-test-"), "reservations.db")
+
+
+@pytest.fixture
+def storage():
+    """Empty the SQLite database and the read cache; yields the sqlite_dao module."""
+    from cruds import reservation_cache, sqlite_dao
+
+    sqlite_dao._conn().executescript(
+        "DELETE FROM reservations; DELETE FROM day_snapshots; DELETE FROM change_log; DELETE FROM meta; "
+        "DELETE FROM sqlite_sequence;"
+    )
+    reservation_cache.clear()
+    yield sqlite_dao
+    reservation_cache.clear()
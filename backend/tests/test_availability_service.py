@@ -0,0 +1,80 @@
+"""
+Checks of the availability index: interval merging, free-slot and free-room
+lookups, loading from the SQLite backend and replacement by crawls.
+"""
+
+from cruds import upsert_reservation
+from services.availability_service import AvailabilityIndex, build_day_intervals, parse_minutes
+
+ROOM = "daegangdang"
+DATE = "2030-05-14"
+
+
+def reservation(start_time: str = None, end_time: str = None, date: str = DATE, **fields) -> dict:
+    return {"date": date, "start_time": start_time, "end_time": end_time, **fields}
+
+
+def minutes(*times: str) -> tuple:
+    return tuple(parse_minutes(time) for time in times)
+
+
+def test_overlapping_and_adjacent_bookings_merge():
+    days = build_day_intervals([
+        reservation("13:00", "15:00"),
+        reservation("09:00", "10:00"),
+        reservation("14:00", "16:00"),
+        reservation("10:00", "11:00")
+    ])
+    assert days == {DATE: ([540, 780], [660, 960])}
+
+
+def test_bookings_without_times_or_past_midnight():
+    days = build_day_intervals([
+        reservation(date="2030-05-15"),
+        reservation("20:00", "02:00"),
+        reservation("08:00", "09:00", start_date=DATE, end_date="2030-05-16")
+    ])
+    assert days[DATE] == ([480, 1200], [540, 1440])
+    assert days["2030-05-15"] == ([0], [1440])
+    assert days["2030-05-16"] == ([480], [540])
+
+
+def test_free_slots_and_is_free(storage):
+    upsert_reservation(ROOM, "a", reservation("10:00", "12:00"))
+    upsert_reservation(ROOM, "b", reservation("12:20", "13:00"))
+    index = AvailabilityIndex()
+
+    assert index.free_slots(ROOM, DATE, *minutes("08:00", "22:00"), min_minutes=30) == [
+        minutes("08:00", "10:00"), minutes("13:00", "22:00")
+    ]
+    assert index.free_slots(ROOM, "2030-05-15", *minutes("08:00", "22:00"), min_minutes=30) == [
+        minutes("08:00", "22:00")
+    ]
+    assert index.is_free(ROOM, DATE, *minutes("08:00", "10:00"))
+    assert not index.is_free(ROOM, DATE, *minutes("09:00", "10:01"))
+    assert not index.is_free(ROOM, DATE, *minutes("12:10", "12:30"))
+    assert index.is_free(ROOM, DATE, *minutes("13:00", "14:00"))
+
+
+def test_crawl_updates_replace_the_crawled_days(storage):
+    upsert_reservation(ROOM, "a", reservation("10:00", "12:00"))
+    upsert_reservation(ROOM, "b", reservation("10:00", "12:00", date="2030-05-16"))
+    index = AvailabilityIndex()
+    assert not index.is_free(ROOM, DATE, *minutes("10:00", "11:00"))
+
+    # The crawl of 05-14..05-15 found a single booking on 05-15
+    index.update_room(ROOM, [reservation("15:00", "16:00", date="2030-05-15")], DATE, "2030-05-15")
+    assert index.is_free(ROOM, DATE, *minutes("10:00", "11:00"))
+    assert not index.is_free(ROOM, "2030-05-15", *minutes("15:30", "16:30"))
+    # Days outside the crawled range are kept
+    assert not index.is_free(ROOM, "2030-05-16", *minutes("10:00", "11:00"))
+
+
+def test_rooms_not_looked_up_load_from_storage(storage):
+    index = AvailabilityIndex()
+    index.update_room(ROOM, [reservation("15:00", "16:00")], DATE, DATE)
+    upsert_reservation(ROOM, "a", reservation("10:00", "12:00"))
+
+    # The update was skipped; the first lookup reads what storage holds
+    assert index.is_free(ROOM, DATE, *minutes("15:00", "16:00"))
+    assert not index.is_free(ROOM, DATE, *minutes("10:00", "11:00"))
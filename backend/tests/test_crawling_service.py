@@ -0,0 +1,203 @@
+"""
+End-to-end checks of room crawls against the SQLite backend.
+
+fetch_response_with_retry is replaced by a stub site that serves listing and
+popup pages from memory, so a crawl runs its whole fetch, diff, write and
+delete path without network access.
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+
+import pytest
+
+import services.crawling_service as crawling_service
+from cruds import get_changes_since, get_reservations_by_filter, hash_reservation, iter_reservations, upsert_reservation
+from services.availability_service import AvailabilityIndex, parse_minutes
+from services.fetch_cache import FetchCache
+
+ROOM = "daegangdang"
+LIST_URL = "http://facility.test/list"
+
+
+def day(offset: int) -> str:
+    """Date offset days from today (YYYY-MM-DD)."""
+    return (datetime.now() + timedelta(days=offset)).strftime("%Y-%m-%d")
+
+
+def booking(offset: int, event: str, seq: int = None, times: tuple = ("10:00", "12:00"),
+            approval: str = "승인") -> dict:
+    return {"date": day(offset), "event": event, "seq": seq, "times": times, "approval": approval}
+
+
+class StubResponse:
+    def __init__(self, status_code: int, text: str = "", headers: dict = None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+
+class StubSite:
+    """
+    Facility site serving listing pages of bookings, newest first, and their popups.
+
+    Listing pages answer conditional requests with 304; popups of seqs in
+    `failing` are unavailable.
+    """
+
+    def __init__(self):
+        self.pages = [[]]
+        self.failing = set()
+        self.requests = []
+
+    def listing_html(self, number: int) -> str:
+        rows = []
+        for item in self.pages[number - 1]:
+            raw_date = item["date"].replace("-", "")
+            link = ""
+            if item["seq"]:
+                link = f"<a href=\"javascript:jf_facilityPrint('{item['seq']}', '{item['seq'] + 1000}')\">출력</a>"
+            rows.append(
+                f"<tr><td>{raw_date} ~ {raw_date}</td><td>대강당</td><td>총학생회</td>"
+                f"<td>{item['event']}</td><td>{item['approval']}</td><td>{link}</td></tr>"
+            )
+        nav = "".join(f"<a href=\"javascript:page_link('{n}')\">{n}</a>" for n in range(1, len(self.pages) + 1))
+        return f"<html><body><table><tbody>{''.join(rows)}</tbody></table>{nav}</body></html>"
+
+    def popup_html(self, seq: int) -> str:
+        item = next(item for page in self.pages for item in page if item["seq"] == seq)
+        raw_date = item["date"].replace("-", "")
+        return (
+            "<html><body><table width=\"600px\">"
+            f"<tr><th>일시</th><td>{raw_date} ~ {raw_date}<br/>{item['times'][0]} ~ {item['times'][1]}</td></tr>"
+            f"<tr><th>행사명</th><td>{item['event']}</td></tr>"
+            "</table></body></html>"
+        )
+
+    def fetch(self, url: str, headers: dict = None, max_retries: int = None):
+        self.requests.append(url)
+        if "facilityPrint.do" in url:
+            seq = int(url.split("seq=")[1].split("&")[0])
+            if seq in self.failing:
+                return None
+            return StubResponse(200, self.popup_html(seq))
+
+        number = int(url.split("page=")[1]) if "page=" in url else 1
+        if number > len(self.pages):
+            number = 1
+        html = self.listing_html(number)
+        etag = '"%s"' % hashlib.sha256(html.encode()).hexdigest()[:16]
+        if (headers or {}).get("If-None-Match") == etag:
+            return StubResponse(304, headers={"ETag": etag})
+        return StubResponse(200, html, {"ETag": etag})
+
+
+@pytest.fixture
+def site(storage, monkeypatch):
+    stub = StubSite()
+    monkeypatch.setattr(crawling_service, "fetch_response_with_retry", stub.fetch)
+    monkeypatch.setattr(crawling_service, "load_facility_config", lambda: {ROOM: LIST_URL})
+    monkeypatch.setattr(crawling_service, "fetch_cache", FetchCache())
+    monkeypatch.setattr(crawling_service, "availability_index", AvailabilityIndex())
+    return stub
+
+
+def crawl() -> dict:
+    result = crawling_service.crawl_facility_reservations(None, ROOM)
+    assert result["status"] == "ok", result
+    return result
+
+
+def counts(result: dict) -> tuple:
+    return result["saved_count"], result["updated_count"], result["skipped_count"], result["deleted_count"]
+
+
+def stored() -> dict:
+    return {reservation["event"]: reservation for reservation in iter_reservations(ROOM)}
+
+
+def test_crawl_inserts_updates_skips_and_deletes(site):
+    site.pages = [
+        [booking(6, "공연", seq=1), booking(5, "세미나", seq=2)],
+        [booking(3, "특강", seq=3), booking(2, "총회")]
+    ]
+    result = crawl()
+    assert result["page_count"] == 2
+    assert counts(result) == (4, 0, 0, 0)
+    assert (result["popup_fetched_count"], result["popup_skipped_count"]) == (3, 0)
+    assert stored()["공연"]["start_time"] == "10:00"
+    assert get_changes_since(0)["version"] == 4
+
+    index = crawling_service.availability_index
+    assert not index.is_free(ROOM, day(3), parse_minutes("11:00"), parse_minutes("13:00"))
+    assert [r["approval"] for r in get_reservations_by_filter(ROOM, day(5))] == ["승인"]
+
+    site.pages = [
+        [booking(6, "공연", seq=1), booking(5, "세미나", seq=2, approval="취소", times=("14:00", "16:00"))],
+        [booking(2, "총회")]
+    ]
+    result = crawl()
+    assert counts(result) == (0, 1, 2, 1)
+    # Only the changed row's popup is fetched again
+    assert (result["popup_fetched_count"], result["popup_skipped_count"]) == (1, 1)
+    assert set(stored()) == {"공연", "세미나", "총회"}
+    assert stored()["세미나"]["start_time"] == "14:00"
+
+    assert index.is_free(ROOM, day(3), parse_minutes("11:00"), parse_minutes("13:00"))
+    assert [r["approval"] for r in get_reservations_by_filter(ROOM, day(5))] == ["취소"]
+    changes = get_changes_since(4)["changes"]
+    assert [(c["type"], c["date"]) for c in changes] == [("update", day(5)), ("delete", day(3))]
+    # Upserts carry the whole stored row
+    assert changes[0]["reservation"]["start_time"] == "14:00"
+    assert changes[0]["reservation"]["place"] == "대강당"
+
+
+def test_failed_popup_is_retried_on_next_crawl(site):
+    site.pages = [[booking(3, "세미나", seq=1), booking(2, "특강", seq=2)]]
+    site.failing = {2}
+
+    result = crawl()
+    assert (result["popup_fetched_count"], result["popup_failed_count"]) == (1, 1)
+    assert "start_time" not in stored()["특강"]
+
+    # Same listing, popup back up: the crawl must not take the unchanged shortcut
+    site.failing = set()
+    result = crawl()
+    assert not result["page_unchanged"]
+    assert (result["popup_fetched_count"], result["popup_failed_count"]) == (1, 0)
+    assert stored()["특강"]["start_time"] == "10:00"
+
+    assert crawl()["page_unchanged"]
+
+
+def test_cancelled_bookings_after_newest_listed_date_are_deleted(site):
+    site.pages = [[booking(5, "공연", seq=3), booking(4, "세미나", seq=1), booking(2, "특강", seq=2)]]
+    crawl()
+
+    # Every booking of the newest listed date is cancelled
+    site.pages = [[booking(4, "세미나", seq=1), booking(2, "특강", seq=2)]]
+    result = crawl()
+    assert result["deleted_count"] == 1
+    assert set(stored()) == {"세미나", "특강"}
+
+
+def test_duplicate_documents_resolve_to_the_hash_id(site):
+    site.pages = [[booking(4, "세미나", seq=1)]]
+    data = {"room_id": ROOM, "date": day(4), "event": "세미나", "approval": "대기"}
+    canonical = hash_reservation(data)
+    upsert_reservation(ROOM, "legacy-id", data)
+    upsert_reservation(ROOM, canonical, data)
+
+    result = crawl()
+    assert counts(result) == (0, 1, 0, 1)
+    assert [reservation["id"] for reservation in iter_reservations(ROOM)] == [canonical]
+
+
+def test_document_missing_its_event_is_found_by_hash_id(site):
+    site.pages = [[booking(4, "세미나", seq=1)]]
+    reservation_id = hash_reservation({"date": day(4), "event": "세미나"})
+    upsert_reservation(ROOM, reservation_id, {"room_id": ROOM, "date": day(4)})
+
+    result = crawl()
+    assert (result["saved_count"], result["updated_count"]) == (0, 1)
+    assert stored()["세미나"]["id"] == reservation_id
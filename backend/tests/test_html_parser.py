@@ -0,0 +1,81 @@
+"""
+Parity of the HTML parser backends with the original full-tree parse.
+
+The reference functions below are the list and print page parsing that
+crawling_service did with a complete html.parser tree before the backends
+were added. Every installed backend must return the same rows and pairs on
+the saved fixture pages.
+"""
+
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+from services.html_parser import HAS_LXML, HAS_SELECTOLAX, parse_detail_pairs, parse_list_rows, resolve_backend
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+BACKENDS = [
+    pytest.param("selectolax", marks=pytest.mark.skipif(not HAS_SELECTOLAX, reason="selectolax not installed")),
+    pytest.param("lxml", marks=pytest.mark.skipif(not HAS_LXML, reason="lxml not installed")),
+    "html.parser"
+]
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def reference_list_rows(html: str) -> list:
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table")
+    if not table:
+        return []
+    rows = []
+    for row in table.find("tbody").find_all("tr"):
+        cols = row.find_all("td")
+        anchor = cols[-1].find("a")
+        rows.append(([col.get_text(strip=True) for col in cols[:-1]], anchor.get("href") if anchor else None))
+    return rows
+
+
+def reference_detail_pairs(html: str) -> list:
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table", attrs={"width": "600px"})
+    pairs = []
+    for row in table.find_all("tr"):
+        if row.find("th") and row.find("td"):
+            pairs.append((row.find("th").text.strip(), row.find("td").text.strip()))
+    return pairs
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_list_rows_match_reference(backend):
+    html = read_fixture("facility_list.html")
+    rows = parse_list_rows(html, backend)
+
+    assert len(rows) == 60
+    assert rows == reference_list_rows(html)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_detail_pairs_match_reference(backend):
+    html = read_fixture("facility_print.html")
+    pairs = parse_detail_pairs(html, backend)
+
+    assert [key for key, _ in pairs][:2] == ["장소", "일시"]
+    assert pairs == reference_detail_pairs(html)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_page_without_table(backend):
+    html = "<html><body><p>점검 중입니다</p></body></html>"
+    assert parse_list_rows(html, backend) == []
+    assert parse_detail_pairs(html, backend) == []
+
+
+def test_resolve_backend_falls_back_to_html_parser():
+    assert resolve_backend("no-such-parser") == "html.parser"
+    assert resolve_backend("auto") in ("selectolax", "lxml", "html.parser")
@@ -0,0 +1,151 @@
+"""
+Checks of the crawler's HTTP client against a local stub HTTP server.
+
+Each stub path answers with a scripted sequence of responses, the last one
+repeating, and counts the requests it received.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.http_client import HttpClient, TokenBucket
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    scripts = {}
+    hits = {}
+
+    def do_GET(self):
+        script = self.scripts.get(self.path, [(200, {})])
+        self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        status, headers = script.pop(0) if len(script) > 1 else script[0]
+        body = b"ok"
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    StubHandler.scripts = {}
+    StubHandler.hits = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", StubHandler
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(**overrides) -> HttpClient:
+    options = dict(timeout=2, max_retries=3, backoff_base=0.01, backoff_max=5,
+                   rate_per_second=1000, burst=1000, breaker_failure_threshold=2, breaker_reset_seconds=0.2)
+    options.update(overrides)
+    return HttpClient(**options)
+
+
+def test_retry_after_is_honoured(stub):
+    base, handler = stub
+    handler.scripts["/busy"] = [(503, {"Retry-After": "1"}), (200, {})]
+
+    started = time.monotonic()
+    result = make_client().fetch(base + "/busy")
+
+    assert result.response is not None and result.response.status_code == 200
+    assert result.attempts == 2
+    assert result.error is None
+    assert time.monotonic() - started >= 0.9
+
+
+def test_not_found_is_not_retried(stub):
+    base, handler = stub
+    handler.scripts["/missing"] = [(404, {})]
+
+    client = make_client()
+    result = client.fetch(base + "/missing")
+
+    assert result.response is None
+    assert result.error == "HTTP 404"
+    assert result.attempts == 1
+    assert handler.hits["/missing"] == 1
+    assert client.stats()[base.split("//")[1]]["circuit"] == "closed"
+
+
+def test_circuit_opens_after_consecutive_failures(stub):
+    base, handler = stub
+    handler.scripts["/down"] = [(500, {})]
+
+    client = make_client(max_retries=2, breaker_reset_seconds=60)
+    failed = client.fetch(base + "/down")
+    assert failed.error == "HTTP 500"
+    assert handler.hits["/down"] == 2
+
+    short_circuited = client.fetch(base + "/down")
+    assert short_circuited.error == "circuit open"
+    assert short_circuited.attempts == 0
+    assert handler.hits["/down"] == 2
+    assert client.stats()[base.split("//")[1]]["circuit"] == "open"
+
+
+@pytest.mark.parametrize("probe_status", [200, 404])
+def test_half_open_probe_closes_circuit(stub, probe_status):
+    base, handler = stub
+    handler.scripts["/down"] = [(500, {})]
+    handler.scripts["/probe"] = [(probe_status, {})]
+    host = base.split("//")[1]
+
+    client = make_client(max_retries=2)
+    client.fetch(base + "/down")
+    assert client.stats()[host]["circuit"] == "open"
+
+    time.sleep(0.3)
+    client.fetch(base + "/probe", max_retries=1)
+    assert client.stats()[host]["circuit"] == "closed"
+
+    handler.scripts["/down"] = [(200, {})]
+    assert client.fetch(base + "/down").response is not None
+
+
+def test_half_open_failure_reopens_circuit(stub):
+    base, handler = stub
+    handler.scripts["/down"] = [(500, {})]
+    host = base.split("//")[1]
+
+    client = make_client(max_retries=2)
+    client.fetch(base + "/down")
+    time.sleep(0.3)
+
+    client.fetch(base + "/down", max_retries=1)
+    assert client.stats()[host]["circuit"] == "open"
+    assert client.fetch(base + "/down").error == "circuit open"
+
+
+def test_token_bucket_paces_requests(stub):
+    base, handler = stub
+
+    client = make_client(rate_per_second=20, burst=1)
+    started = time.monotonic()
+    for _ in range(6):
+        assert client.fetch(base + "/page").response is not None
+    elapsed = time.monotonic() - started
+
+    # The first request uses the burst token, the other five wait 1/20 s each
+    assert elapsed >= 0.24
+    assert handler.hits["/page"] == 6
+
+
+def test_token_bucket_allows_burst():
+    bucket = TokenBucket(rate=1, burst=5)
+    started = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - started < 0.1
@@ -0,0 +1,139 @@
+"""
+Checks of the SQLite storage backend: batched writes, read cache invalidation
+and the change log.
+"""
+
+import json
+
+from cruds import (
+    BatchWriter,
+    append_changes,
+    compact_change_log,
+    get_changes_since,
+    get_reservations_by_filter,
+    iter_reservations,
+    reservation_cache,
+    upsert_reservation
+)
+
+ROOM = "daegangdang"
+DATE = "2030-05-14"
+
+
+def stored_document(storage, reservation_id: str) -> dict:
+    data = storage._conn().execute(
+        "SELECT data FROM reservations WHERE room_id = ? AND id = ?", (ROOM, reservation_id)
+    ).fetchone()[0]
+    return json.loads(data)
+
+
+def test_merge_keeps_fields_not_written(storage):
+    storage._apply([
+        ("set", (ROOM, "a"), {"date": DATE, "event": "세미나", "approval": "대기",
+                              "popup_details": {"place": "대강당", "rental_items": "빔프로젝터"}})
+    ])
+    storage._apply([("merge", (ROOM, "a"), {"approval": "승인"})])
+
+    stored = stored_document(storage, "a")
+    assert stored["approval"] == "승인"
+    assert stored["event"] == "세미나"
+    assert stored["popup_details"] == {"place": "대강당", "rental_items": "빔프로젝터"}
+
+
+def test_merge_replaces_map_fields_whole(storage):
+    storage._apply([("set", (ROOM, "a"), {"date": DATE, "event": "세미나", "popup_details": {"a": "1", "b": "2"}})])
+    storage._apply([("merge", (ROOM, "a"), {"popup_details": {"a": "3"}})])
+
+    assert stored_document(storage, "a")["popup_details"] == {"a": "3"}
+
+
+def test_operations_of_a_chunk_apply_in_order(storage):
+    storage._apply([
+        ("merge", (ROOM, "a"), {"date": DATE, "event": "세미나"}),
+        ("merge", (ROOM, "a"), {"approval": "승인"}),
+        ("set", (ROOM, "b"), {"date": DATE, "event": "특강"}),
+        ("delete", (ROOM, "b"), None),
+        ("set", (ROOM, "c"), {"date": DATE, "event": "공연", "approval": "대기"}),
+        ("set", (ROOM, "c"), {"date": DATE, "event": "공연"})
+    ])
+
+    assert {r["id"] for r in iter_reservations(ROOM)} == {"a", "c"}
+    assert stored_document(storage, "a")["approval"] == "승인"
+    assert "approval" not in stored_document(storage, "c")
+
+
+def test_cached_reads_are_invalidated_once_the_batch_commits(storage):
+    upsert_reservation(ROOM, "a", {"date": DATE, "event": "세미나", "approval": "대기"})
+    assert [r["approval"] for r in get_reservations_by_filter(ROOM, DATE)] == ["대기"]
+
+    batch = BatchWriter(room_id=ROOM)
+    upsert_reservation(ROOM, "a", {"date": DATE, "event": "세미나", "approval": "승인"}, batch)
+    upsert_reservation(ROOM, "b", {"date": "2030-05-15", "event": "특강"}, batch)
+    # Nothing is committed yet, so the cached read is still current
+    assert [r["approval"] for r in get_reservations_by_filter(ROOM, DATE)] == ["대기"]
+    get_reservations_by_filter(ROOM, "2030-05-15")
+
+    batch.flush()
+    assert [r["approval"] for r in get_reservations_by_filter(ROOM, DATE)] == ["승인"]
+    assert [r["id"] for r in get_reservations_by_filter(ROOM, "2030-05-15")] == ["b"]
+
+
+def test_read_racing_a_commit_is_not_cached(storage):
+    upsert_reservation(ROOM, "a", {"date": DATE, "event": "세미나", "approval": "대기"})
+    scopes = [("reservations", ROOM, DATE), ("room", ROOM)]
+    generation = reservation_cache.generation(scopes)
+
+    # A write commits between the read's storage query and its put
+    upsert_reservation(ROOM, "a", {"date": DATE, "event": "세미나", "approval": "승인"})
+    reservation_cache.put(("reservations", ROOM, DATE, False), ["stale"], scopes, generation)
+
+    assert [r["approval"] for r in get_reservations_by_filter(ROOM, DATE)] == ["승인"]
+
+
+def change(reservation_id: str, change_type: str = "update", room_id: str = ROOM) -> dict:
+    return {"type": change_type, "room_id": room_id, "id": reservation_id, "date": DATE,
+            "reservation": {"id": reservation_id, "date": DATE}}
+
+
+def test_change_versions_increase(storage):
+    first = append_changes([change("a", "insert"), change("b", "insert")])
+    second = append_changes([change("a")])
+    assert first[1] == first[0] + 1
+    assert second[0] > first[1]
+
+    page = get_changes_since(first[0], limit=10)
+    assert [(c["id"], c["version"]) for c in page["changes"]] == [("b", first[1]), ("a", second[0])]
+    assert page["version"] == page["latest_version"] == second[0]
+    assert not page["has_more"]
+
+
+def test_change_pages_filter_rooms_and_report_more(storage):
+    versions = append_changes([change("a"), change("b", room_id="junggangdang"), change("c")])
+    since = versions[0] - 1
+
+    page = get_changes_since(since, ["junggangdang"], limit=2)
+    assert [c["id"] for c in page["changes"]] == ["b"]
+    assert page["version"] == versions[1]
+    assert page["has_more"]
+
+    page = get_changes_since(page["version"], ["junggangdang"], limit=2)
+    assert page["changes"] == []
+    assert page["version"] == versions[2]
+    assert not page["has_more"]
+
+
+def test_compaction_drops_superseded_entries_and_raises_the_floor(storage):
+    versions = append_changes([change("a", "insert"), change("b", "insert"), change("a"), change("c", "insert")])
+    since = versions[0] - 1
+
+    result = compact_change_log(max_entries=10)
+    assert result == {"superseded_count": 1, "truncated_count": 0}
+    page = get_changes_since(since)
+    assert [(c["id"], c["type"]) for c in page["changes"]] == [("b", "insert"), ("a", "update"), ("c", "insert")]
+    assert page["floor"] <= since
+
+    result = compact_change_log(max_entries=1)
+    assert result == {"superseded_count": 0, "truncated_count": 2}
+    page = get_changes_since(since)
+    assert page["floor"] == versions[2]
+    assert [c["id"] for c in page["changes"]] == ["c"]
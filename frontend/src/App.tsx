@@ -21,6 +21,7 @@ interface Reservation {
   start_time?: string;
   end_time?: string;
   approval?: string;
+  details?: { key: string; value: string }[];
 }
 
 const App: React.FC = () => {
@@ -44,7 +45,7 @@ const App: React.FC = () => {
 
       for (const facilityName of FACILITIES) {
         const room_id = FACILITY_MAP[facilityName];
-        const res = await fetch(`${api}/api/reservations?room_id=${room_id}&date=${date}`);
+        const res = await fetch(`${api}/api/reservations?room_id=${room_id}&date=${date}&include=details`);
         const json = await res.json();
 
         if (!json.success) {
@@ -55,9 +56,7 @@ const App: React.FC = () => {
         const fetched: Reservation[] = json.data;
         for (const r of fetched) {
           if (!r.start_time || !r.end_time) {
-            const detailRes = await fetch(`${api}/api/reservations/${r.room_id}/${r.id}/details`);
-            const detailJson = await detailRes.json();
-            const times = extractTimeDetails(detailJson.data);
+            const times = extractTimeDetails(r.details ?? []);
             r.start_time = times.start_time?.trim();
             r.end_time = times.end_time?.trim();
           }